@@ -4,14 +4,19 @@ from __future__ import annotations
 
 import os
 import pathlib
+from contextlib import nullcontext
 from logging.config import fileConfig
 
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 from dotenv import load_dotenv
 
-# --- Try to load DATABASE_URL from environment first ---
-DATABASE_URL = os.getenv("DATABASE_URL")
+# --- Callers such as app.database_init.ensure_schema pass the URL directly ---
+DATABASE_URL = context.config.attributes.get("database_url")
+
+# --- Otherwise try to load DATABASE_URL from environment ---
+if not DATABASE_URL:
+    DATABASE_URL = os.getenv("DATABASE_URL")
 
 # --- If not found, load .env from project root ---
 BASE_DIR = pathlib.Path(__file__).resolve().parents[1]
@@ -26,12 +31,18 @@ if not DATABASE_URL:
 
 # --- Import models ---
 from app.database import Base
+from app.database_init import schema_lock
 import app.models.user
 import app.models.calculation
+import app.models.calculation_rollup
+import app.models.calculation_sketch
+import app.models.usage
+import app.models.report_job
 
 # --- Alembic config ---
 config = context.config
-if config.config_file_name:
+# Don't reconfigure logging inside a running application
+if config.config_file_name and config.attributes.get("configure_logging", True):
     fileConfig(config.config_file_name)
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
@@ -65,7 +76,10 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-    with connectable.connect() as connection:
+    # Serialize with other migrators and with workers' startup schema checks
+    # (see app.database_init), unless the caller already holds the lock.
+    take_lock = not _is_sqlite(DATABASE_URL) and not config.attributes.get("schema_lock_held")
+    with schema_lock(connectable) if take_lock else nullcontext(), connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
@@ -0,0 +1,62 @@
+"""calculation result sketches
+
+Revision ID: 45ef7a2bd314
+Revises: f7e66d5af416
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+import json
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.reports.sketches import DDSketch
+
+
+# revision identifiers, used by Alembic.
+revision: str = '45ef7a2bd314'
+down_revision: Union[str, Sequence[str], None] = 'f7e66d5af416'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('calculation_result_sketches',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'type')
+    )
+
+    # Backfill with the same bucketing code the write path uses, so later
+    # decrements hit the buckets that were incremented here.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT user_id, type, result FROM calculations "
+        "WHERE result IS NOT NULL ORDER BY user_id, type"
+    ).execution_options(stream_results=True))
+    insert = sa.text(
+        "INSERT INTO calculation_result_sketches (user_id, type, count, sketch) "
+        "VALUES (:user_id, :type, :count, CAST(:sketch AS jsonb))"
+    )
+    key, sketch = None, None
+    for user_id, calc_type, result in rows:
+        if key != (user_id, calc_type):
+            if sketch is not None and sketch.count:
+                bind.execute(insert, {"user_id": key[0], "type": key[1], "count": sketch.count, "sketch": json.dumps(sketch.to_dict())})
+            key, sketch = (user_id, calc_type), DDSketch()
+        if math.isfinite(result):
+            sketch.add(result)
+    if sketch is not None and sketch.count:
+        bind.execute(insert, {"user_id": key[0], "type": key[1], "count": sketch.count, "sketch": json.dumps(sketch.to_dict())})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('calculation_result_sketches')
@@ -0,0 +1,66 @@
+"""usage daily rollups
+
+Revision ID: 9b3c1e5a7d20
+Revises: 45ef7a2bd314
+Create Date: 2026-10-19 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.reports.hll import register_for
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3c1e5a7d20'
+down_revision: Union[str, Sequence[str], None] = '45ef7a2bd314'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('usage_daily_counts',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'type')
+    )
+    op.create_table('usage_daily_registers',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('register', sa.SmallInteger(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'register')
+    )
+
+    op.execute(
+        "INSERT INTO usage_daily_counts (day, type, count) "
+        "SELECT CAST(created_at AS date), type, count(*) FROM calculations "
+        "GROUP BY 1, 2"
+    )
+
+    # Registers use the same hash as the write path, so they must be built
+    # in Python; only the max rank per (day, register) is kept in memory.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT DISTINCT CAST(created_at AS date), user_id FROM calculations"
+    ).execution_options(stream_results=True))
+    registers = {}
+    for day, user_id in rows:
+        register, rank = register_for(user_id)
+        key = (day, register)
+        if rank > registers.get(key, 0):
+            registers[key] = rank
+    if registers:
+        bind.execute(
+            sa.text("INSERT INTO usage_daily_registers (day, register, rank) VALUES (:day, :register, :rank)"),
+            [{"day": day, "register": register, "rank": rank} for (day, register), rank in registers.items()],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('usage_daily_registers')
+    op.drop_table('usage_daily_counts')
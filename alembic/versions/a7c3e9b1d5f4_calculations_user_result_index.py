@@ -0,0 +1,36 @@
+"""calculations user_id, result index
+
+Revision ID: a7c3e9b1d5f4
+Revises: e5a1f3c7b9d2
+Create Date: 2026-10-19 13:10:00.000000
+
+Built with CREATE INDEX CONCURRENTLY outside the migration transaction,
+so writes to calculations are not blocked while the index is built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9b1d5f4'
+down_revision: Union[str, Sequence[str], None] = 'e5a1f3c7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # A previous interrupted run can leave an INVALID index behind
+        op.drop_index('ix_calculations_user_id_result', table_name='calculations', postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            'ix_calculations_user_id_result', 'calculations', ['user_id', 'result'], unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_calculations_user_id_result', table_name='calculations', postgresql_concurrently=True)
@@ -0,0 +1,110 @@
+"""calculations inputs jsonb with GIN index
+
+Revision ID: b8d4f2a6c0e7
+Revises: a7c3e9b1d5f4
+Create Date: 2026-10-19 14:00:00.000000
+
+Converts calculations.inputs from json to jsonb without the long ACCESS
+EXCLUSIVE lock (and full table rewrite) of ALTER COLUMN ... TYPE jsonb:
+
+1. add a nullable inputs_jsonb column (catalog-only change)
+2. a trigger fills it for rows written while the migration runs
+3. backfill existing rows in small committed batches, walking the
+   primary key (keyset pagination)
+4. prove NOT NULL with a NOT VALID check constraint + VALIDATE, which
+   only takes a SHARE UPDATE EXCLUSIVE lock
+5. CREATE INDEX CONCURRENTLY the GIN index
+6. swap the columns in one short transaction (bounded by lock_timeout);
+   SET NOT NULL reuses the validated constraint instead of scanning
+
+Steps 3-5 run outside the migration transaction (autocommit), so a failed
+run can simply be re-run: every step is idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f2a6c0e7'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e9b1d5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+# Keyset cursor start: below every uuid
+FIRST_ID = '00000000-0000-0000-0000-000000000000'
+LOCK_TIMEOUT = '5s'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE calculations ADD COLUMN IF NOT EXISTS inputs_jsonb jsonb")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION calculations_sync_inputs_jsonb() RETURNS trigger AS $$
+        BEGIN
+            NEW.inputs_jsonb := NEW.inputs::jsonb;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS calculations_sync_inputs_jsonb ON calculations")
+    op.execute("""
+        CREATE TRIGGER calculations_sync_inputs_jsonb
+        BEFORE INSERT OR UPDATE OF inputs ON calculations
+        FOR EACH ROW EXECUTE FUNCTION calculations_sync_inputs_jsonb()
+    """)
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Keyset batches over the primary key: each batch starts where the
+        # previous one ended instead of rescanning the rows already filled
+        backfill = sa.text(
+            "WITH batch AS ("
+            "    SELECT id FROM calculations WHERE id > :last_id ORDER BY id LIMIT :batch"
+            "), filled AS ("
+            "    UPDATE calculations AS c SET inputs_jsonb = c.inputs::jsonb "
+            "    FROM batch WHERE c.id = batch.id AND c.inputs_jsonb IS NULL"
+            ") "
+            # uuid has no max() aggregate
+            "SELECT id FROM batch ORDER BY id DESC LIMIT 1"
+        )
+        last_id = FIRST_ID
+        while last_id is not None:
+            last_id = bind.execute(backfill, {"last_id": last_id, "batch": BATCH_SIZE}).scalar()
+
+        op.execute(
+            "ALTER TABLE calculations DROP CONSTRAINT IF EXISTS calculations_inputs_jsonb_not_null"
+        )
+        op.execute(
+            "ALTER TABLE calculations ADD CONSTRAINT calculations_inputs_jsonb_not_null "
+            "CHECK (inputs_jsonb IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE calculations VALIDATE CONSTRAINT calculations_inputs_jsonb_not_null")
+
+        # A previous interrupted run can leave an INVALID index behind
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calculations_inputs_gin")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_calculations_inputs_gin "
+            "ON calculations USING gin (inputs_jsonb jsonb_path_ops)"
+        )
+
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute("ALTER TABLE calculations ALTER COLUMN inputs_jsonb SET NOT NULL")
+    op.execute("DROP TRIGGER calculations_sync_inputs_jsonb ON calculations")
+    op.execute("DROP FUNCTION calculations_sync_inputs_jsonb()")
+    op.execute("ALTER TABLE calculations DROP COLUMN inputs")
+    op.execute("ALTER TABLE calculations RENAME COLUMN inputs_jsonb TO inputs")
+    op.execute("ALTER TABLE calculations DROP CONSTRAINT calculations_inputs_jsonb_not_null")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_calculations_inputs_gin', table_name='calculations')
+    op.alter_column(
+        'calculations', 'inputs',
+        type_=sa.JSON(),
+        postgresql_using='inputs::json',
+        existing_nullable=False,
+    )
@@ -0,0 +1,44 @@
+"""usage daily counts shards
+
+Revision ID: d4b6f8a0c2e1
+Revises: b8d4f2a6c0e7
+Create Date: 2026-10-19 16:00:00.000000
+
+Splits each (day, type) counter of usage_daily_counts over several rows
+(see app.models.usage) so concurrent calculation writes do not serialize
+on one row. Existing rows become shard 0.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b6f8a0c2e1'
+down_revision: Union[str, Sequence[str], None] = 'b8d4f2a6c0e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'usage_daily_counts',
+        sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False),
+    )
+    op.drop_constraint('usage_daily_counts_pkey', 'usage_daily_counts', type_='primary')
+    op.create_primary_key('usage_daily_counts_pkey', 'usage_daily_counts', ['day', 'type', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Collapse the shards of each counter into one row (shard -1 while both exist)
+    op.execute(
+        "INSERT INTO usage_daily_counts (day, type, shard, count) "
+        "SELECT day, type, -1, sum(count) FROM usage_daily_counts GROUP BY day, type"
+    )
+    op.execute("DELETE FROM usage_daily_counts WHERE shard <> -1")
+    op.drop_constraint('usage_daily_counts_pkey', 'usage_daily_counts', type_='primary')
+    op.drop_column('usage_daily_counts', 'shard')
+    op.create_primary_key('usage_daily_counts_pkey', 'usage_daily_counts', ['day', 'type'])
@@ -0,0 +1,36 @@
+"""calculations user_id, created_at index
+
+Revision ID: e5a1f3c7b9d2
+Revises: c2d8e4f6a1b3
+Create Date: 2026-10-19 12:20:00.000000
+
+Built with CREATE INDEX CONCURRENTLY outside the migration transaction,
+so writes to calculations are not blocked while the index is built.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1f3c7b9d2'
+down_revision: Union[str, Sequence[str], None] = 'c2d8e4f6a1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # A previous interrupted run can leave an INVALID index behind
+        op.drop_index('ix_calculations_user_id_created_at', table_name='calculations', postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            'ix_calculations_user_id_created_at', 'calculations', ['user_id', 'created_at'], unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_calculations_user_id_created_at', table_name='calculations', postgresql_concurrently=True)
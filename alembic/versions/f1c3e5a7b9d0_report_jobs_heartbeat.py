@@ -0,0 +1,28 @@
+"""report jobs heartbeat
+
+Revision ID: f1c3e5a7b9d0
+Revises: d4b6f8a0c2e1
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3e5a7b9d0'
+down_revision: Union[str, Sequence[str], None] = 'd4b6f8a0c2e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('report_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('report_jobs', 'heartbeat_at')
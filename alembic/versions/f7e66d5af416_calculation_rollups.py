@@ -0,0 +1,43 @@
+"""calculation rollups
+
+Revision ID: f7e66d5af416
+Revises: d91ba2735547
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7e66d5af416'
+down_revision: Union[str, Sequence[str], None] = 'd91ba2735547'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('calculation_rollups',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'granularity', 'bucket_start', 'type')
+    )
+    # Backfill from existing history; afterwards the ORM events keep it current
+    for granularity in ('hour', 'day'):
+        op.execute(
+            "INSERT INTO calculation_rollups (user_id, granularity, bucket_start, type, count) "
+            f"SELECT user_id, '{granularity}', date_trunc('{granularity}', created_at), type, count(*) "
+            "FROM calculations GROUP BY 1, 2, 3, 4"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('calculation_rollups')
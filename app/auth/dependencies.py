@@ -1,14 +1,39 @@
+import secrets
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.schemas.user import UserResponse
 from app.models.user import User
+from app.core.config import get_settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_current_user(
+async def get_unrevoked_token(
     token: str = Depends(oauth2_scheme)
+) -> str:
+    """
+    Dependency returning the bearer token unless it was revoked, either by the
+    blacklist or by the user's token epoch ("log out everywhere").
+    The signature is verified afterwards by get_current_user.
+    """
+    from app.auth.jwt import ensure_not_revoked
+    from jose import jwt, JWTError
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if "jti" in claims and "sub" in claims:
+        await ensure_not_revoked(claims)
+    return token
+
+def get_current_user(
+    token: str = Depends(get_unrevoked_token)
 ) -> UserResponse:
     """
     Dependency to get the current user from the JWT token without a database lookup.
@@ -79,3 +104,17 @@ def get_current_active_user(
             detail="Inactive user"
         )
     return current_user
+
+
+def require_admin(
+    x_admin_key: Optional[str] = Header(None)
+) -> None:
+    """
+    Dependency guarding admin endpoints with the ADMIN_API_KEY shared secret.
+    """
+    expected = get_settings().ADMIN_API_KEY
+    if not expected or not x_admin_key or not secrets.compare_digest(x_admin_key, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
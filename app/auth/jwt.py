@@ -1,82 +1,40 @@
 # app/auth/jwt.py
-from datetime import datetime, timedelta, timezone
-from typing import Any, Optional, Union
+from datetime import timedelta
+from typing import Any, Union
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
-import secrets
+import time
 
 from app.core.config import get_settings
-from app.auth.redis import add_to_blacklist, is_blacklisted
+from app.auth.passwords import get_password_hash, verify_password  # noqa: F401 (re-exported)
+from app.auth.keys import access_verification_key
+from app.auth.tokens import create_token, refresh_algorithm  # noqa: F401 (re-exported)
+from app.auth.redis import add_to_blacklist, is_blacklisted, get_token_epoch, set_token_epoch
 from app.schemas.token import TokenType
 from app.database import get_db
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.auth.user_cache import CachedUser, cache_user, get_cached_user
 
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=settings.BCRYPT_ROUNDS
-)
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return pwd_context.hash(password)
-
-def create_token(
-    user_id: Union[str, UUID],
-    token_type: TokenType,
-    expires_delta: Optional[timedelta] = None
-) -> str:
+async def ensure_not_revoked(payload: dict[str, Any]) -> None:
     """
-    Create a JWT token (access or refresh).
+    Reject a token that was blacklisted or issued before its user's
+    revocation epoch (see revoke_user_tokens).
     """
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        if token_type == TokenType.ACCESS:
-            expire = datetime.now(timezone.utc) + timedelta(
-                minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-            )
-        else:
-            expire = datetime.now(timezone.utc) + timedelta(
-                days=settings.REFRESH_TOKEN_EXPIRE_DAYS
-            )
-
-    if isinstance(user_id, UUID):
-        user_id = str(user_id)
-
-    to_encode = {
-        "sub": user_id,
-        "type": token_type.value,
-        "exp": expire,
-        "iat": datetime.now(timezone.utc),
-        "jti": secrets.token_hex(16)
-    }
-
-    secret = (
-        settings.JWT_SECRET_KEY 
-        if token_type == TokenType.ACCESS 
-        else settings.JWT_REFRESH_SECRET_KEY
-    )
-
-    try:
-        return jwt.encode(to_encode, secret, algorithm=settings.ALGORITHM)
-    except Exception as e:
+    if await is_blacklisted(payload["jti"]) or (
+        payload.get("iat", 0) < await get_token_epoch(str(payload["sub"]))
+    ):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Could not create token: {str(e)}"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
 async def decode_token(
@@ -88,16 +46,17 @@ async def decode_token(
     Decode and verify a JWT token.
     """
     try:
-        secret = (
-            settings.JWT_SECRET_KEY 
-            if token_type == TokenType.ACCESS 
-            else settings.JWT_REFRESH_SECRET_KEY
-        )
+        if token_type == TokenType.ACCESS:
+            secret = access_verification_key(token)
+            algorithm = settings.ALGORITHM
+        else:
+            secret = settings.JWT_REFRESH_SECRET_KEY
+            algorithm = refresh_algorithm()
         
         payload = jwt.decode(
             token,
             secret,
-            algorithms=[settings.ALGORITHM],
+            algorithms=[algorithm],
             options={"verify_exp": verify_exp}
         )
         
@@ -108,12 +67,7 @@ async def decode_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        if await is_blacklisted(payload["jti"]):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        await ensure_not_revoked(payload)
             
         return payload
         
@@ -130,24 +84,47 @@ async def decode_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+async def revoke_user_tokens(user_id: Union[str, UUID]) -> float:
+    """
+    Revoke all access and refresh tokens issued to a user so far
+    ("log out everywhere", e.g. after a password change).
+
+    Stores a single per-user epoch instead of one blacklist entry per token.
+    The epoch has the same sub-second resolution as ``iat``, so tokens issued
+    before this call are revoked and tokens issued after it are accepted.
+    Returns the stored epoch.
+    """
+    epoch = time.time()
+    ttl = int(timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds())
+    await set_token_epoch(str(user_id), epoch, ttl)
+    return epoch
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> CachedUser:
     """
     Dependency to get current user from access token.
-    Returns the actual User model instance.
+    Returns a slim CachedUser record (id, username, is_active, is_verified),
+    served from the short-TTL user cache when possible.
     """
     try:
         payload = await decode_token(token, TokenType.ACCESS)
-        user_id = payload["sub"]
-        
-        user = db.query(User).filter(User.id == user_id).first()
+        user_id = str(payload["sub"])
+
+        user = await get_cached_user(user_id)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
+            # Sync query: run it off the event loop
+            db_user = await run_in_threadpool(
+                lambda: db.query(User).filter(User.id == user_id).first()
             )
+            if db_user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            user = CachedUser.from_user(db_user)
+            await cache_user(user)
             
         if not user.is_active:
             raise HTTPException(
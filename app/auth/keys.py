@@ -0,0 +1,136 @@
+# app/auth/keys.py
+"""
+Signing/verification keys for access tokens.
+
+With the default ALGORITHM=HS256, access tokens are signed with JWT_SECRET_KEY
+exactly as before. With an asymmetric algorithm (RS*/ES*), access tokens are
+signed with the private key at JWT_PRIVATE_KEY_PATH and carry a ``kid`` header
+(the RFC 7638 thumbprint of the public key). Public keys are published as a
+JWKS document so other services can verify tokens locally.
+
+Rotation: point JWT_PRIVATE_KEY_PATH at the new key and keep the previous
+public key in JWT_PUBLIC_KEY_PATHS until its tokens have expired.
+
+Refresh tokens are only ever verified by this service and stay HS256-signed
+with JWT_REFRESH_SECRET_KEY.
+
+``jose.jwk``/``jose.jwt`` load the cryptography backend (tens of ms), so they
+are imported where they are used rather than at module import.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from jose.exceptions import JWTError
+
+from app.core.config import get_settings
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+REFRESH_ALGORITHM = "HS256"
+
+# Members that identify a public key, per RFC 7638 section 3.2
+_THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm.upper() in ASYMMETRIC_ALGORITHMS
+
+
+def _thumbprint(public_jwk: Dict[str, Any]) -> str:
+    members = {k: public_jwk[k] for k in _THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+@dataclass
+class KeySet:
+    """Active signing key plus every public key accepted for verification."""
+    algorithm: str
+    signing_key: Optional[str] = None
+    signing_kid: Optional[str] = None
+    # kid -> PEM public key
+    verify_keys: Dict[str, str] = field(default_factory=dict)
+    # kid -> public JWK (what /.well-known/jwks.json serves)
+    public_jwks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def add_public_key(self, pem: str) -> str:
+        from jose import jwk
+
+        public = jwk.construct(pem, self.algorithm)
+        if not public.is_public():
+            public = public.public_key()
+        data = public.to_dict()
+        kid = _thumbprint(data)
+        data.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+        self.verify_keys[kid] = public.to_pem().decode()
+        self.public_jwks[kid] = data
+        return kid
+
+    def jwks(self) -> Dict[str, Any]:
+        return {"keys": list(self.public_jwks.values())}
+
+
+def load_keyset(settings=None) -> KeySet:
+    """Build a KeySet from settings (reads PEM files from disk)."""
+    settings = settings or get_settings()
+    keyset = KeySet(algorithm=settings.ALGORITHM.upper())
+    if not is_asymmetric(keyset.algorithm):
+        return keyset
+
+    if not settings.JWT_PRIVATE_KEY_PATH:
+        raise RuntimeError(
+            f"ALGORITHM={settings.ALGORITHM} requires JWT_PRIVATE_KEY_PATH to be set"
+        )
+    private_pem = Path(settings.JWT_PRIVATE_KEY_PATH).read_text()
+    keyset.signing_key = private_pem
+    keyset.signing_kid = keyset.add_public_key(private_pem)
+
+    for path in settings.JWT_PUBLIC_KEY_PATHS:
+        keyset.add_public_key(Path(path).read_text())
+    return keyset
+
+
+@lru_cache()
+def get_keyset() -> KeySet:
+    return load_keyset()
+
+
+def access_signing_params() -> Dict[str, Any]:
+    """Keyword arguments for ``jwt.encode`` when issuing an access token."""
+    settings = get_settings()
+    keyset = get_keyset()
+    if keyset.signing_key is None:
+        return {"key": settings.JWT_SECRET_KEY, "algorithm": settings.ALGORITHM}
+    return {
+        "key": keyset.signing_key,
+        "algorithm": keyset.algorithm,
+        "headers": {"kid": keyset.signing_kid},
+    }
+
+
+def access_verification_key(token: str) -> str:
+    """
+    Return the key that should verify ``token``.
+
+    For asymmetric algorithms the key is selected by the token's ``kid``
+    header; unknown or missing kids raise JWTError.
+    """
+    keyset = get_keyset()
+    if keyset.signing_key is None:
+        return get_settings().JWT_SECRET_KEY
+
+    from jose import jwt
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    try:
+        return keyset.verify_keys[kid]
+    except KeyError:
+        raise JWTError(f"Unknown signing key id: {kid!r}")
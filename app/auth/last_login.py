@@ -0,0 +1,139 @@
+# app/auth/last_login.py
+"""
+Coalesced last_login updates.
+
+Writing ``users.last_login`` on every login turns each login into a row update,
+and those updates contend during login storms. When LAST_LOGIN_FLUSH_SECONDS is
+positive, ``User.authenticate`` records the timestamp here instead. A background
+task in the app lifespan writes all pending timestamps in one statement:
+
+    UPDATE users SET last_login = v.ts
+    FROM (VALUES (...), (...)) AS v(id, ts)
+    WHERE users.id = v.id AND (users.last_login IS NULL OR users.last_login < v.ts)
+
+Repeated logins by the same user between flushes collapse into one row, and the
+``<`` guard keeps the column monotonic when several workers flush. The buffer is
+flushed one last time on graceful shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+# Rows per UPDATE statement; keeps statements and bind lists bounded
+FLUSH_CHUNK_SIZE = 1000
+
+
+class LastLoginBuffer:
+    """Thread-safe map of user id -> most recent login time awaiting a flush."""
+
+    def __init__(self, flush_seconds: int = 0):
+        self.flush_seconds = flush_seconds
+        self._pending: Dict[UUID, datetime] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: UUID, login_at: datetime) -> None:
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or login_at > previous:
+                self._pending[user_id] = login_at
+
+    def _drain(self) -> Dict[UUID, datetime]:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def _requeue(self, batch: Dict[UUID, datetime]) -> None:
+        for user_id, login_at in batch.items():
+            self.record(user_id, login_at)
+
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """Write all pending timestamps; returns the number of users flushed."""
+        batch = self._drain()
+        if not batch:
+            return 0
+
+        if engine is None:
+            from app.database import engine as default_engine
+            engine = default_engine
+
+        items = list(batch.items())
+        try:
+            with engine.begin() as conn:
+                for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                    conn.execute(*_update_statement(items[start:start + FLUSH_CHUNK_SIZE]))
+        except Exception:
+            # Keep the timestamps for the next attempt rather than losing them
+            self._requeue(batch)
+            logger.exception("Failed to flush %d last_login timestamps", len(batch))
+            raise
+        return len(items)
+
+
+def _update_statement(items):
+    rows = []
+    params = {}
+    for i, (user_id, login_at) in enumerate(items):
+        rows.append(f"(CAST(:id{i} AS uuid), CAST(:ts{i} AS timestamptz))")
+        params[f"id{i}"] = str(user_id)
+        params[f"ts{i}"] = login_at
+    stmt = text(
+        "UPDATE users SET last_login = v.ts "
+        f"FROM (VALUES {', '.join(rows)}) AS v(id, ts) "
+        "WHERE users.id = v.id "
+        "AND (users.last_login IS NULL OR users.last_login < v.ts)"
+    )
+    return stmt, params
+
+
+buffer = LastLoginBuffer(_settings.LAST_LOGIN_FLUSH_SECONDS)
+
+
+async def _flush_periodically(interval: int) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await loop.run_in_executor(None, buffer.flush)
+        except Exception:
+            # Already logged; retried on the next tick
+            pass
+
+
+def start_flusher() -> Optional[asyncio.Task]:
+    """Start the periodic flush task (no-op when buffering is disabled)."""
+    if not buffer.enabled:
+        return None
+    return asyncio.create_task(_flush_periodically(buffer.flush_seconds))
+
+
+async def stop_flusher(task: Optional[asyncio.Task]) -> None:
+    """Cancel the periodic task and write whatever is still buffered."""
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if len(buffer):
+        await asyncio.get_running_loop().run_in_executor(None, buffer.flush)
@@ -0,0 +1,35 @@
+# app/auth/passwords.py
+"""
+Password hashing.
+
+Kept apart from app.auth.jwt so that app.models.user can hash and verify
+passwords without importing the token machinery (jose, Redis), and the
+passlib CryptContext is only built on first use instead of at import.
+"""
+from functools import lru_cache
+
+from app.core.config import get_settings
+from app.core.loop_monitor import flag_blocking_call
+
+
+@lru_cache()
+def get_password_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=get_settings().BCRYPT_ROUNDS
+    )
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash."""
+    flag_blocking_call("bcrypt")
+    return get_password_context().verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    """Hash a password using bcrypt."""
+    flag_blocking_call("bcrypt")
+    return get_password_context().hash(password)
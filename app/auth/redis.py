@@ -15,6 +15,7 @@ except Exception:  # pragma: no cover
     _REDIS_OK = False
 
 from app.core.config import get_settings
+from app.core.metrics import record_cache, redis_timer
 
 _settings = get_settings()
 _REDIS_URL = (_settings.REDIS_URL or "redis://localhost:6379/0").strip()
@@ -23,6 +24,13 @@ _REDIS_URL = (_settings.REDIS_URL or "redis://localhost:6379/0").strip()
 # Simple and good enough for tests; does not implement TTL.
 _FALLBACK_BLACKLIST: set[str] = set()
 
+# Per-user revocation epochs ("log out everywhere"). The fallback dict plays the
+# same role as _FALLBACK_BLACKLIST; the cache maps user id -> (epoch, fetched_at)
+# so most token checks do not need a Redis round trip.
+_FALLBACK_EPOCHS: dict[str, float] = {}
+_EPOCH_CACHE: dict[str, tuple[float, float]] = {}
+_EPOCH_CACHE_SECONDS = _settings.TOKEN_EPOCH_CACHE_SECONDS
+
 
 async def _get_redis() -> Optional["aioredis.Redis"]:
     """Return a memoized aioredis client, or None if redis is unavailable."""
@@ -59,7 +67,8 @@ async def add_to_blacklist(jti: str, exp: int) -> None:
     ttl = max(0, int(exp) - int(time.time()))
     try:
         # Namespaced key; value is irrelevant (we only check existence)
-        await redis.setex(f"blacklist:{jti}", ttl, "1")  # type: ignore[attr-defined]
+        with redis_timer("blacklist_add"):
+            await redis.setex(f"blacklist:{jti}", ttl, "1")  # type: ignore[attr-defined]
     except Exception:
         # Do not let Redis hiccups break auth flows during tests
         _FALLBACK_BLACKLIST.add(jti)
@@ -75,7 +84,65 @@ async def is_blacklisted(jti: str) -> bool:
 
     try:
         # aioredis v2 returns int 1/0 for exists
-        return bool(await redis.exists(f"blacklist:{jti}"))  # type: ignore[attr-defined]
+        with redis_timer("blacklist_check"):
+            return bool(await redis.exists(f"blacklist:{jti}"))  # type: ignore[attr-defined]
     except Exception:
         # Fail safe: if Redis errors, check fallback too
         return jti in _FALLBACK_BLACKLIST
+
+
+async def set_token_epoch(user_id: str, epoch: float, ttl: int) -> None:
+    """
+    Revoke every token of ``user_id`` issued before ``epoch``.
+
+    Parameters
+    ----------
+    user_id : str
+        The token subject (user id).
+    epoch : float
+        UNIX epoch (seconds, with the sub-second part). Tokens whose ``iat``
+        is lower are rejected.
+    ttl : int
+        Seconds to keep the key in Redis. Once the longest-lived token issued
+        before ``epoch`` has expired, the key is no longer needed.
+    """
+    _EPOCH_CACHE[user_id] = (epoch, time.monotonic())
+
+    redis = await _get_redis()
+    if redis is None:
+        _FALLBACK_EPOCHS[user_id] = epoch
+        return
+
+    try:
+        with redis_timer("epoch_set"):
+            await redis.setex(f"token_epoch:{user_id}", max(1, ttl), str(epoch))  # type: ignore[attr-defined]
+    except Exception:
+        _FALLBACK_EPOCHS[user_id] = epoch
+
+
+async def get_token_epoch(user_id: str) -> float:
+    """
+    Return the revocation epoch for ``user_id`` (0 if none was ever set).
+
+    Values are cached in-process for TOKEN_EPOCH_CACHE_SECONDS.
+    """
+    cached = _EPOCH_CACHE.get(user_id)
+    if cached is not None and time.monotonic() - cached[1] < _EPOCH_CACHE_SECONDS:
+        record_cache("token_epoch", hit=True)
+        return cached[0]
+    record_cache("token_epoch", hit=False)
+
+    redis = await _get_redis()
+    if redis is None:
+        epoch = _FALLBACK_EPOCHS.get(user_id, 0)
+    else:
+        try:
+            with redis_timer("epoch_get"):
+                value = await redis.get(f"token_epoch:{user_id}")  # type: ignore[attr-defined]
+            epoch = float(value) if value else 0
+        except Exception:
+            # Same fail-safe as is_blacklisted: fall back to the local store
+            epoch = _FALLBACK_EPOCHS.get(user_id, 0)
+
+    _EPOCH_CACHE[user_id] = (epoch, time.monotonic())
+    return epoch
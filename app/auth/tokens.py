@@ -0,0 +1,76 @@
+# app/auth/tokens.py
+"""
+Token creation.
+
+Kept apart from app.auth.jwt (like app.auth.passwords) so that
+app.models.user can issue tokens at login without importing the
+verification dependencies, Redis or the models themselves. ``jose.jwt`` is
+imported on the first token, as in app.auth.keys.
+"""
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.auth.keys import REFRESH_ALGORITHM, access_signing_params, is_asymmetric
+from app.core.config import get_settings
+from app.schemas.token import TokenType
+
+settings = get_settings()
+
+
+def refresh_algorithm() -> str:
+    """Refresh tokens stay symmetric even when access tokens are asymmetric."""
+    return REFRESH_ALGORITHM if is_asymmetric(settings.ALGORITHM) else settings.ALGORITHM
+
+
+def create_token(
+    user_id: Union[str, UUID],
+    token_type: TokenType,
+    expires_delta: Optional[timedelta] = None
+) -> str:
+    """
+    Create a JWT token (access or refresh).
+    """
+    from jose import jwt
+
+    if expires_delta:
+        expire = datetime.now(timezone.utc) + expires_delta
+    else:
+        if token_type == TokenType.ACCESS:
+            expire = datetime.now(timezone.utc) + timedelta(
+                minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+            )
+        else:
+            expire = datetime.now(timezone.utc) + timedelta(
+                days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+            )
+
+    if isinstance(user_id, UUID):
+        user_id = str(user_id)
+
+    to_encode = {
+        "sub": user_id,
+        "type": token_type.value,
+        "exp": expire,
+        # Sub-second ``iat`` so a token issued right after revoke_user_tokens
+        # is not mistaken for one issued before it
+        "iat": time.time(),
+        "jti": secrets.token_hex(16)
+    }
+
+    if token_type == TokenType.ACCESS:
+        signing = access_signing_params()
+    else:
+        signing = {"key": settings.JWT_REFRESH_SECRET_KEY, "algorithm": refresh_algorithm()}
+
+    try:
+        return jwt.encode(to_encode, **signing)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not create token: {str(e)}"
+        )
@@ -0,0 +1,199 @@
+# app/auth/user_cache.py
+"""
+Short-TTL cache of slim user records for the DB-backed auth dependency.
+
+`app.auth.jwt.get_current_user` only needs a handful of columns to authorize a
+request, so instead of a primary-key lookup per call we keep:
+
+- a per-process dict of ``CachedUser`` records (always on unless the TTL is 0)
+- an optional Redis tier shared across workers (USER_CACHE_REDIS=true)
+
+Entries are dropped when a User row is updated or deleted through the ORM,
+once the session commits (invalidating at flush time would let a concurrent
+request re-cache the old row before the commit). The committing worker drops
+its local entry and deletes the Redis entry before ``commit()`` returns when
+it runs in the app's threadpool, as sync routes do. Local tiers of other
+workers are not notified: they serve the old record for at most
+USER_CACHE_TTL_SECONDS, which bounds how long a deactivated user keeps access.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from anyio import from_thread
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.auth.redis import _get_redis
+from app.core.config import get_settings
+from app.core.metrics import record_cache, redis_timer
+from app.models.user import User
+
+_settings = get_settings()
+_TTL = _settings.USER_CACHE_TTL_SECONDS
+_USE_REDIS = _settings.USER_CACHE_REDIS
+
+# user id -> (record, cached_at)
+_LOCAL: dict[str, tuple["CachedUser", float]] = {}
+# Session.info key of the user ids written in the session's transaction
+_PENDING_KEY = "user_cache_invalidations"
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """The subset of a User row needed to authorize a request."""
+    id: UUID
+    username: str
+    is_active: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=bool(user.is_active),
+            is_verified=bool(user.is_verified),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "id": str(self.id),
+            "username": self.username,
+            "is_active": self.is_active,
+            "is_verified": self.is_verified,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CachedUser":
+        data = json.loads(raw)
+        return cls(
+            id=UUID(data["id"]),
+            username=data["username"],
+            is_active=data["is_active"],
+            is_verified=data["is_verified"],
+        )
+
+
+async def get_cached_user(user_id: str) -> Optional[CachedUser]:
+    """Return the cached record for ``user_id``, or None on a miss."""
+    if _TTL <= 0:
+        return None
+
+    entry = _LOCAL.get(user_id)
+    if entry is not None:
+        if time.monotonic() - entry[1] < _TTL:
+            record_cache("user", hit=True)
+            return entry[0]
+        _LOCAL.pop(user_id, None)
+
+    if not _USE_REDIS:
+        record_cache("user", hit=False)
+        return None
+
+    redis = await _get_redis()
+    if redis is None:
+        record_cache("user", hit=False)
+        return None
+    try:
+        with redis_timer("user_cache_get"):
+            raw = await redis.get(f"user:{user_id}")  # type: ignore[attr-defined]
+    except Exception:
+        raw = None
+    record_cache("user", hit=bool(raw))
+    if not raw:
+        return None
+
+    user = CachedUser.from_json(raw)
+    _LOCAL[user_id] = (user, time.monotonic())
+    return user
+
+
+async def cache_user(user: CachedUser) -> None:
+    """Store ``user`` in the local tier and, if enabled, in Redis."""
+    if _TTL <= 0:
+        return
+
+    _LOCAL[str(user.id)] = (user, time.monotonic())
+
+    if not _USE_REDIS:
+        return
+    redis = await _get_redis()
+    if redis is None:
+        return
+    try:
+        with redis_timer("user_cache_set"):
+            await redis.setex(f"user:{user.id}", _TTL, user.to_json())  # type: ignore[attr-defined]
+    except Exception:
+        # The local tier is enough to serve this worker
+        pass
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Drop ``user_id`` from both cache tiers."""
+    _LOCAL.pop(user_id, None)
+    await _delete_redis_entries([user_id])
+
+
+async def _delete_redis_entries(user_ids) -> None:
+    if not _USE_REDIS:
+        return
+    redis = await _get_redis()
+    if redis is None:
+        return
+    try:
+        with redis_timer("user_cache_delete"):
+            await redis.delete(*(f"user:{user_id}" for user_id in user_ids))  # type: ignore[attr-defined]
+    except Exception:
+        pass
+
+
+def clear() -> None:
+    """Empty the local tier (used by tests)."""
+    _LOCAL.clear()
+
+
+def _invalidate_committed(user_ids: set) -> None:
+    for user_id in user_ids:
+        _LOCAL.pop(user_id, None)
+
+    if not _USE_REDIS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        # Commit on the event loop thread itself: it cannot wait for the loop
+        loop.create_task(_delete_redis_entries(user_ids))
+        return
+    try:
+        # Sync route in the threadpool: wait for the delete on the app's loop
+        from_thread.run(_delete_redis_entries, user_ids)
+    except RuntimeError:
+        # No event loop to run on (scripts): the entry expires within the TTL
+        pass
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is None:
+        _invalidate_committed({str(target.id)})
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(str(target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session) -> None:
+    # Ids left over from a rolled-back transaction are invalidated at the next
+    # commit instead, which is harmless
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        _invalidate_committed(user_ids)
@@ -0,0 +1,164 @@
+# app/core/loop_monitor.py
+"""
+Event loop health: lag monitor, stall watchdog and blocking-call detector.
+
+Every worker serves all of its async code (middleware, async endpoints,
+async dependencies such as app.auth.jwt.get_current_user) on one event loop
+thread. A synchronous call made there, such as a SQLAlchemy query or bcrypt,
+holds up every other request on that worker until it returns.
+
+- LoopMonitor runs a task that sleeps LOOP_MONITOR_INTERVAL_MS and records
+  how late it woke up in ``event_loop_lag_seconds``. Lag is near zero on a
+  healthy loop and equals the blocking time when something blocked it.
+- With LOOP_BLOCK_DEBUG, a watchdog thread also checks the monitor's
+  heartbeat. When the loop has not come back for LOOP_BLOCK_THRESHOLD_MS it
+  logs the loop thread's stack once per stall, i.e. the coroutine that is
+  blocking, and counts ``event_loop_stalls_total``.
+- flag_blocking_call is called by known blocking operations (every SQL
+  statement via instrument_blocking_calls, bcrypt in app.auth.passwords).
+  When it runs on a thread with a running event loop it counts
+  ``event_loop_blocking_calls_total{call}`` and, with LOOP_BLOCK_DEBUG, logs
+  the caller's stack. Sync endpoints and dependencies run in the threadpool,
+  which has no running loop, so they are never flagged.
+
+record_blocking_calls collects flagged calls for tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+from app.core.metrics import EVENT_LOOP_BLOCKING_CALLS, EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+_recorders: List[List[str]] = []
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def flag_blocking_call(call: str) -> None:
+    """Record ``call`` if it is about to block a running event loop."""
+    if not _on_event_loop():
+        return
+    EVENT_LOOP_BLOCKING_CALLS.labels(call).inc()
+    for calls in _recorders:
+        calls.append(call)
+    if get_settings().LOOP_BLOCK_DEBUG:
+        logger.warning(
+            "Blocking %s call on the event loop:\n%s", call, "".join(traceback.format_stack()[:-1])
+        )
+
+
+@contextmanager
+def record_blocking_calls() -> Iterator[List[str]]:
+    """Collect the names of the calls flagged while the block runs."""
+    calls: List[str] = []
+    _recorders.append(calls)
+    try:
+        yield calls
+    finally:
+        _recorders.remove(calls)
+
+
+def instrument_blocking_calls(engine) -> None:
+    """Flag SQL statements executed on the event loop thread."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        flag_blocking_call("sql")
+
+
+class LoopMonitor:
+    """Measures event loop lag; with ``debug`` also reports stalls with the blocking stack."""
+
+    def __init__(self, interval: float, threshold: float, debug: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.samples = 0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> "LoopMonitor":
+        """Start monitoring the running loop; must be called on the loop thread."""
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._beat())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        return self
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _beat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG.observe(lag)
+            self.samples += 1
+            self.max_lag = max(self.max_lag, lag)
+            self._last_beat = time.monotonic()
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self.stalls += 1
+            EVENT_LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+            logger.warning("Event loop blocked for %.0f ms, currently at:\n%s", stalled * 1000, stack)
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """Start a LoopMonitor from the settings (None when LOOP_MONITOR_ENABLED is off)."""
+    settings = get_settings()
+    if not settings.LOOP_MONITOR_ENABLED:
+        return None
+    return LoopMonitor(
+        settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+        settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+        debug=settings.LOOP_BLOCK_DEBUG,
+    ).start()
+
+
+async def stop_loop_monitor(monitor: Optional[LoopMonitor]) -> None:
+    if monitor is not None:
+        await monitor.stop()
@@ -0,0 +1,209 @@
+# app/core/metrics.py
+"""
+Prometheus metrics, served at GET /metrics.
+
+- http_request_duration_seconds{method,route,status}: latency per route
+  template (``/calculations/{calc_id}``, not the concrete path, so the label
+  set stays bounded); unmatched paths share route="<unmatched>"
+- http_requests_in_progress{method}: requests currently being served
+- db_pool_checkout_seconds: time spent getting a connection from the pool,
+  including opening a new one when the pool has room to grow
+- db_pool_checkouts_total, db_pool_connections_created_total and
+  db_pool_checked_out: pool activity from SQLAlchemy pool events
+- redis_call_duration_seconds{op}: Redis round trips (token blacklist,
+  revocation epochs, user cache)
+- cache_requests_total{cache,result}: hits and misses of the in-process
+  caches; the hit ratio is
+  ``sum by (cache) (rate(cache_requests_total{result="hit"}[5m])) /
+  sum by (cache) (rate(cache_requests_total[5m]))``
+- event_loop_lag_seconds, event_loop_stalls_total and
+  event_loop_blocking_calls_total{call}: event loop health (see
+  app.core.loop_monitor)
+
+Multiprocess: with PROMETHEUS_MULTIPROC_DIR set in the environment before
+the workers start (the Docker image does this), every uvicorn worker
+writes its samples to files in that directory and /metrics aggregates all
+of them; gauges report the sum over live workers. Without it, /metrics
+shows the serving worker only.
+
+prometheus_client is optional. Without it every metric is a no-op and
+/metrics answers 503.
+
+Hot-path cost is a dict lookup for the labelled child plus an observe; the
+request middleware is plain ASGI rather than BaseHTTPMiddleware.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+    METRICS_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without prometheus_client
+    prometheus_client = None  # type: ignore[assignment]
+    METRICS_AVAILABLE = False
+
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+UNMATCHED_ROUTE = "<unmatched>"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _NoopMetric:
+    """Stands in for every metric type when prometheus_client is missing."""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+
+if METRICS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds", "HTTP request latency by route template",
+        ["method", "route", "status"], buckets=_LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_PROGRESS = Gauge(
+        "http_requests_in_progress", "HTTP requests currently being served",
+        ["method"], multiprocess_mode="livesum",
+    )
+    POOL_CHECKOUT_SECONDS = Histogram(
+        "db_pool_checkout_seconds", "Time to get a connection from the SQLAlchemy pool",
+        buckets=_FAST_BUCKETS,
+    )
+    POOL_CHECKOUTS = Counter("db_pool_checkouts", "Connections checked out of the pool")
+    POOL_CONNECTIONS_CREATED = Counter("db_pool_connections_created", "New DBAPI connections opened")
+    POOL_CHECKED_OUT = Gauge(
+        "db_pool_checked_out", "Connections currently checked out of the pool",
+        multiprocess_mode="livesum",
+    )
+    REDIS_LATENCY = Histogram(
+        "redis_call_duration_seconds", "Redis call latency", ["op"], buckets=_FAST_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter("cache_requests", "Cache lookups", ["cache", "result"])
+    EVENT_LOOP_LAG = Histogram(
+        "event_loop_lag_seconds", "How late the event loop ran a timer scheduled by the loop monitor",
+        buckets=_LAG_BUCKETS,
+    )
+    EVENT_LOOP_STALLS = Counter("event_loop_stalls", "Event loop stalls longer than LOOP_BLOCK_THRESHOLD_MS")
+    EVENT_LOOP_BLOCKING_CALLS = Counter(
+        "event_loop_blocking_calls", "Blocking calls (SQL, bcrypt) made on the event loop thread", ["call"],
+    )
+else:  # pragma: no cover
+    REQUEST_LATENCY = REQUESTS_IN_PROGRESS = POOL_CHECKOUT_SECONDS = _NoopMetric()
+    POOL_CHECKOUTS = POOL_CONNECTIONS_CREATED = POOL_CHECKED_OUT = _NoopMetric()
+    REDIS_LATENCY = CACHE_REQUESTS = _NoopMetric()
+    EVENT_LOOP_LAG = EVENT_LOOP_STALLS = EVENT_LOOP_BLOCKING_CALLS = _NoopMetric()
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def redis_timer(op: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REDIS_LATENCY.labels(op).observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Count checkouts, checkins and new connections of ``engine``'s pool."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_CREATED.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc()
+        POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        POOL_CHECKED_OUT.dec()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and in-flight requests."""
+
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # FastAPI puts the matched APIRoute in the scope
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            REQUEST_LATENCY.labels(method, path, status).observe(time.perf_counter() - started)
+
+
+def render_latest() -> Tuple[Optional[bytes], str]:
+    """Exposition output and its content type; (None, "") without prometheus_client."""
+    if not METRICS_AVAILABLE:
+        return None, ""
+    if MULTIPROCESS_DIR:
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Drop this worker's live gauges from the multiprocess directory."""
+    if METRICS_AVAILABLE and MULTIPROCESS_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,100 @@
+# app/core/openapi.py
+"""
+Precomputed OpenAPI schema.
+
+FastAPI builds the schema on the first /openapi.json (or /docs) request by
+walking every route and pydantic model, so whoever asks first after a boot
+pays for it. With OPENAPI_CACHE_PATH set, the schema is read from that file
+instead, as long as the file was generated from the same code: it records a
+fingerprint of the app package sources and the fastapi/pydantic versions,
+and a stale or unreadable file is simply regenerated (and rewritten).
+
+The Docker image writes the file at build time:
+
+    python -m app.core.openapi /app/.openapi-cache.json
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def schema_fingerprint() -> str:
+    """Hash of everything that can change the generated schema."""
+    digest = hashlib.sha256()
+    for package in ("fastapi", "pydantic"):
+        digest.update(f"{package}=={version(package)}\n".encode())
+    for path in sorted(_APP_DIR.rglob("*.py")):
+        digest.update(str(path.relative_to(_APP_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_cached_schema(path: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as fp:
+            cached = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("schema")
+
+
+def write_cached_schema(path: str, fingerprint: str, schema: Dict[str, Any]) -> None:
+    """Write atomically so concurrently booting workers never read half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump({"fingerprint": fingerprint, "schema": schema}, fp)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("Could not write the OpenAPI schema cache to %s: %s", path, exc)
+
+
+def install_openapi_cache(app, path: Optional[str]) -> None:
+    """Serve ``app``'s OpenAPI schema from ``path`` when it is up to date."""
+    if not path:
+        return
+    build = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            fingerprint = schema_fingerprint()
+            schema = load_cached_schema(path, fingerprint)
+            if schema is None:
+                schema = build()
+                write_cached_schema(path, fingerprint, schema)
+            app.openapi_schema = schema
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def main(argv=None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python -m app.core.openapi PATH", file=sys.stderr)
+        return 2
+    from fastapi import FastAPI
+
+    from app.main import app
+
+    # FastAPI's own builder, bypassing whatever cache app.main installed
+    write_cached_schema(args[0], schema_fingerprint(), FastAPI.openapi(app))
+    print(f"Wrote OpenAPI schema to {args[0]}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+# app/core/profiler.py
+"""
+On-demand sampling profiler for individual requests.
+
+Off unless PROFILE_DIR is set: without it the middleware is not installed
+at all, so there is no per-request cost. With it, a request is profiled when
+
+- it carries ``X-Profile: 1`` together with a valid ``X-Admin-Key``
+  (ADMIN_API_KEY), or
+- it is picked by PROFILE_SAMPLE_RATE (0.0 by default, e.g. 0.001 for one
+  request in a thousand)
+
+A profiled request gets a sampler thread that reads ``sys._current_frames()``
+every PROFILE_INTERVAL_MS while the request runs. The stack of every busy
+thread is recorded, not only the one serving this request: sync endpoints
+run in the threadpool, and the event loop thread is shared with concurrent
+requests. Threads parked in threading/queue/selectors waits are skipped.
+Each stack starts with the thread name, so a flame graph can be filtered.
+The sampler needs the GIL, so CPU-bound code is sampled at most once per
+switch interval (sys.getswitchinterval(), 5 ms by default).
+
+The result is written as collapsed stacks (``thread;outer;...;inner count``,
+one stack per line) to PROFILE_DIR, which speedscope.app and flamegraph.pl
+open directly. The file name is returned in the ``X-Profile-File`` response
+header.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Samples the stacks of all busy threads from a background thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)).replace(";", ":"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _headers(scope) -> Dict[bytes, bytes]:
+    return {name.lower(): value for name, value in scope.get("headers", [])}
+
+
+def should_profile(scope, settings=None) -> bool:
+    settings = settings or get_settings()
+    headers = _headers(scope)
+    if headers.get(b"x-profile") == b"1" and settings.ADMIN_API_KEY:
+        key = headers.get(b"x-admin-key", b"").decode("latin-1")
+        if secrets.compare_digest(key, settings.ADMIN_API_KEY):
+            return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def write_profile(directory: str, name: str, sampler: StackSampler) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(sampler.collapsed())
+    return path
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware profiling the requests picked by should_profile."""
+
+    def __init__(self, app, directory: str):
+        self.app = app
+        self.directory = directory
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        route = _UNSAFE_CHARS.sub("_", scope["path"]).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{route}-{os.getpid()}-{secrets.token_hex(3)}.collapsed"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000).start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            try:
+                path = await run_in_threadpool(write_profile, self.directory, name, sampler)
+                logger.info("Wrote request profile %s (%d samples)", path, sum(sampler.samples.values()))
+            except OSError as exc:
+                logger.warning("Could not write request profile %s: %s", name, exc)
+
+
+def install_profiler(app, directory: Optional[str]) -> None:
+    """Add ProfilerMiddleware to ``app`` when a PROFILE_DIR is configured."""
+    if directory:
+        app.add_middleware(ProfilerMiddleware, directory=directory)
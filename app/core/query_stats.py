@@ -0,0 +1,147 @@
+# app/core/query_stats.py
+"""
+Per-request SQL accounting.
+
+instrument_queries hooks before/after_cursor_execute on the engine and adds
+every statement's count and duration to the QueryStats of the request being
+served. The stats live in a context variable, which Starlette copies into
+the threadpool that runs sync endpoints and dependencies, so queries issued
+there are attributed to the right request.
+
+QueryTimingMiddleware then:
+
+- adds ``Server-Timing: db;dur=<ms>;desc="<n> queries", app;dur=<ms>`` to
+  the response (SERVER_TIMING_HEADER); browsers show it in the network tab
+- logs one ``app.requests`` line per request with the same numbers as
+  ``extra`` fields (method, route, status, duration_ms, db_queries, db_ms)
+
+Statements slower than SLOW_QUERY_MS are logged on ``app.sql.slow`` with
+literals and bind placeholders replaced by ``?``, so the same query from
+different requests groups together.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+
+request_logger = logging.getLogger("app.requests")
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+_MAX_STATEMENT_CHARS = 2000
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):[A-Za-z_]\w*|\$\d+")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def normalize_statement(statement: str) -> str:
+    """Replace literals and bind parameters with ``?`` and collapse whitespace."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?, ...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return normalized[:_MAX_STATEMENT_CHARS]
+
+
+def instrument_queries(engine) -> None:
+    """Time every cursor execute on ``engine``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started_at", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+        threshold_ms = get_settings().SLOW_QUERY_MS
+        if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+            normalized = normalize_statement(statement)
+            slow_query_logger.warning(
+                "slow query %.1f ms: %s", elapsed * 1000, normalized,
+                extra={"duration_ms": round(elapsed * 1000, 2), "statement": normalized},
+            )
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    return f'db;dur={stats.ms};desc="{stats.queries} queries", app;dur={round(total_seconds * 1000, 2)}'
+
+
+class QueryTimingMiddleware:
+    """Pure ASGI middleware collecting QueryStats for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            request_logger.info(
+                "%s %s %s %.1f ms, %d queries in %.1f ms",
+                scope["method"], route, status, duration_ms, stats.queries, stats.ms,
+                extra={
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    "db_queries": stats.queries,
+                    "db_ms": stats.ms,
+                },
+            )
@@ -0,0 +1,103 @@
+# app/core/warmup.py
+"""
+Per-worker warm-up and garbage-collector tuning.
+
+Each uvicorn worker imports the app and runs the lifespan on its own, so
+without a warm-up the first requests a worker serves pay for opening pool
+connections, loading the auth stack (jose, the bcrypt backend), building the
+OpenAPI/JSON schemas and compiling Jinja templates. (The middleware stack
+needs no warming: Starlette builds it for the lifespan call itself.)
+warm_up does all of that before the worker reports ready. Every step is
+best-effort: a failure is logged and the worker starts anyway.
+
+configure_gc then moves everything allocated so far (modules, ORM mappers,
+schemas, compiled templates) into the permanent generation with gc.freeze(),
+so later full collections no longer traverse it, and optionally applies
+GC_THRESHOLDS. Workers are started with spawn rather than fork, so this is
+about collection pauses, not copy-on-write sharing.
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_db_pool(engine: Engine, connections: int) -> None:
+    # Hold them all at once so the pool ends up with ``connections`` idle ones
+    held = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            held.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in held:
+            conn.close()
+
+
+def _warm_auth() -> None:
+    from jose import jwt
+
+    from app.auth.jwt import create_token
+    from app.auth.keys import access_verification_key
+    from app.auth.passwords import get_password_context
+    from app.core.config import get_settings
+    from app.schemas.token import TokenType
+
+    # Loads the bcrypt backend without paying for a full-cost hash
+    get_password_context().handler("bcrypt").using(rounds=4).hash("warm-up")
+    token = create_token(uuid.uuid4(), TokenType.ACCESS)
+    jwt.decode(token, access_verification_key(token), algorithms=[get_settings().ALGORITHM])
+
+
+def _warm_openapi(app) -> None:
+    # Also builds the JSON schemas of every request and response model
+    app.openapi()
+
+
+def _warm_templates(templates) -> None:
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+
+
+def warm_up(app, engine: Engine, templates=None, db_connections: int = 1) -> Dict[str, float]:
+    """Run every warm-up step and return the milliseconds each one took."""
+    steps: Dict[str, Callable[[], None]] = {
+        "db_pool": lambda: _warm_db_pool(engine, db_connections),
+        "auth": _warm_auth,
+        "openapi": lambda: _warm_openapi(app),
+    }
+    if templates is not None:
+        steps["templates"] = lambda: _warm_templates(templates)
+
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:
+            logger.warning("Warm-up step %s failed: %s", name, exc)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+
+def configure_gc(thresholds: Optional[Sequence[int]] = None, freeze: bool = True) -> Dict[str, object]:
+    """Apply GC thresholds and freeze the objects allocated so far."""
+    if thresholds:
+        gc.set_threshold(*thresholds)
+    frozen = 0
+    if freeze:
+        # Collect first so garbage isn't made immortal
+        gc.collect()
+        gc.freeze()
+        frozen = gc.get_freeze_count()
+    thresholds_now: List[int] = list(gc.get_threshold())
+    return {"thresholds": thresholds_now, "frozen_objects": frozen}
@@ -1,13 +1,24 @@
 # app/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.loop_monitor import instrument_blocking_calls
+from app.core.metrics import TimedQueuePool, instrument_engine
+from app.core.query_stats import instrument_queries
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 # Create the default engine and sessionmaker
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+if make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "postgresql":
+    # Same QueuePool as the default, plus checkout wait times for /metrics
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool)
+else:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+instrument_engine(engine)
+instrument_queries(engine)
+instrument_blocking_calls(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
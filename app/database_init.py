@@ -1,6 +1,142 @@
+"""
+Database schema setup and the startup schema gate.
+
+Workers no longer run create_all on boot. ``ensure_schema`` does one of:
+
+- ``check`` (default): compare alembic_version with the migration scripts'
+  head and refuse to start on a mismatch
+- ``migrate``: run ``alembic upgrade head`` first, then check
+- ``create``: opt-in ``Base.metadata.create_all`` (tests, throwaway databases)
+- ``skip``: do nothing
+
+On Postgres, every mode except ``skip`` runs under a session advisory lock
+(SCHEMA_LOCK_KEY, see schema_lock), which alembic/env.py also takes, so
+workers booting during a deploy wait for a running migration instead of
+checking a half-migrated schema, and at most one of them migrates or
+creates at a time. A worker gives up with SchemaLockTimeout after
+SCHEMA_LOCK_TIMEOUT_SECONDS.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
 from app.database import engine
 from app.models.user import Base
 
+SCHEMA_MODES = ("check", "migrate", "create", "skip")
+# Arbitrary application-wide key for pg_advisory_lock ("calc" in ASCII)
+SCHEMA_LOCK_KEY = 0x63616C63
+SCHEMA_LOCK_POLL_SECONDS = 0.25
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+class SchemaMismatchError(RuntimeError):
+    """The database is not at the migration head this code expects."""
+
+
+class SchemaLockTimeout(RuntimeError):
+    """Another process held the schema lock for longer than the timeout."""
+
+
+@contextmanager
+def schema_lock(bind: Engine, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold the SCHEMA_LOCK_KEY advisory lock while the block runs.
+
+    The lock is polled with pg_try_advisory_lock on a dedicated AUTOCOMMIT
+    connection, so a waiting worker has no open transaction: a waiter blocked
+    in pg_advisory_lock inside a transaction holds a snapshot that CREATE
+    INDEX CONCURRENTLY in the running migration waits for, and neither side
+    can proceed. Raises SchemaLockTimeout after ``timeout`` seconds
+    (default SCHEMA_LOCK_TIMEOUT_SECONDS).
+    """
+    if timeout is None:
+        timeout = get_settings().SCHEMA_LOCK_TIMEOUT_SECONDS
+    deadline = time.monotonic() + timeout
+    with bind.execution_options(isolation_level="AUTOCOMMIT").connect() as connection:
+        while not connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY}
+        ).scalar():
+            if time.monotonic() >= deadline:
+                raise SchemaLockTimeout(
+                    f"Schema lock {SCHEMA_LOCK_KEY} still held by another process after {timeout:g}s"
+                )
+            time.sleep(SCHEMA_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(_ROOT / "alembic"))
+    return config
+
+
+def head_revisions() -> set:
+    """Head revision(s) of the migration scripts shipped with this code."""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(_alembic_config()).get_heads())
+
+
+def current_revisions(connection) -> set:
+    """Revision(s) recorded in the database's alembic_version table."""
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def ensure_schema(mode: str = "check", bind: Optional[Engine] = None) -> float:
+    """
+    Bring the schema gate to ``mode`` and return the seconds it took.
+
+    Raises SchemaMismatchError in check/migrate mode when the database is not
+    at the head revision.
+    """
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown schema mode: {mode}")
+    started = time.perf_counter()
+    if mode == "skip":
+        return 0.0
+
+    bind = bind or engine
+    # Advisory locks are Postgres-only; a local SQLite database has one writer anyway
+    use_lock = bind.dialect.name == "postgresql"
+    with schema_lock(bind) if use_lock else nullcontext(), bind.connect() as connection:
+        if mode == "create":
+            Base.metadata.create_all(bind=connection)
+            connection.commit()
+        else:
+            if mode == "migrate":
+                from alembic import command
+
+                config = _alembic_config()
+                config.attributes["database_url"] = bind.url.render_as_string(hide_password=False)
+                config.attributes["configure_logging"] = False
+                # This process already holds the lock env.py would take
+                config.attributes["schema_lock_held"] = True
+                command.upgrade(config, "head")
+            current, expected = current_revisions(connection), head_revisions()
+            connection.rollback()
+            if current != expected:
+                raise SchemaMismatchError(
+                    f"Database schema is at {sorted(current) or 'no revision'}, "
+                    f"this code expects {sorted(expected)}; run 'alembic upgrade head' "
+                    "(or set SCHEMA_STARTUP_MODE=migrate)"
+                )
+    return time.perf_counter() - started
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
@@ -8,4 +144,4 @@ def drop_db():
     Base.metadata.drop_all(bind=engine)
 
 if __name__ == "__main__":
-    init_db() # pragma: no cover
\ No newline at end of file
+    init_db() # pragma: no cover
@@ -1,32 +1,85 @@
+import os
+import time
+
+# Boot timing starts as soon as the app module is imported
+_IMPORT_STARTED = time.perf_counter()
+
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
-from fastapi import Body, FastAPI, Depends, HTTPException, status, Request
+from anyio import from_thread
+from fastapi import Body, FastAPI, Depends, HTTPException, Query, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.auth.dependencies import get_current_active_user
+from app.auth.keys import get_keyset
+from app.auth.last_login import start_flusher, stop_flusher
+from app.reports.jobs import (
+    shutdown_executor as shutdown_report_jobs,
+    start_cleanup as start_report_job_cleanup,
+    stop_cleanup as stop_report_job_cleanup,
+)
+from app.core.config import get_settings
+from app.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.core.metrics import MetricsMiddleware, mark_worker_dead, render_latest
+from app.core.openapi import install_openapi_cache
+from app.core.profiler import install_profiler
+from app.core.query_stats import QueryTimingMiddleware
+from app.core.warmup import configure_gc, warm_up
 from app.models.calculation import Calculation
 from app.models.user import User
-from app.schemas.calculation import CalculationBase, CalculationResponse, CalculationUpdate
+from app.schemas.calculation import CalculationBase, CalculationResponse, CalculationType, CalculationUpdate
 from app.schemas.token import TokenResponse
-from app.schemas.user import UserCreate, UserResponse, UserLogin
-from app.database import Base, get_db, engine
+from app.schemas.user import PasswordUpdate, UserCreate, UserResponse, UserLogin
+from app.database import engine, get_db
+from app.database_init import ensure_schema
 
 # ✅ Correct import for the reports router
 from app.reports.router import router as reports_router
+from app.reports.admin import router as admin_reports_router
+
+settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully!")
+    lifespan_started = time.perf_counter()
+    # Blocking startup work runs in the threadpool, off the event loop
+    schema_seconds = await run_in_threadpool(ensure_schema, settings.SCHEMA_STARTUP_MODE)
+    last_login_flusher = start_flusher()
+    report_job_cleanup = start_report_job_cleanup()
+    warmup_ms = {}
+    if settings.WARMUP_ON_STARTUP:
+        warmup_ms = await run_in_threadpool(
+            warm_up, app, engine, get_templates(), settings.WARMUP_DB_CONNECTIONS
+        )
+    app.state.gc = configure_gc(settings.GC_THRESHOLDS, settings.GC_FREEZE)
+    app.state.boot_timings = {
+        "imports_ms": round((lifespan_started - _IMPORT_STARTED) * 1000, 1),
+        "schema_ms": round(schema_seconds * 1000, 1),
+        "warmup_ms": warmup_ms,
+        "total_ms": round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1),
+    }
+    print(
+        f"Worker {os.getpid()} ready in {app.state.boot_timings['total_ms']} ms "
+        f"(imports {app.state.boot_timings['imports_ms']} ms, "
+        f"schema {settings.SCHEMA_STARTUP_MODE} {app.state.boot_timings['schema_ms']} ms, "
+        f"warm-up {round(sum(warmup_ms.values()), 1)} ms, "
+        f"gc frozen {app.state.gc['frozen_objects']} objects)"
+    )
+    app.state.loop_monitor = start_loop_monitor()
     yield
+    await stop_loop_monitor(app.state.loop_monitor)
+    await stop_flusher(last_login_flusher)
+    await stop_report_job_cleanup(report_job_cleanup)
+    shutdown_report_jobs()
+    mark_worker_dead()
 
 app = FastAPI(
     title="Calculations API",
@@ -36,47 +89,77 @@ app = FastAPI(
 )
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+
+
+@lru_cache()
+def get_templates():
+    """Jinja2 environment, built on the first page render (jinja2 is not needed to boot)."""
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory="templates")
 
 # ✅ Include the reports router
 app.include_router(reports_router, prefix="/reports", tags=["reports"])
+app.include_router(admin_reports_router, prefix="/admin/reports", tags=["admin"])
+install_openapi_cache(app, settings.OPENAPI_CACHE_PATH)
+app.add_middleware(QueryTimingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+install_profiler(app, settings.PROFILE_DIR)
 
 @app.get("/", response_class=HTMLResponse, tags=["web"])
 def read_index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return get_templates().TemplateResponse("index.html", {"request": request})
 
 @app.get("/login", response_class=HTMLResponse, tags=["web"])
 def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return get_templates().TemplateResponse("login.html", {"request": request})
 
 @app.get("/register", response_class=HTMLResponse, tags=["web"])
 def register_page(request: Request):
-    return templates.TemplateResponse("register.html", {"request": request})
+    return get_templates().TemplateResponse("register.html", {"request": request})
 
 @app.get("/dashboard", response_class=HTMLResponse, tags=["web"])
 def dashboard_page(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return get_templates().TemplateResponse("dashboard.html", {"request": request})
 
 @app.get("/dashboard/view/{calc_id}", response_class=HTMLResponse, tags=["web"])
 def view_calculation_page(request: Request, calc_id: str):
-    return templates.TemplateResponse("view_calculation.html", {"request": request, "calc_id": calc_id})
+    return get_templates().TemplateResponse("view_calculation.html", {"request": request, "calc_id": calc_id})
 
 @app.get("/dashboard/edit/{calc_id}", response_class=HTMLResponse, tags=["web"])
 def edit_calculation_page(request: Request, calc_id: str):
-    return templates.TemplateResponse("edit_calculation.html", {"request": request, "calc_id": calc_id})
+    return get_templates().TemplateResponse("edit_calculation.html", {"request": request, "calc_id": calc_id})
 
 @app.get("/health", tags=["health"])
 def read_health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_latest()
+    if body is None:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    return Response(content=body, media_type=content_type)
+
+@app.get("/.well-known/jwks.json", tags=["auth"])
+def read_jwks(response: Response):
+    """Public keys for verifying access tokens (empty when tokens are HS256-signed)."""
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_SECONDS}"
+    return get_keyset().jwks()
+
 @app.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["auth"])
 def register(user_create: UserCreate, db: Session = Depends(get_db)):
     user_data = user_create.dict(exclude={"confirm_password"})
     try:
         user = User.register(db, user_data)
+        # RETURNING already loaded every column; build the response before
+        # commit expires them so registration stays a single INSERT.
+        response = UserResponse.model_validate(user)
         db.commit()
-        db.refresh(user)
-        return user
+        return response
     except ValueError as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -125,6 +208,30 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
         )
     return {"access_token": auth_result["access_token"], "token_type": "bearer"}
 
+@app.post("/auth/logout-all", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+def logout_all(current_user = Depends(get_current_active_user)):
+    """Revoke every access and refresh token issued to the current user so far."""
+    from app.auth.jwt import revoke_user_tokens
+    from_thread.run(revoke_user_tokens, current_user.id)
+    return None
+
+@app.put("/auth/password", status_code=status.HTTP_204_NO_CONTENT, tags=["auth"])
+def change_password(
+    password_update: PasswordUpdate,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Change the current user's password and log out all of their sessions."""
+    from app.auth.jwt import revoke_user_tokens
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None or not user.verify_password(password_update.current_password):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
+
+    user.password = User.hash_password(password_update.new_password)
+    db.commit()
+    from_thread.run(revoke_user_tokens, user.id)
+    return None
+
 @app.post("/calculations", response_model=CalculationResponse, status_code=status.HTTP_201_CREATED, tags=["calculations"])
 def create_calculation(
     calculation_data: CalculationBase,
@@ -149,10 +256,28 @@ def create_calculation(
 
 @app.get("/calculations", response_model=List[CalculationResponse], tags=["calculations"])
 def list_calculations(
+    min_result: Optional[float] = Query(None, description="Only results >= this value"),
+    max_result: Optional[float] = Query(None, description="Only results <= this value"),
+    calc_type: Optional[CalculationType] = Query(None, alias="type"),
+    contains: Optional[List[float]] = Query(None, description="Only calculations using all of these operands"),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    return db.query(Calculation).filter(Calculation.user_id == current_user.id).all()
+    if min_result is not None and max_result is not None and min_result > max_result:
+        raise HTTPException(status_code=400, detail="min_result must not exceed max_result.")
+
+    query = db.query(Calculation).filter(Calculation.user_id == current_user.id)
+    # Range filters are served by ix_calculations_user_id_result
+    if min_result is not None:
+        query = query.filter(Calculation.result >= min_result)
+    if max_result is not None:
+        query = query.filter(Calculation.result <= max_result)
+    if calc_type is not None:
+        query = query.filter(Calculation.type == calc_type.value)
+    if contains:
+        # JSONB containment, served by ix_calculations_inputs_gin
+        query = query.filter(Calculation.inputs.contains(contains))
+    return query.all()
 
 @app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
 def get_calculation(
@@ -1,5 +1,10 @@
 # app/models/__init__.py
 from .user import User
 from .calculation import Calculation
+from .calculation_rollup import CalculationRollup
+from .calculation_sketch import CalculationResultSketch
+from .usage import UsageDailyCount, UsageDailyRegister
+from .report_job import ReportJob
 
-__all__ = ["User", "Calculation"]
+__all__ = ["User", "Calculation", "CalculationRollup", "CalculationResultSketch",
+           "UsageDailyCount", "UsageDailyRegister", "ReportJob"]
@@ -17,8 +17,8 @@ basic mathematical operations: addition, subtraction, multiplication, and divisi
 from datetime import datetime
 import uuid
 from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.ext.declarative import declared_attr
 from app.database import Base
@@ -94,12 +94,13 @@ class AbstractCalculation:
     @declared_attr
     def inputs(cls):
         """
-        JSON column storing the input values for the calculation.
+        JSONB column storing the input values for the calculation.
         
-        Using JSON type allows flexible storage of any number of inputs.
+        Using JSONB allows flexible storage of any number of inputs and
+        GIN-indexed containment searches (inputs @> '[19.99]').
         """
         return Column(
-            JSON, 
+            JSONB, 
             nullable=False
         )
 
@@ -224,6 +225,17 @@ class Calculation(Base, AbstractCalculation):
         "polymorphic_identity": "calculation",
         #"with_polymorphic": "*"  # Eager load all subclass columns (commented out)
     }
+    __table_args__ = (
+        # Per-user date range scans (reports, aggregations, recent history)
+        Index("ix_calculations_user_id_created_at", "user_id", "created_at"),
+        # Result-range filters and histograms
+        Index("ix_calculations_user_id_result", "user_id", "result"),
+        # Operand search: inputs @> '[19.99]'
+        Index(
+            "ix_calculations_inputs_gin", "inputs",
+            postgresql_using="gin", postgresql_ops={"inputs": "jsonb_path_ops"},
+        ),
+    )
 
 class Addition(Calculation):
     """
@@ -0,0 +1,85 @@
+# app/models/calculation_rollup.py
+"""
+Calculation Rollup Model Module
+
+Pre-aggregated calculation counts per user, time bucket and operation type.
+Time-series reports read these rows instead of running a date_trunc GROUP BY
+over the raw calculations table, so their cost depends on the number of
+buckets requested, not on the size of the user's history.
+
+Rollups are kept in step with the calculations table by ORM events: every
+inserted calculation adds 1 to its hourly and daily bucket, every deleted one
+subtracts 1. The updates run on the same connection, so they commit or roll
+back together with the calculation itself.
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, event
+from sqlalchemy.dialects.postgresql import UUID, insert as pg_insert
+from app.database import Base
+from app.models.calculation import Calculation
+
+# Granularities maintained on write. Coarser buckets (e.g. week) are derived
+# from the daily rows at query time.
+GRANULARITIES = ("hour", "day")
+
+
+def truncate(moment, granularity: str):
+    """Return the start of the bucket containing ``moment``."""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+class CalculationRollup(Base):
+    """
+    Count of a user's calculations of one type within one time bucket.
+
+    The composite primary key (user_id, granularity, bucket_start, type) is
+    also the index used by time-series range scans.
+    """
+    __tablename__ = "calculation_rollups"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    granularity = Column(String(8), primary_key=True)   # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)    # naive UTC, like Calculation.created_at
+    type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<CalculationRollup(user_id={self.user_id}, {self.granularity}="
+            f"{self.bucket_start}, type={self.type}, count={self.count})>"
+        )
+
+
+def _apply(connection, calculation, delta: int) -> None:
+    table = CalculationRollup.__table__
+    for granularity in GRANULARITIES:
+        stmt = pg_insert(table).values(
+            user_id=calculation.user_id,
+            granularity=granularity,
+            bucket_start=truncate(calculation.created_at, granularity),
+            type=calculation.type,
+            count=delta,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.granularity, table.c.bucket_start, table.c.type],
+            set_={"count": table.c.count + stmt.excluded.count},
+        )
+        connection.execute(stmt)
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+def _rollup_on_insert(mapper, connection, target) -> None:
+    _apply(connection, target, 1)
+
+
+@event.listens_for(Calculation, "after_delete", propagate=True)
+def _rollup_on_delete(mapper, connection, target) -> None:
+    _apply(connection, target, -1)
@@ -0,0 +1,105 @@
+# app/models/calculation_sketch.py
+"""
+Calculation Result Sketch Model Module
+
+One quantile sketch (see app.reports.sketches) of Calculation.result per user
+and operation type, so median/p95 reports never scan the calculations table.
+
+ORM events keep the sketches current on create, update and delete. Each change
+is a single INSERT ... ON CONFLICT DO UPDATE that increments one bucket with
+jsonb_set, so concurrent writers cannot lose updates, and the change commits
+or rolls back together with the calculation itself.
+"""
+
+import json
+import math
+
+from sqlalchemy import Column, String, ForeignKey, Integer, event, inspect, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+from app.models.calculation import Calculation
+from app.reports.sketches import bucket_path, DDSketch
+
+
+class CalculationResultSketch(Base):
+    """Serialized DDSketch of one user's results for one operation type."""
+    __tablename__ = "calculation_result_sketches"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sketch = Column(JSONB, nullable=False)
+
+    def to_sketch(self) -> DDSketch:
+        return DDSketch.from_dict(self.sketch)
+
+    def __repr__(self):
+        return f"<CalculationResultSketch(user_id={self.user_id}, type={self.type}, count={self.count})>"
+
+
+_BUCKET_DELTA = (
+    "count = calculation_result_sketches.count + :delta, "
+    "sketch = jsonb_set("
+    "calculation_result_sketches.sketch, CAST(:path AS text[]), "
+    "to_jsonb(COALESCE((calculation_result_sketches.sketch #>> CAST(:path AS text[]))::bigint, 0) + :delta), "
+    "true)"
+)
+
+_ADD = text(
+    "INSERT INTO calculation_result_sketches (user_id, type, count, sketch) "
+    "VALUES (:user_id, :type, :delta, CAST(:initial AS jsonb)) "
+    "ON CONFLICT (user_id, type) DO UPDATE SET " + _BUCKET_DELTA
+)
+
+_REMOVE = text(
+    "UPDATE calculation_result_sketches SET " + _BUCKET_DELTA +
+    " WHERE user_id = :user_id AND type = :type"
+)
+
+
+def _apply(connection, user_id, calc_type, value, delta: int) -> None:
+    if value is None or not math.isfinite(value):
+        return
+    params = {
+        "user_id": user_id,
+        "type": calc_type,
+        "delta": delta,
+        "path": "{" + ",".join(bucket_path(value)) + "}",
+    }
+    if delta > 0:
+        params["initial"] = json.dumps(DDSketch.of([value]).to_dict())
+        connection.execute(_ADD, params)
+    else:
+        connection.execute(_REMOVE, params)
+
+
+@event.listens_for(Calculation.result, "set", active_history=True, propagate=True)
+def _load_previous_result(target, value, oldvalue, initiator):
+    # Registering with active_history=True makes SQLAlchemy load the old
+    # result before it is overwritten, so _sketch_on_update can remove it.
+    return value
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+def _sketch_on_insert(mapper, connection, target) -> None:
+    _apply(connection, target.user_id, target.type, target.result, 1)
+
+
+@event.listens_for(Calculation, "after_update", propagate=True)
+def _sketch_on_update(mapper, connection, target) -> None:
+    history = inspect(target).attrs.result.history
+    if not history.has_changes():
+        return
+    for old in history.deleted:
+        _apply(connection, target.user_id, target.type, old, -1)
+    for new in history.added:
+        _apply(connection, target.user_id, target.type, new, 1)
+
+
+@event.listens_for(Calculation, "after_delete", propagate=True)
+def _sketch_on_delete(mapper, connection, target) -> None:
+    _apply(connection, target.user_id, target.type, target.result, -1)
@@ -0,0 +1,50 @@
+# app/models/report_job.py
+"""
+Report Job Model Module
+
+Long-running reports (full time series, exports) run in a background worker
+pool instead of inside the request (see app.reports.jobs). Each job is one
+row: clients create it, then poll it or follow its progress over
+Server-Sent Events, and read the finished report from ``result``.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+JOB_STATUSES = ("pending", "running", "succeeded", "failed")
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class ReportJob(Base):
+    """One background report requested by a user."""
+    __tablename__ = "report_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    kind = Column(String(50), nullable=False)
+    params = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pending")
+    progress = Column(Float, nullable=False, default=0.0)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # Refreshed while the owning process queues or runs the job (see app.reports.jobs)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def __repr__(self):
+        return f"<ReportJob(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -0,0 +1,80 @@
+# app/models/usage.py
+"""
+Usage Analytics Models Module
+
+System-wide, per-day aggregates for the admin reports:
+
+- UsageDailyCount: calculations created per day and operation type
+- UsageDailyRegister: HyperLogLog registers of the users who created or
+  edited a calculation that day (see app.reports.hll)
+
+Both are updated on the write path by ORM events on Calculation, with one
+upsert each, so admin queries never touch the calculations or users tables.
+A day's count of one type is split over USAGE_COUNT_SHARDS rows picked by
+user, so concurrent writes from different users do not all queue on one row
+lock; readers sum the shards.
+Deleting a calculation does not decrement the counters: they record activity,
+not the current table contents.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Date, String, Integer, SmallInteger, event, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import Base
+from app.models.calculation import Calculation
+from app.reports.hll import register_for
+
+USAGE_COUNT_SHARDS = 16
+
+
+class UsageDailyCount(Base):
+    """Number of calculations of one type created on one day (UTC), one shard of it."""
+    __tablename__ = "usage_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    type = Column(String(50), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0, server_default="0")
+    count = Column(Integer, nullable=False, default=0)
+
+
+class UsageDailyRegister(Base):
+    """One HyperLogLog register of the day's active users."""
+    __tablename__ = "usage_daily_registers"
+
+    day = Column(Date, primary_key=True)
+    register = Column(SmallInteger, primary_key=True)
+    rank = Column(SmallInteger, nullable=False)
+
+
+def _record_active_user(connection, day, user_id) -> None:
+    table = UsageDailyRegister.__table__
+    register, rank = register_for(user_id)
+    stmt = pg_insert(table).values(day=day, register=register, rank=rank)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.register],
+        set_={"rank": func.greatest(table.c.rank, stmt.excluded.rank)},
+        # Skip the row write entirely when the register would not change
+        where=table.c.rank < stmt.excluded.rank,
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+def _usage_on_insert(mapper, connection, target) -> None:
+    day = target.created_at.date()
+    table = UsageDailyCount.__table__
+    # The register hash is uniform over users, so it spreads them over the shards
+    shard = register_for(target.user_id)[0] % USAGE_COUNT_SHARDS
+    stmt = pg_insert(table).values(day=day, type=target.type, shard=shard, count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.type, table.c.shard],
+        set_={"count": table.c.count + 1},
+    )
+    connection.execute(stmt)
+    _record_active_user(connection, day, target.user_id)
+
+
+@event.listens_for(Calculation, "after_update", propagate=True)
+def _usage_on_update(mapper, connection, target) -> None:
+    _record_active_user(connection, datetime.utcnow().date(), target.user_id)
@@ -18,11 +18,16 @@ The User model is designed to follow security best practices:
 import uuid
 from datetime import datetime, timezone, timedelta
 from sqlalchemy import Column, String, Boolean, DateTime, or_
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
+from app.auth.last_login import buffer as last_login_buffer
+from app.auth.passwords import get_password_hash, verify_password
+from app.auth.tokens import create_token
 from app.core.config import get_settings
 from app.database import Base
 from app.models.calculation import Calculation
+from app.schemas.token import TokenType
 
 settings = get_settings()
 
@@ -143,7 +148,6 @@ class User(Base):
         Returns:
             bool: True if password matches, False otherwise
         """
-        from app.auth.jwt import verify_password
         return verify_password(plain_password, self.password)
 
     @classmethod
@@ -157,7 +161,6 @@ class User(Base):
         Returns:
             str: The hashed password
         """
-        from app.auth.jwt import get_password_hash
         return get_password_hash(password)
 
     @classmethod
@@ -170,7 +173,7 @@ class User(Base):
             user_data: Dictionary containing user registration data
             
         Returns:
-            User: The newly created user instance
+            User: The newly created user instance (already inserted, not yet committed)
             
         Raises:
             ValueError: If password is invalid or username/email already exists
@@ -179,25 +182,26 @@ class User(Base):
         if not password or len(password) < 6:
             raise ValueError("Password must be at least 6 characters long")
         
-        # Check for duplicate email or username
-        existing_user = db.query(cls).filter(
-            or_(cls.email == user_data["email"], cls.username == user_data["username"])
-        ).first()
-        if existing_user:
-            raise ValueError("Username or email already exists")
-        
-        # Create new user instance
-        hashed_password = cls.hash_password(password)
-        user = cls(
-            first_name=user_data["first_name"],
-            last_name=user_data["last_name"],
-            email=user_data["email"],
-            username=user_data["username"],
-            password=hashed_password,
-            is_active=True,
-            is_verified=False
+        # Single round trip: the unique indexes on email/username decide
+        # duplicates atomically, so concurrent registrations cannot race a
+        # separate pre-check. bcrypt only runs once the cheap validation passed.
+        stmt = (
+            pg_insert(cls)
+            .values(
+                first_name=user_data["first_name"],
+                last_name=user_data["last_name"],
+                email=user_data["email"],
+                username=user_data["username"],
+                password=cls.hash_password(password),
+                is_active=True,
+                is_verified=False
+            )
+            .on_conflict_do_nothing()
+            .returning(cls)
         )
-        db.add(user)
+        user = db.scalars(stmt).one_or_none()
+        if user is None:
+            raise ValueError("Username or email already exists")
         return user
 
     @classmethod
@@ -221,8 +225,15 @@ class User(Base):
             return None
 
         # Update the last_login timestamp
-        user.last_login = utcnow()
-        db.flush()
+        login_at = utcnow()
+        if last_login_buffer.enabled:
+            # Coalesced: written in batches by app.auth.last_login. Set the
+            # loaded value without marking the row dirty, so commit is a no-op.
+            last_login_buffer.record(user.id, login_at)
+            set_committed_value(user, "last_login", login_at)
+        else:
+            user.last_login = login_at
+            db.flush()
 
         # Generate tokens
         access_token = cls.create_access_token({"sub": str(user.id)})
@@ -248,8 +259,6 @@ class User(Base):
         Returns:
             str: JWT access token
         """
-        from app.auth.jwt import create_token
-        from app.schemas.token import TokenType
         return create_token(data["sub"], TokenType.ACCESS)
 
     @classmethod
@@ -263,8 +272,6 @@ class User(Base):
         Returns:
             str: JWT refresh token
         """
-        from app.auth.jwt import create_token
-        from app.schemas.token import TokenType
         return create_token(data["sub"], TokenType.REFRESH)
 
     @classmethod
@@ -278,10 +285,12 @@ class User(Base):
         Returns:
             UUID: User ID if token is valid, None otherwise
         """
-        from app.core.config import settings
+        from app.auth.keys import access_verification_key
         from jose import jwt, JWTError
         try:
-            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM])
+            payload = jwt.decode(
+                token, access_verification_key(token), algorithms=[settings.ALGORITHM]
+            )
             sub = payload.get("sub")
             if sub is None:
                 return None
@@ -0,0 +1,214 @@
+# app/provision_users.py
+"""
+Bulk user provisioning.
+
+Creates accounts from a CSV or NDJSON file without going through
+/auth/register once per user:
+
+    python -m app.provision_users users.csv --workers 8
+    python -m app.provision_users users.ndjson --batch-size 2000
+
+Each record needs first_name, last_name, email, username and password.
+Per batch the command:
+
+1. drops invalid records and users that already exist (one lookup per batch,
+   so re-running a partially loaded file does not re-hash anyone),
+2. hashes the remaining passwords in a process pool (bcrypt dominates the
+   cost; throughput scales with --workers and BCRYPT_ROUNDS),
+3. COPYs the rows into a temporary staging table and moves them into
+   ``users`` with INSERT ... SELECT ... ON CONFLICT DO NOTHING, so rows that
+   collide with concurrent registrations are skipped instead of failing.
+
+Progress is printed after every batch.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.auth.passwords import get_password_hash
+from app.database import engine as default_engine
+
+REQUIRED_FIELDS = ("first_name", "last_name", "email", "username", "password")
+STAGE_COLUMNS = ("id", "username", "email", "password", "first_name", "last_name")
+# varchar(50) in ``users`` and the staging table; a longer value would abort the COPY
+NAME_MAX_LENGTH = 50
+LENGTH_LIMITED_FIELDS = ("username", "first_name", "last_name")
+
+
+@dataclass
+class ProvisionReport:
+    processed: int = 0
+    inserted: int = 0
+    skipped: int = 0   # already existed (or lost a race with another insert)
+    invalid: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"processed={self.processed} inserted={self.inserted} "
+            f"skipped={self.skipped} invalid={self.invalid}"
+        )
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    """Yield user records from a .csv file or a newline-delimited JSON file."""
+    with path.open(newline="", encoding="utf-8") as fh:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _is_valid(record: dict) -> bool:
+    # NDJSON values can be numbers, booleans or null; only strings are accepted
+    if any(
+        not isinstance(record.get(name), str) or not record[name].strip()
+        for name in REQUIRED_FIELDS
+    ):
+        return False
+    if any(len(record[name]) > NAME_MAX_LENGTH for name in LENGTH_LIMITED_FIELDS):
+        return False
+    # Same rule as User.register
+    return len(record["password"]) >= 6
+
+
+def _batches(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _existing_keys(conn, batch: List[dict]) -> set:
+    rows = conn.execute(
+        text(
+            "SELECT email, username FROM users "
+            "WHERE email = ANY(:emails) OR username = ANY(:usernames)"
+        ),
+        {
+            "emails": [r["email"] for r in batch],
+            "usernames": [r["username"] for r in batch],
+        },
+    )
+    keys = set()
+    for email, username in rows:
+        keys.add(("email", email))
+        keys.add(("username", username))
+    return keys
+
+
+def _copy_batch(raw_conn, rows: List[tuple]) -> int:
+    """COPY ``rows`` into a staging table and insert them; returns rows inserted."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+
+    with raw_conn.cursor() as cur:
+        cur.execute(
+            "CREATE TEMP TABLE users_stage ("
+            f"id uuid, username varchar({NAME_MAX_LENGTH}), email varchar, password varchar, "
+            f"first_name varchar({NAME_MAX_LENGTH}), last_name varchar({NAME_MAX_LENGTH})"
+            ") ON COMMIT DROP"
+        )
+        cur.copy_expert(
+            f"COPY users_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+        cur.execute(
+            "INSERT INTO users (id, username, email, password, first_name, last_name, "
+            "is_active, is_verified, created_at, updated_at) "
+            "SELECT id, username, email, password, first_name, last_name, "
+            "true, false, now(), now() FROM users_stage "
+            "ON CONFLICT DO NOTHING"
+        )
+        inserted = cur.rowcount
+    raw_conn.commit()
+    return inserted
+
+
+def provision(
+    records: Iterable[dict],
+    engine: Optional[Engine] = None,
+    workers: int = 4,
+    batch_size: int = 1000,
+    progress: bool = True,
+) -> ProvisionReport:
+    """Load ``records`` into ``users``; see the module docstring."""
+    engine = engine or default_engine
+    report = ProvisionReport()
+    started = time.monotonic()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    raw_conn = engine.raw_connection()
+
+    try:
+        for batch in _batches(records, batch_size):
+            report.processed += len(batch)
+
+            valid = [r for r in batch if _is_valid(r)]
+            report.invalid += len(batch) - len(valid)
+
+            with engine.connect() as conn:
+                existing = _existing_keys(conn, valid) if valid else set()
+            fresh = [
+                r for r in valid
+                if ("email", r["email"]) not in existing
+                and ("username", r["username"]) not in existing
+            ]
+
+            passwords = [r["password"] for r in fresh]
+            if pool is not None:
+                hashes = list(pool.map(get_password_hash, passwords, chunksize=16))
+            else:
+                hashes = [get_password_hash(p) for p in passwords]
+
+            rows = [
+                (str(uuid.uuid4()), r["username"], r["email"], hashed,
+                 r["first_name"], r["last_name"])
+                for r, hashed in zip(fresh, hashes)
+            ]
+            inserted = _copy_batch(raw_conn, rows) if rows else 0
+            report.inserted += inserted
+            report.skipped += len(valid) - inserted
+
+            if progress:
+                rate = report.processed / max(time.monotonic() - started, 1e-9)
+                print(f"[provision] {report} ({rate:.0f} users/s)")
+    finally:
+        raw_conn.close()
+        if pool is not None:
+            pool.shutdown()
+
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> ProvisionReport:
+    parser = argparse.ArgumentParser(description="Bulk-create users from CSV or NDJSON.")
+    parser.add_argument("path", type=Path, help=".csv file, or newline-delimited JSON")
+    parser.add_argument("--workers", type=int, default=4, help="password hashing processes")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    report = provision(read_records(args.path), workers=args.workers, batch_size=args.batch_size)
+    print(f"[provision] done: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,47 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import require_admin
+from app.database import get_db
+from app.reports.service import build_usage_report
+from app.schemas.report import UsageReport
+
+# Bounds the work per request: one small aggregate per day in the range
+MAX_RANGE_DAYS = 366
+DEFAULT_RANGE_DAYS = 30
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get(
+    "/usage",
+    response_model=UsageReport,
+    summary="Get system-wide usage",
+    description=(
+        "Calculations per day, approximate distinct active users and type mix "
+        "across all users, served from daily rollups. Requires X-Admin-Key."
+    )
+)
+def get_usage(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve usage for an inclusive date range (default: the last 30 days).
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must not be after 'to'"
+        )
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {MAX_RANGE_DAYS} days"
+        )
+    return build_usage_report(db, start, end)
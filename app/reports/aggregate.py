@@ -0,0 +1,257 @@
+# app/reports/aggregate.py
+"""
+Declarative aggregations over a user's calculations.
+
+An AggregateQuery names group-by dimensions and metrics from fixed
+whitelists; compile_aggregate turns it into a single GROUP BY over the
+calculations table, always filtered by user_id (and created_at when a range
+is given, using ix_calculations_user_id_created_at). No client text reaches
+the SQL except as bound parameters.
+
+Cost limits, checked in this order:
+
+- at most 3 dimensions and AGGREGATE_MAX_ROWS groups per response
+- the "day" dimension covers at most AGGREGATE_MAX_DAYS days
+- the planner's estimated total cost must not exceed AGGREGATE_MAX_COST
+  (checked with EXPLAIN before running)
+- the query runs under statement_timeout = AGGREGATE_TIMEOUT_MS
+
+Results are cached per process for AGGREGATE_CACHE_SECONDS, keyed on the user
+and the normalized query, and a user's entries are dropped when one of their
+calculations changes through the ORM.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import Date, case, cast, event, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.metrics import record_cache
+from app.models.calculation import Calculation
+from app.reports.service import as_naive_utc
+from app.schemas.report import AggregateQuery, AggregateResponse
+
+DIMENSIONS = ("type", "day", "input_count_bucket")
+METRICS = ("count", "sum_result", "avg_result", "min_result", "max_result")
+INPUT_COUNT_BUCKETS = ("2", "3", "4-5", "6-10", "11+")
+
+_CACHE_MAX_ENTRIES = 1024
+_QUERY_CANCELED = "57014"
+
+
+class AggregateLimitError(ValueError):
+    """The query exceeds one of the aggregation cost limits."""
+
+
+def _dimension(name: str):
+    if name == "type":
+        return Calculation.type.label("type")
+    if name == "day":
+        return cast(Calculation.created_at, Date).label("day")
+    if name == "input_count_bucket":
+        n = func.jsonb_array_length(Calculation.inputs)
+        return case(
+            (n <= 2, "2"),
+            (n == 3, "3"),
+            (n <= 5, "4-5"),
+            (n <= 10, "6-10"),
+            else_="11+",
+        ).label("input_count_bucket")
+    raise ValueError(f"Unsupported dimension: {name}")
+
+
+def _metric(name: str):
+    if name == "count":
+        return func.count().label("count")
+    if name == "sum_result":
+        return func.sum(Calculation.result).label("sum_result")
+    if name == "avg_result":
+        return func.avg(Calculation.result).label("avg_result")
+    if name == "min_result":
+        return func.min(Calculation.result).label("min_result")
+    if name == "max_result":
+        return func.max(Calculation.result).label("max_result")
+    raise ValueError(f"Unsupported metric: {name}")
+
+
+def normalize(query: AggregateQuery) -> AggregateQuery:
+    """
+    Canonical form of a query: dimensions and metrics de-duplicated in a
+    fixed order, times as naive UTC, the day range bounded, and the limit
+    capped. Queries with the same normalized form share a cache entry.
+    """
+    settings = get_settings()
+    dimensions = [d for d in DIMENSIONS if d in query.dimensions]
+    metrics = [m for m in METRICS if m in query.metrics]
+    start, end = as_naive_utc(query.start), as_naive_utc(query.end)
+
+    if "day" in dimensions:
+        max_span = timedelta(days=settings.AGGREGATE_MAX_DAYS)
+        if start is None:
+            end = end or datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time())
+            start = end - max_span
+        elif (end or datetime.utcnow()) - start > max_span:
+            raise AggregateLimitError(
+                f"Grouping by day is limited to {settings.AGGREGATE_MAX_DAYS} days; narrow 'from'/'to'"
+            )
+    if start is not None and end is not None and start >= end:
+        raise AggregateLimitError("'from' must be before 'to'")
+
+    limit = min(query.limit or settings.AGGREGATE_MAX_ROWS, settings.AGGREGATE_MAX_ROWS)
+    return AggregateQuery(
+        dimensions=dimensions,
+        metrics=metrics,
+        start=start,
+        end=end,
+        type=query.type,
+        limit=limit,
+    )
+
+
+def compile_aggregate(user_id, query: AggregateQuery):
+    """Build the GROUP BY statement for a normalized query (one extra row detects truncation)."""
+    dims = [_dimension(name) for name in query.dimensions]
+    stmt = (
+        select(*dims, *[_metric(name) for name in query.metrics])
+        .select_from(Calculation)
+        .where(Calculation.user_id == user_id)
+    )
+    if query.start is not None:
+        stmt = stmt.where(Calculation.created_at >= query.start)
+    if query.end is not None:
+        stmt = stmt.where(Calculation.created_at < query.end)
+    if query.type is not None:
+        stmt = stmt.where(Calculation.type == query.type.value)
+    if dims:
+        stmt = stmt.group_by(*dims).order_by(*dims)
+    return stmt.limit(query.limit + 1)
+
+
+def estimated_cost(db: Session, stmt) -> float:
+    """Planner's total cost estimate for ``stmt``."""
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return float(plan[0]["Plan"]["Total Cost"])
+
+
+# (user id, normalized query) -> (response, cached_at)
+_CACHE: "OrderedDict[Tuple[str, str], Tuple[AggregateResponse, float]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(user_id, query: AggregateQuery) -> Tuple[str, str]:
+    return str(user_id), query.model_dump_json(by_alias=True)
+
+
+def _cache_get(key) -> Optional[AggregateResponse]:
+    ttl = get_settings().AGGREGATE_CACHE_SECONDS
+    if ttl <= 0:
+        return None
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        response, cached_at = entry
+        if time.monotonic() - cached_at > ttl:
+            del _CACHE[key]
+            return None
+        _CACHE.move_to_end(key)
+        return response
+
+
+def _cache_put(key, response: AggregateResponse) -> None:
+    if get_settings().AGGREGATE_CACHE_SECONDS <= 0:
+        return
+    with _CACHE_LOCK:
+        _CACHE[key] = (response, time.monotonic())
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _CACHE_MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+def invalidate_user(user_id) -> None:
+    """Drop every cached aggregation of ``user_id``."""
+    prefix = str(user_id)
+    with _CACHE_LOCK:
+        for key in [k for k in _CACHE if k[0] == prefix]:
+            del _CACHE[key]
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if value is not None and not isinstance(value, (int, float, str)):
+        return float(value)  # Decimal from sum/avg
+    return value
+
+
+def run_aggregate(db: Session, user_id, query: AggregateQuery) -> AggregateResponse:
+    """
+    Run (or serve from cache) an aggregation of the user's calculations.
+
+    Raises AggregateLimitError when the query exceeds a cost limit.
+    """
+    settings = get_settings()
+    query = normalize(query)
+    key = _cache_key(user_id, query)
+    cached = _cache_get(key)
+    record_cache("aggregate", hit=cached is not None)
+    if cached is not None:
+        return cached.model_copy(update={"cached": True})
+
+    stmt = compile_aggregate(user_id, query)
+    cost = estimated_cost(db, stmt)
+    if cost > settings.AGGREGATE_MAX_COST:
+        raise AggregateLimitError(
+            f"Query is too expensive (estimated cost {cost:.0f} > {settings.AGGREGATE_MAX_COST:.0f}); "
+            "narrow the date range or use fewer dimensions"
+        )
+
+    # set_config(..., true) is SET LOCAL; the previous value is restored
+    # afterwards so the caller's transaction keeps its own timeout.
+    previous = db.execute(
+        text("SELECT current_setting('statement_timeout'), set_config('statement_timeout', :timeout, true)"),
+        {"timeout": str(settings.AGGREGATE_TIMEOUT_MS)},
+    ).scalar()
+    try:
+        rows = db.execute(stmt).mappings().all()
+    except DBAPIError as exc:
+        db.rollback()
+        if getattr(exc.orig, "pgcode", None) == _QUERY_CANCELED:
+            raise AggregateLimitError("Query exceeded the time limit; narrow the date range") from exc
+        raise
+    db.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": previous})
+
+    truncated = len(rows) > query.limit
+    response = AggregateResponse(
+        dimensions=query.dimensions,
+        metrics=query.metrics,
+        rows=[{k: _plain(v) for k, v in row.items()} for row in rows[:query.limit]],
+        truncated=truncated,
+    )
+    _cache_put(key, response)
+    return response
+
+
+@event.listens_for(Calculation, "after_insert", propagate=True)
+@event.listens_for(Calculation, "after_update", propagate=True)
+@event.listens_for(Calculation, "after_delete", propagate=True)
+def _invalidate_on_change(mapper, connection, target) -> None:
+    invalidate_user(target.user_id)
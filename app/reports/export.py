@@ -0,0 +1,152 @@
+# app/reports/export.py
+"""
+Columnar export of a user's calculation history.
+
+Rows are read with a server-side cursor (``yield_per``) and converted to
+Arrow record batches one partition at a time, and each encoded batch is
+yielded as soon as it is written, so memory stays bounded by the batch size
+regardless of history length.
+
+Formats:
+
+- ``arrow``: Arrow IPC stream format (``pyarrow.ipc.open_stream``, DuckDB's
+  arrow extension)
+- ``parquet``: one row group per batch (``pandas.read_parquet``,
+  ``duckdb.read_parquet``)
+
+pyarrow is an optional dependency; ARROW_AVAILABLE is False without it. It is
+only imported on the first export, not when workers boot.
+"""
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.calculation import Calculation
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pyarrow as pa
+
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def export_schema() -> "pa.Schema":
+    import pyarrow as pa
+
+    return pa.schema([
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("type", pa.string(), nullable=False),
+        pa.field("inputs", pa.list_(pa.float64()), nullable=False),
+        pa.field("result", pa.float64()),
+        pa.field("created_at", pa.timestamp("us", tz="UTC"), nullable=False),
+        pa.field("updated_at", pa.timestamp("us", tz="UTC"), nullable=False),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _to_batch(rows, schema) -> "pa.RecordBatch":
+    import pyarrow as pa
+
+    # Timestamps are stored as naive UTC
+    return pa.record_batch([
+        pa.array([str(r.id) for r in rows], pa.string()),
+        pa.array([r.type for r in rows], pa.string()),
+        pa.array([[float(v) for v in r.inputs or []] for r in rows], pa.list_(pa.float64())),
+        pa.array([r.result for r in rows], pa.float64()),
+        pa.array([r.created_at for r in rows], pa.timestamp("us", tz="UTC")),
+        pa.array([r.updated_at for r in rows], pa.timestamp("us", tz="UTC")),
+    ], schema=schema)
+
+
+def iter_export(
+    user_id,
+    fmt: str = "arrow",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    calc_type: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield an encoded export of the user's calculations, oldest first.
+
+    Opens its own session so it can be consumed by a StreamingResponse after
+    the request's dependencies have been closed.
+    """
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is not installed")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = export_schema()
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode="w")
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(stream, schema)
+    else:
+        writer = pq.ParquetWriter(stream, schema)
+
+    query = (
+        select(
+            Calculation.id, Calculation.type, Calculation.inputs, Calculation.result,
+            Calculation.created_at, Calculation.updated_at,
+        )
+        .where(Calculation.user_id == user_id)
+        .order_by(Calculation.created_at, Calculation.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if start is not None:
+        query = query.where(Calculation.created_at >= start)
+    if end is not None:
+        query = query.where(Calculation.created_at < end)
+    if calc_type is not None:
+        query = query.where(Calculation.type == calc_type)
+
+    db = SessionLocal()
+    try:
+        for rows in db.execute(query).partitions():
+            if fmt == "arrow":
+                writer.write_batch(_to_batch(rows, schema))
+            else:
+                writer.write_batch(_to_batch(rows, schema), row_group_size=batch_size)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        stream.close()
+        yield sink.drain()
+    finally:
+        db.close()
@@ -0,0 +1,307 @@
+# app/reports/jobs.py
+"""
+Background report jobs.
+
+A job is a ReportJob row plus a callable registered in JOB_KINDS. submit_job
+stores the row and hands its id to a thread pool; the worker opens its own
+session, runs the report, reports progress by committing the ``progress``
+column, and finally stores the JSON result (or the error) on the row.
+Because state lives in the database, any API worker can answer status and
+event-stream requests for a job started by another one.
+
+Jobs still pending or running when the process exits are not resumed. A
+cleanup task in the app lifespan (start_cleanup) runs at startup and then
+every REPORT_JOB_CLEANUP_SECONDS: it refreshes the heartbeat of the jobs its own
+process has queued or is running, marks unfinished jobs whose heartbeat is
+older than REPORT_JOB_STALE_MINUTES as failed (their worker exited, so
+clients stop waiting and resubmit), and deletes finished jobs
+REPORT_JOB_TTL_HOURS after they finished.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.database import SessionLocal
+from app.models.calculation_rollup import CalculationRollup
+from app.models.report_job import FINISHED_STATUSES, ReportJob
+from app.reports.service import as_naive_utc, build_report_summary, build_timeseries
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[float], None]
+JobRunner = Callable[[Session, Any, Dict[str, Any], Progress], Dict[str, Any]]
+
+# Time-series jobs are computed in windows of this size so progress can be
+# reported between them.
+TIMESERIES_WINDOWS = {"hour": timedelta(days=31), "day": timedelta(days=366), "week": timedelta(days=7 * 52)}
+
+
+def _run_summary(db: Session, user_id, params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    return build_report_summary(db, user_id).model_dump(mode="json")
+
+
+def _parse_moment(value: Optional[str]) -> Optional[datetime]:
+    return as_naive_utc(datetime.fromisoformat(value)) if value else None
+
+
+def _run_timeseries(db: Session, user_id, params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    bucket = params.get("bucket", "day")
+    if bucket not in TIMESERIES_WINDOWS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    start, end = _parse_moment(params.get("from")), _parse_moment(params.get("to"))
+    calc_type = params.get("type")
+
+    if start is None or end is None:
+        first, last = db.query(
+            func.min(CalculationRollup.bucket_start), func.max(CalculationRollup.bucket_start)
+        ).filter(CalculationRollup.user_id == user_id).one()
+        if first is None:
+            return build_timeseries(db, user_id, bucket=bucket, start=start, end=end, calc_type=calc_type).model_dump(mode="json")
+        start = start or first
+        end = end or last + timedelta(days=1)
+
+    window = TIMESERIES_WINDOWS[bucket]
+    if bucket == "week":
+        # Align windows to Monday so no week is split between two windows
+        start = (start - timedelta(days=start.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    total = max(end - start, timedelta(microseconds=1))
+
+    points = []
+    cursor = start
+    while cursor < end:
+        upper = min(cursor + window, end)
+        chunk = build_timeseries(db, user_id, bucket=bucket, start=cursor, end=upper, calc_type=calc_type)
+        points.extend(point.model_dump(mode="json") for point in chunk.points)
+        cursor = upper
+        progress((cursor - start) / total)
+    return {"bucket": bucket, "points": points}
+
+
+JOB_KINDS: Dict[str, JobRunner] = {
+    "summary": _run_summary,
+    "timeseries": _run_timeseries,
+}
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """Return the shared worker pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().REPORT_JOB_WORKERS,
+                thread_name_prefix="report-job",
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop accepting jobs and drop queued ones; running jobs finish in the background."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# Ids of the jobs this process has queued or is running; their heartbeat is
+# refreshed by every cleanup run so no other process takes them for orphans
+_live_jobs: set = set()
+_live_jobs_lock = threading.Lock()
+
+
+class JobAbandoned(Exception):
+    """The job's row was failed by the cleanup while this process still ran it."""
+
+
+def submit_job(
+    db: Session,
+    user_id,
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+    executor: Optional[Executor] = None,
+) -> ReportJob:
+    """Persist a pending job and queue it on the worker pool."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown report job kind: {kind}")
+    job = ReportJob(
+        user_id=user_id, kind=kind, params=params or {}, status="pending", progress=0.0,
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    with _live_jobs_lock:
+        _live_jobs.add(job.id)
+    (executor or get_executor()).submit(run_job, job.id)
+    return job
+
+
+def _update_job(db: Session, job_id, expected_status: str, **values) -> bool:
+    """Update the job only if it is still in ``expected_status``; True if it was."""
+    updated = (
+        db.query(ReportJob)
+        .filter(ReportJob.id == job_id, ReportJob.status == expected_status)
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
+
+def run_job(job_id) -> None:
+    """
+    Execute one job in the calling thread, recording its outcome on the row.
+
+    Every status change is conditional on the previous status, so a job the
+    cleanup already failed is neither started nor overwritten afterwards.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(ReportJob, job_id)
+        if job is None:
+            return
+        kind, user_id, params = job.kind, job.user_id, job.params or {}
+        now = datetime.utcnow()
+        if not _update_job(db, job_id, "pending", status="running", started_at=now, heartbeat_at=now):
+            return
+
+        def progress(fraction: float) -> None:
+            if not _update_job(
+                db, job_id, "running",
+                progress=round(min(max(fraction, 0.0), 1.0), 4), heartbeat_at=datetime.utcnow(),
+            ):
+                raise JobAbandoned(job_id)
+
+        try:
+            result = JOB_KINDS[kind](db, user_id, params, progress)
+        except JobAbandoned:
+            logger.warning("Report job %s was failed by the cleanup while running; stopped", job_id)
+            return
+        except Exception as exc:
+            logger.exception("Report job %s failed", job_id)
+            db.rollback()
+            outcome = {"status": "failed", "error": str(exc) or exc.__class__.__name__}
+        else:
+            outcome = {"status": "succeeded", "progress": 1.0, "result": result}
+        if not _update_job(db, job_id, "running", finished_at=datetime.utcnow(), **outcome):
+            logger.warning("Report job %s was failed by the cleanup before it finished", job_id)
+    finally:
+        with _live_jobs_lock:
+            _live_jobs.discard(job_id)
+        db.close()
+
+
+def touch_live_jobs(db: Session) -> int:
+    """Refresh the heartbeat of the unfinished jobs queued or run by this process."""
+    with _live_jobs_lock:
+        job_ids = list(_live_jobs)
+    if not job_ids:
+        return 0
+    count = (
+        db.query(ReportJob)
+        .filter(ReportJob.id.in_(job_ids), ReportJob.status.notin_(FINISHED_STATUSES))
+        .update({ReportJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def fail_orphaned_jobs(db: Session, older_than: timedelta) -> int:
+    """
+    Mark unfinished jobs whose heartbeat is older than ``older_than`` as failed.
+
+    The heartbeat is set when a job is queued, started and reports progress,
+    and by every cleanup run of the process that owns it (touch_live_jobs),
+    so only jobs of a worker that exited go stale. Without this their
+    clients would poll them forever.
+    """
+    cutoff = datetime.utcnow() - older_than
+    count = (
+        db.query(ReportJob)
+        .filter(
+            ReportJob.status.notin_(FINISHED_STATUSES),
+            func.coalesce(ReportJob.heartbeat_at, ReportJob.created_at) < cutoff,
+        )
+        .update(
+            {
+                ReportJob.status: "failed",
+                ReportJob.error: "Interrupted by a worker restart; resubmit the job",
+                ReportJob.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return count
+
+
+def purge_finished_jobs(db: Session, older_than: timedelta) -> int:
+    """Delete jobs that finished more than ``older_than`` ago."""
+    count = (
+        db.query(ReportJob)
+        .filter(ReportJob.status.in_(FINISHED_STATUSES), ReportJob.finished_at < datetime.utcnow() - older_than)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def cleanup_jobs() -> Tuple[int, int]:
+    """Run touch_live_jobs, fail_orphaned_jobs and purge_finished_jobs with the configured ages."""
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        touch_live_jobs(db)
+        failed = fail_orphaned_jobs(db, timedelta(minutes=settings.REPORT_JOB_STALE_MINUTES))
+        purged = purge_finished_jobs(db, timedelta(hours=settings.REPORT_JOB_TTL_HOURS))
+    finally:
+        db.close()
+    if failed or purged:
+        logger.info("Report job cleanup: %d orphaned job(s) failed, %d finished job(s) deleted", failed, purged)
+    return failed, purged
+
+
+async def _cleanup_periodically(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, cleanup_jobs)
+        except Exception:
+            logger.exception("Report job cleanup failed")
+        await asyncio.sleep(interval)
+
+
+def start_cleanup() -> asyncio.Task:
+    """Start the cleanup task; its first run happens right away (startup recovery)."""
+    return asyncio.create_task(_cleanup_periodically(get_settings().REPORT_JOB_CLEANUP_SECONDS))
+
+
+async def stop_cleanup(task: Optional[asyncio.Task]) -> None:
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def get_job(db: Session, job_id, user_id) -> Optional[ReportJob]:
+    """Return the job if it exists and belongs to ``user_id``."""
+    return (
+        db.query(ReportJob)
+        .filter(ReportJob.id == job_id, ReportJob.user_id == user_id)
+        .first()
+    )
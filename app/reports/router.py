@@ -1,23 +1,313 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import Field
 from sqlalchemy.orm import Session
 
 from app.auth.dependencies import get_current_active_user
-from app.database import get_db
+from app.core.config import get_settings
+from app.database import get_db, SessionLocal
+from app.models.report_job import FINISHED_STATUSES
 from app.models.user import User
-from app.reports.service import build_report_summary
+from app.reports.aggregate import AggregateLimitError, run_aggregate
+from app.reports.export import ARROW_AVAILABLE, EXPORT_FORMATS, iter_export
+from app.reports.jobs import get_job, submit_job
+from app.reports.service import (
+    as_naive_utc,
+    build_approx_report_summary,
+    build_report_summary,
+    build_timeseries,
+    build_quantile_report,
+    build_result_histogram,
+)
+from app.schemas.calculation import CalculationType
+from app.schemas.report import (
+    ReportSummary,
+    TimeSeriesResponse,
+    QuantileReport,
+    ReportJobCreate,
+    ReportJobRead,
+    AggregateQuery,
+    AggregateResponse,
+    HistogramResponse,
+)
 
 router = APIRouter()
 
 @router.get(
     "/summary",
+    response_model=ReportSummary,
+    # Plain summaries keep their original shape; the approx fields appear
+    # only when approx=true
+    response_model_exclude_unset=True,
     summary="Get calculation summary",
-    description="JWT-secured endpoint returning calculation statistics."
+    description=(
+        "JWT-secured endpoint returning calculation statistics. With approx=true, "
+        "counts come from rollups and average_operands is estimated from a table "
+        "sample to within roughly the given relative error, with a 95% confidence interval."
+    )
 )
 def get_summary(
+    approx: bool = Query(False),
+    error: Optional[float] = Query(None, gt=0, lt=1),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve a summary of calculations for the authenticated user.
     """
+    if approx:
+        return build_approx_report_summary(db, current_user.id, error=error)
     return build_report_summary(db, current_user.id)
+
+
+@router.get(
+    "/timeseries",
+    response_model=TimeSeriesResponse,
+    summary="Get calculation counts over time",
+    description="Calculations per hour, day or week and type, served from rollup tables."
+)
+def get_timeseries(
+    bucket: Literal["hour", "day", "week"] = Query("day"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    calc_type: Optional[CalculationType] = Query(None, alias="type"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve calculation counts per time bucket for the authenticated user.
+    """
+    return build_timeseries(
+        db,
+        current_user.id,
+        bucket=bucket,
+        start=start,
+        end=end,
+        calc_type=calc_type.value if calc_type else None,
+    )
+
+
+@router.get(
+    "/quantiles",
+    response_model=QuantileReport,
+    summary="Get result quantiles",
+    description=(
+        "Approximate quantiles (default median and p95) of calculation results per "
+        "operation type, read from streaming sketches. Each estimate is within "
+        "relative_accuracy of the exact value."
+    )
+)
+def get_quantiles(
+    q: List[Annotated[float, Field(ge=0, le=1)]] = Query([0.5, 0.95]),
+    calc_type: Optional[CalculationType] = Query(None, alias="type"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve result quantiles per operation type for the authenticated user.
+    """
+    return build_quantile_report(
+        db,
+        current_user.id,
+        quantiles=q,
+        calc_type=calc_type.value if calc_type else None,
+    )
+
+
+@router.get(
+    "/histogram",
+    response_model=HistogramResponse,
+    summary="Get result histogram",
+    description=(
+        "Equal-width histogram of calculation results, computed with width_bucket "
+        "in one query. Bounds default to the smallest and largest result."
+    )
+)
+def get_histogram(
+    buckets: int = Query(10, ge=1, le=100),
+    min_result: Optional[float] = Query(None, alias="min"),
+    max_result: Optional[float] = Query(None, alias="max"),
+    calc_type: Optional[CalculationType] = Query(None, alias="type"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve the distribution of results for the authenticated user.
+    """
+    if min_result is not None and max_result is not None and min_result > max_result:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'min' must not exceed 'max'")
+    return build_result_histogram(
+        db,
+        current_user.id,
+        buckets=buckets,
+        min_result=min_result,
+        max_result=max_result,
+        calc_type=calc_type.value if calc_type else None,
+    )
+
+
+@router.post(
+    "/aggregate",
+    response_model=AggregateResponse,
+    summary="Aggregate calculations",
+    description=(
+        "Group the user's calculations by type, day and/or input_count_bucket and compute "
+        "count and sum/avg/min/max of result in one query. Expensive queries are refused "
+        "with 400; results are cached briefly."
+    )
+)
+def aggregate_calculations(
+    query: AggregateQuery,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run an ad-hoc aggregation over the authenticated user's calculations.
+    """
+    try:
+        return run_aggregate(db, current_user.id, query)
+    except AggregateLimitError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get(
+    "/export",
+    summary="Export calculation history",
+    description=(
+        "Columnar export of the user's calculations as an Arrow IPC stream or Parquet "
+        "file (inputs as list<double>, timestamps in UTC), streamed in batches."
+    ),
+    response_class=StreamingResponse
+)
+def export_calculations(
+    fmt: Literal["arrow", "parquet"] = Query("parquet", alias="format"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    calc_type: Optional[CalculationType] = Query(None, alias="type"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Export the authenticated user's calculations oldest first.
+    """
+    if not ARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Export requires pyarrow, which is not installed"
+        )
+    media_type, extension = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        iter_export(
+            current_user.id,
+            fmt,
+            start=as_naive_utc(start),
+            end=as_naive_utc(end),
+            calc_type=calc_type.value if calc_type else None,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="calculations.{extension}"'},
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=ReportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start a background report",
+    description="Queue a long-running report; poll GET /reports/jobs/{id} or follow /events for progress."
+)
+def create_report_job(
+    job_in: ReportJobCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create a report job for the authenticated user.
+    """
+    return submit_job(db, current_user.id, job_in.kind, job_in.params)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ReportJobRead,
+    summary="Get a background report",
+    description="Status, progress and, once finished, the result of a report job."
+)
+def read_report_job(
+    job_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieve one of the authenticated user's report jobs.
+    """
+    job = get_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+def _load_job(job_id: UUID, user_id) -> Optional[ReportJobRead]:
+    db = SessionLocal()
+    try:
+        job = get_job(db, job_id, user_id)
+        return ReportJobRead.model_validate(job) if job else None
+    finally:
+        db.close()
+
+
+def _sse(event: str, job: ReportJobRead) -> str:
+    return f"event: {event}\ndata: {json.dumps(job.model_dump(mode='json'))}\n\n"
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    summary="Stream report progress",
+    description=(
+        "Server-Sent Events: a 'progress' event whenever the job's status or progress "
+        "changes, then one 'succeeded' or 'failed' event with the final job."
+    )
+)
+async def stream_report_job(
+    job_id: UUID,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream progress of one of the authenticated user's report jobs.
+    """
+    job = await run_in_threadpool(_load_job, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    interval = get_settings().REPORT_JOB_POLL_SECONDS
+
+    async def events():
+        current, last_seen, last_sent = job, None, time.monotonic()
+        while True:
+            state = (current.status, current.progress)
+            if current.status in FINISHED_STATUSES:
+                yield _sse(current.status, current)
+                return
+            if state != last_seen:
+                yield _sse("progress", current)
+                last_seen, last_sent = state, time.monotonic()
+            elif time.monotonic() - last_sent > 15:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(interval)
+            current = await run_in_threadpool(_load_job, job_id, current_user.id)
+            if current is None:
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,36 @@
+import math
+from datetime import date, datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Float, case, func, literal, select, tablesample, text, true
+from app.core.config import get_settings
 from app.models.calculation import Calculation
-from app.schemas.report import ReportSummary, RecentCalculation
+from app.models.calculation_rollup import CalculationRollup
+from app.models.calculation_sketch import CalculationResultSketch
+from app.models.usage import UsageDailyCount, UsageDailyRegister
+from app.reports import hll
+from app.reports.sketches import RELATIVE_ACCURACY
+from app.schemas.report import (
+    ConfidenceInterval,
+    ReportSummary,
+    RecentCalculation,
+    TimeSeriesPoint,
+    TimeSeriesResponse,
+    TypeQuantiles,
+    QuantileReport,
+    UsageDay,
+    UsageReport,
+    HistogramBucket,
+    HistogramResponse,
+)
+
+TIMESERIES_BUCKETS = ("hour", "day", "week")
+
+# Approximate summaries
+_Z_95 = 1.959964
+_APPROX_CV = 0.5
+_APPROX_MIN_SAMPLE = 1000
 
 
 def build_report_summary(db: Session, user_id: str) -> ReportSummary:
@@ -25,21 +53,29 @@ def build_report_summary(db: Session, user_id: str) -> ReportSummary:
         .all()
     )
 
-    # Average number of inputs (works with JSON)
+    # Average number of inputs
     avg_inputs = db.query(
-        func.avg(func.jsonb_array_length(cast(Calculation.inputs, JSONB)))
+        func.avg(func.jsonb_array_length(Calculation.inputs))
     ).filter(Calculation.user_id == user_id).scalar() or 0
 
-    # Most recent 5 calculations
+    return ReportSummary(
+        total_calculations=total_count,
+        counts_by_operation=counts_by_operation,
+        average_operands=round(float(avg_inputs), 2),
+        recent_calculations=_recent_calculations(db, user_id)
+    )
+
+
+def _recent_calculations(db: Session, user_id: str, limit: int = 5) -> List[RecentCalculation]:
+    """Most recent calculations, newest first."""
     recent_calcs = (
         db.query(Calculation)
         .filter(Calculation.user_id == user_id)
         .order_by(Calculation.created_at.desc())
-        .limit(5)
+        .limit(limit)
         .all()
     )
-
-    recent_calcs_schema = [
+    return [
         RecentCalculation(
             id=calc.id,
             type=calc.type,
@@ -50,9 +86,309 @@ def build_report_summary(db: Session, user_id: str) -> ReportSummary:
         for calc in recent_calcs
     ]
 
+
+def _sample_operand_counts(db: Session, user_id: str, percent: float) -> Tuple[int, float, float]:
+    """
+    (rows, mean, sample standard deviation) of the number of inputs over a
+    TABLESAMPLE SYSTEM sample of ``percent`` % of the calculations pages.
+    """
+    sampled = tablesample(Calculation.__table__, func.system(percent), name="sampled")
+    operands = func.jsonb_array_length(sampled.c.inputs)
+    rows, mean, stddev = db.execute(
+        select(func.count(), func.avg(operands), func.stddev_samp(operands))
+        .where(sampled.c.user_id == user_id)
+    ).one()
+    return rows, float(mean or 0), float(stddev or 0)
+
+
+def _estimated_table_rows(db: Session) -> float:
+    """Planner estimate of the calculations row count (pg_class.reltuples, -1 before the first ANALYZE)."""
+    rows = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": Calculation.__tablename__},
+    ).scalar()
+    return float(rows if rows is not None else -1)
+
+
+def build_approx_report_summary(
+    db: Session,
+    user_id: str,
+    error: Optional[float] = None,
+) -> ReportSummary:
+    """
+    Summary report that avoids scanning the user's whole history.
+
+    Counts are exact and read from the daily rollups. average_operands is
+    estimated from a TABLESAMPLE SYSTEM sample sized so that the 95%
+    confidence interval's half-width is about ``error`` times the estimate
+    (relative); if the first sample misses that target it is resized once.
+    The sample is a share of the whole table's pages, so it reads that share
+    of pg_class.reltuples rows to find the same share of the user's rows.
+    Histories smaller than APPROX_MIN_ROWS, and users whose share of the
+    table is so small that the sample would read more rows than their
+    history has, are computed exactly with the indexed queries
+    (approximate=False).
+
+    SYSTEM samples whole pages, so rows stored together are sampled
+    together; the interval assumes a user's rows are spread over many pages.
+    """
+    settings = get_settings()
+    error = error or settings.APPROX_DEFAULT_ERROR
+
+    counts_by_operation = {
+        calc_type: int(count)
+        for calc_type, count in db.query(CalculationRollup.type, func.sum(CalculationRollup.count))
+        .filter(CalculationRollup.user_id == user_id, CalculationRollup.granularity == "day")
+        .group_by(CalculationRollup.type)
+        .having(func.sum(CalculationRollup.count) > 0)
+        .all()
+    }
+    total = sum(counts_by_operation.values())
+
+    def exact() -> ReportSummary:
+        summary = build_report_summary(db, user_id)
+        return summary.model_copy(update={"approximate": False, "sample_size": summary.total_calculations})
+
+    if total < settings.APPROX_MIN_ROWS:
+        return exact()
+
+    # Initial size assumes a coefficient of variation of _APPROX_CV for the
+    # number of inputs; the first sample corrects it.
+    target = max(_APPROX_MIN_SAMPLE, math.ceil((_Z_95 * _APPROX_CV / error) ** 2))
+    percent = 100.0 * target / total
+    # The table holds at least this user's rows, even if it was never analyzed
+    table_rows = max(_estimated_table_rows(db), total)
+    n, mean, half_width = 0, 0.0, 0.0
+    for _ in range(2):
+        if percent / 100 * table_rows >= total:
+            return exact()
+        n, mean, stddev = _sample_operand_counts(db, user_id, percent)
+        if n < 2 or mean == 0:
+            percent *= 4
+            continue
+        # Finite population correction: the sample can be a noticeable share of the history
+        half_width = _Z_95 * stddev / math.sqrt(n) * math.sqrt(max(0.0, 1 - n / total))
+        if half_width <= error * mean:
+            break
+        percent *= 1.1 * (half_width / (error * mean)) ** 2
+    if n < 2 or mean == 0:
+        return exact()
+
     return ReportSummary(
-        total_calculations=total_count,
+        total_calculations=total,
         counts_by_operation=counts_by_operation,
-        average_inputs=avg_inputs,
-        recent_calculations=recent_calcs_schema
+        average_operands=round(mean, 2),
+        recent_calculations=_recent_calculations(db, user_id),
+        approximate=True,
+        average_operands_ci=ConfidenceInterval(
+            low=round(mean - half_width, 2), high=round(mean + half_width, 2), confidence=0.95
+        ),
+        sample_size=n,
+    )
+
+
+def as_naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, as rollup buckets and Calculation.created_at are stored."""
+    if moment is not None and moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def build_timeseries(
+    db: Session,
+    user_id: str,
+    bucket: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    calc_type: Optional[str] = None,
+) -> TimeSeriesResponse:
+    """
+    Count a user's calculations per time bucket and type.
+
+    Reads only the calculation_rollups table: hourly rows for bucket="hour",
+    daily rows otherwise (weeks are summed from days). Source rows are
+    included when their start lies in [start, end).
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+
+    source = "hour" if bucket == "hour" else "day"
+    if bucket == "week":
+        bucket_start = func.date_trunc("week", CalculationRollup.bucket_start)
+    else:
+        bucket_start = CalculationRollup.bucket_start
+    bucket_start = bucket_start.label("bucket_start")
+    total = func.sum(CalculationRollup.count).label("count")
+
+    query = db.query(bucket_start, CalculationRollup.type, total).filter(
+        CalculationRollup.user_id == user_id,
+        CalculationRollup.granularity == source,
+    )
+    start, end = as_naive_utc(start), as_naive_utc(end)
+    if start is not None:
+        query = query.filter(CalculationRollup.bucket_start >= start)
+    if end is not None:
+        query = query.filter(CalculationRollup.bucket_start < end)
+    if calc_type is not None:
+        query = query.filter(CalculationRollup.type == calc_type)
+
+    rows = (
+        query.group_by(bucket_start, CalculationRollup.type)
+        .having(total > 0)
+        .order_by(bucket_start, CalculationRollup.type)
+        .all()
+    )
+
+    return TimeSeriesResponse(
+        bucket=bucket,
+        points=[
+            TimeSeriesPoint(bucket_start=row.bucket_start, type=row.type, count=row.count)
+            for row in rows
+        ],
+    )
+
+
+def build_quantile_report(
+    db: Session,
+    user_id: str,
+    quantiles: Sequence[float] = (0.5, 0.95),
+    calc_type: Optional[str] = None,
+) -> QuantileReport:
+    """
+    Estimate quantiles of a user's calculation results per operation type.
+
+    Reads one pre-maintained sketch per type (see app.reports.sketches);
+    estimates are within RELATIVE_ACCURACY of the exact value.
+    """
+    query = db.query(CalculationResultSketch).filter(CalculationResultSketch.user_id == user_id)
+    if calc_type is not None:
+        query = query.filter(CalculationResultSketch.type == calc_type)
+
+    by_type = []
+    for row in query.order_by(CalculationResultSketch.type).all():
+        sketch = row.to_sketch()
+        if sketch.count == 0:
+            continue
+        by_type.append(TypeQuantiles(
+            type=row.type,
+            count=sketch.count,
+            quantiles={str(q): sketch.quantile(q) for q in quantiles},
+        ))
+
+    return QuantileReport(relative_accuracy=RELATIVE_ACCURACY, by_type=by_type)
+
+
+def build_usage_report(db: Session, start: date, end: date) -> UsageReport:
+    """
+    System-wide calculations, active users and type mix for [start, end].
+
+    Reads only the daily usage tables (see app.models.usage), so the cost
+    depends on the number of days, not on the size of the calculations table.
+    Active user counts are HyperLogLog estimates; the range total is the
+    union of the daily sketches, not the sum of the daily estimates.
+    """
+    counts = (
+        db.query(UsageDailyCount.day, UsageDailyCount.type, func.sum(UsageDailyCount.count))
+        .filter(UsageDailyCount.day >= start, UsageDailyCount.day <= end)
+        .group_by(UsageDailyCount.day, UsageDailyCount.type)
+        .all()
+    )
+
+    in_range = (UsageDailyRegister.day >= start, UsageDailyRegister.day <= end)
+    harmonic = func.sum(func.power(2.0, -UsageDailyRegister.rank))
+    daily_registers = (
+        db.query(UsageDailyRegister.day, func.count(), harmonic)
+        .filter(*in_range)
+        .group_by(UsageDailyRegister.day)
+        .all()
+    )
+    union = (
+        db.query(func.max(UsageDailyRegister.rank).label("rank"))
+        .filter(*in_range)
+        .group_by(UsageDailyRegister.register)
+        .subquery()
+    )
+    registers_set, harmonic_sum = db.query(
+        func.count(), func.coalesce(func.sum(func.power(2.0, -union.c.rank)), 0)
+    ).one()
+
+    days = {}
+    by_type = {}
+    for day, calc_type, count in counts:
+        entry = days.setdefault(day, UsageDay(day=day, calculations=0, active_users=0, by_type={}))
+        entry.by_type[calc_type] = count
+        entry.calculations += count
+        by_type[calc_type] = by_type.get(calc_type, 0) + count
+    for day, set_count, day_harmonic in daily_registers:
+        entry = days.setdefault(day, UsageDay(day=day, calculations=0, active_users=0, by_type={}))
+        entry.active_users = hll.estimate(set_count, float(day_harmonic))
+
+    return UsageReport(
+        start=start,
+        end=end,
+        calculations=sum(by_type.values()),
+        active_users=hll.estimate(registers_set, float(harmonic_sum)),
+        active_users_error=round(hll.STANDARD_ERROR, 4),
+        by_type=by_type,
+        days=[days[day] for day in sorted(days)],
+    )
+
+
+def build_result_histogram(
+    db: Session,
+    user_id: str,
+    buckets: int = 10,
+    min_result: Optional[float] = None,
+    max_result: Optional[float] = None,
+    calc_type: Optional[str] = None,
+) -> HistogramResponse:
+    """
+    Equal-width histogram of a user's calculation results in one query.
+
+    Bounds default to the user's smallest and largest result (computed in a
+    CTE over ix_calculations_user_id_result); width_bucket assigns buckets and
+    the maximum is folded into the last one. Results outside explicit bounds
+    are ignored.
+    """
+    filters = [Calculation.user_id == user_id, Calculation.result.isnot(None)]
+    if calc_type is not None:
+        filters.append(Calculation.type == calc_type)
+
+    # Aggregates keep the CTE to a single row even when both bounds are given
+    bounds = select(
+        func.coalesce(literal(min_result, Float), func.min(Calculation.result)).label("lo"),
+        func.coalesce(literal(max_result, Float), func.max(Calculation.result)).label("hi"),
+    ).where(*filters).cte("bounds")
+
+    bucket = case(
+        (bounds.c.hi == bounds.c.lo, 1),
+        else_=func.least(func.width_bucket(Calculation.result, bounds.c.lo, bounds.c.hi, buckets), buckets),
+    ).label("bucket")
+    rows = db.execute(
+        select(bucket, func.count().label("count"), bounds.c.lo, bounds.c.hi)
+        .select_from(Calculation)
+        .join(bounds, true())
+        .where(*filters, Calculation.result.between(bounds.c.lo, bounds.c.hi))
+        .group_by(bucket, bounds.c.lo, bounds.c.hi)
+        .order_by(bucket)
+    ).all()
+
+    if not rows:
+        return HistogramResponse(min=min_result, max=max_result, total=0, buckets=[])
+
+    lo, hi = rows[0].lo, rows[0].hi
+    counts = {row.bucket: row.count for row in rows}
+    width = (hi - lo) / buckets
+    return HistogramResponse(
+        min=lo,
+        max=hi,
+        total=sum(counts.values()),
+        buckets=[
+            HistogramBucket(
+                lower=lo + i * width,
+                upper=hi if i == buckets - 1 else lo + (i + 1) * width,
+                count=counts.get(i + 1, 0),
+            )
+            for i in range(buckets)
+        ],
     )
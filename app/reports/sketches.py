@@ -0,0 +1,182 @@
+# app/reports/sketches.py
+"""
+Mergeable quantile sketches for calculation results.
+
+We use a DDSketch-style logarithmic histogram rather than t-digest/KLL because
+calculations are also updated and deleted: bucket counts can be decremented
+exactly, which neither t-digest nor KLL supports.
+
+Error bound
+-----------
+Every non-zero value x falls in bucket i = ceil(log_gamma(|x|)) with
+gamma = (1 + a) / (1 - a), and a bucket reports 2 * gamma**i / (gamma + 1).
+For any quantile q the estimate x' therefore satisfies
+
+    |x' - x_q| <= a * |x_q|        (a = RELATIVE_ACCURACY = 1%)
+
+where x_q is the exact value of rank floor(q * (n - 1)). Values with
+|x| < MIN_INDEXABLE are counted in a zero bucket and reported as 0.
+Memory grows with log(max|x| / min|x|) / a, not with the number of values.
+
+Sketches are stored per (user, type) as JSON in calculation_result_sketches
+and maintained by ORM events (see app.models.calculation_sketch). Rebuild them
+from the calculations table with:
+
+    python -m app.reports.sketches            # every user
+    python -m app.reports.sketches --user ID  # one user
+"""
+from __future__ import annotations
+
+import argparse
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+RELATIVE_ACCURACY = 0.01
+MIN_INDEXABLE = 1e-9
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def bucket_path(value: float) -> Tuple[str, ...]:
+    """JSON path of the bucket counting ``value``: ("pos", i), ("neg", i) or ("zero",)."""
+    magnitude = abs(value)
+    if magnitude < MIN_INDEXABLE:
+        return ("zero",)
+    index = math.ceil(math.log(magnitude) / _LOG_GAMMA)
+    return ("pos" if value > 0 else "neg", str(index))
+
+
+def _bucket_value(index: int) -> float:
+    return 2 * _GAMMA ** index / (_GAMMA + 1)
+
+
+class DDSketch:
+    """Logarithmic-bucket quantile sketch with exact add/remove/merge."""
+
+    def __init__(self):
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _adjust(self, value: float, delta: int) -> None:
+        path = bucket_path(value)
+        if path[0] == "zero":
+            self.zero += delta
+            return
+        store = self.positive if path[0] == "pos" else self.negative
+        index = int(path[1])
+        store[index] = store.get(index, 0) + delta
+        if store[index] <= 0:
+            del store[index]
+
+    def add(self, value: float) -> None:
+        self._adjust(value, 1)
+
+    def remove(self, value: float) -> None:
+        self._adjust(value, -1)
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        for index, n in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + n
+        for index, n in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + n
+        self.zero += other.zero
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1); None for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+
+        seen = 0
+        # Most negative values first: largest magnitude index of the negative store
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -_bucket_value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return _bucket_value(index)
+        return _bucket_value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "pos": {str(i): n for i, n in self.positive.items()},
+            "neg": {str(i): n for i, n in self.negative.items()},
+            "zero": self.zero,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "DDSketch":
+        sketch = cls()
+        data = data or {}
+        sketch.positive = {int(i): int(n) for i, n in (data.get("pos") or {}).items() if int(n) > 0}
+        sketch.negative = {int(i): int(n) for i, n in (data.get("neg") or {}).items() if int(n) > 0}
+        sketch.zero = int(data.get("zero") or 0)
+        return sketch
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "DDSketch":
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+
+def rebuild_sketches(db, user_id: Optional[str] = None) -> int:
+    """
+    Recompute stored sketches from the calculations table.
+
+    Returns the number of (user, type) sketches written.
+    """
+    from sqlalchemy import delete
+    from app.models.calculation import Calculation
+    from app.models.calculation_sketch import CalculationResultSketch
+
+    clear = delete(CalculationResultSketch)
+    query = db.query(Calculation.user_id, Calculation.type, Calculation.result).filter(
+        Calculation.result.isnot(None)
+    )
+    if user_id is not None:
+        clear = clear.where(CalculationResultSketch.user_id == user_id)
+        query = query.filter(Calculation.user_id == user_id)
+
+    sketches: Dict[Tuple, DDSketch] = {}
+    for row in query.yield_per(5000):
+        sketches.setdefault((row.user_id, row.type), DDSketch()).add(row.result)
+
+    db.execute(clear)
+    db.add_all(
+        CalculationResultSketch(user_id=uid, type=calc_type, count=s.count, sketch=s.to_dict())
+        for (uid, calc_type), s in sketches.items()
+    )
+    db.commit()
+    return len(sketches)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild calculation result sketches.")
+    parser.add_argument("--user", help="only rebuild this user's sketches")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        written = rebuild_sketches(session, args.user)
+    finally:
+        session.close()
+    print(f"Rebuilt {written} sketches.")
@@ -1,7 +1,9 @@
-from datetime import datetime
-from typing import List, Dict, Union
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional, Union
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schemas.calculation import CalculationType
 
 
 class RecentCalculation(BaseModel):
@@ -15,8 +17,115 @@ class RecentCalculation(BaseModel):
         from_attributes = True  # allow model creation from SQLAlchemy objects
 
 
+class ConfidenceInterval(BaseModel):
+    low: float
+    high: float
+    confidence: float                    # e.g. 0.95
+
+
 class ReportSummary(BaseModel):
     total_calculations: int
     counts_by_operation: Dict[str, int]  # e.g., {"addition": 2, "division": 1}
     average_operands: float              # rounded to 2 decimals in service
     recent_calculations: List[RecentCalculation]
+    # Set by ?approx=true: counts stay exact, average_operands is estimated
+    # from a sample of sample_size rows
+    approximate: bool = False
+    average_operands_ci: Optional[ConfidenceInterval] = None
+    sample_size: Optional[int] = None
+
+
+class TimeSeriesPoint(BaseModel):
+    bucket_start: datetime               # naive UTC start of the hour/day/week
+    type: str
+    count: int
+
+
+class TimeSeriesResponse(BaseModel):
+    bucket: str                          # "hour", "day" or "week"
+    points: List[TimeSeriesPoint]        # ordered by bucket_start, then type
+
+
+class TypeQuantiles(BaseModel):
+    type: str
+    count: int                           # results summarized by the sketch
+    quantiles: Dict[str, float]          # e.g. {"0.5": 12.0, "0.95": 97.3}
+
+
+class QuantileReport(BaseModel):
+    relative_accuracy: float             # |estimate - exact| <= relative_accuracy * |exact|
+    by_type: List[TypeQuantiles]
+
+
+class UsageDay(BaseModel):
+    day: date
+    calculations: int
+    active_users: int                    # HyperLogLog estimate
+    by_type: Dict[str, int]
+
+
+class UsageReport(BaseModel):
+    start: date                          # inclusive
+    end: date                            # inclusive
+    calculations: int
+    active_users: int                    # distinct users over the whole range
+    active_users_error: float            # relative standard error of the estimates
+    by_type: Dict[str, int]
+    days: List[UsageDay]                 # only days with activity
+
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["summary", "timeseries"]
+    params: Dict[str, Any] = {}          # e.g. {"bucket": "week", "from": "2020-01-01"}
+
+
+class ReportJobRead(BaseModel):
+    id: UUID
+    kind: str
+    params: Dict[str, Any]
+    status: str                          # pending, running, succeeded or failed
+    progress: float                      # 0.0 - 1.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+AggregateDimension = Literal["type", "day", "input_count_bucket"]
+AggregateMetric = Literal["count", "sum_result", "avg_result", "min_result", "max_result"]
+
+
+class AggregateQuery(BaseModel):
+    dimensions: List[AggregateDimension] = Field(default_factory=list, max_length=3)
+    metrics: List[AggregateMetric] = Field(default_factory=lambda: ["count"], min_length=1, max_length=5)
+    start: Optional[datetime] = Field(None, alias="from")
+    end: Optional[datetime] = Field(None, alias="to")
+    type: Optional[CalculationType] = None  # only aggregate this operation type
+    limit: Optional[int] = Field(None, ge=1)
+
+    model_config = {"populate_by_name": True}
+
+
+class AggregateResponse(BaseModel):
+    dimensions: List[str]
+    metrics: List[str]
+    rows: List[Dict[str, Any]]           # one dict per group: dimension and metric values
+    truncated: bool                      # more groups exist than were returned
+    cached: bool = False
+
+
+class HistogramBucket(BaseModel):
+    lower: float                         # inclusive
+    upper: float                         # exclusive, except for the last bucket
+    count: int
+
+
+class HistogramResponse(BaseModel):
+    min: Optional[float]                 # None when there are no results
+    max: Optional[float]
+    total: int
+    buckets: List[HistogramBucket]       # equal width, including empty buckets
@@ -0,0 +1,183 @@
+# benchmarks/first_requests.py
+"""
+Benchmark the first requests a freshly started worker serves.
+
+Starts a single uvicorn worker (which is what each of the Dockerfile's
+``--workers 4`` processes is) without the lifespan warm-up, with warm-up and
+gc.freeze, and additionally with raised GC_THRESHOLDS, sends it --requests sequential
+requests over one keep-alive connection as soon as its port opens, and
+reports latency percentiles. Each configuration is measured with --runs
+fresh servers; the table shows the median of the per-run figures.
+
+The workload logs in once, then cycles through the API and dashboard:
+health, create/read/list/delete a calculation, the report summary and the
+dashboard page. Each run gets its own throwaway user (deleted afterwards),
+so the history the list and summary read stays the same size.
+
+    python -m benchmarks.first_requests                  # 1,000 requests, 3 runs
+    python -m benchmarks.first_requests --runs 5 --json
+
+Needs the database at DATABASE_URL; the server uses
+SCHEMA_STARTUP_MODE=create so an empty database works.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import text
+
+CONFIGS = {
+    "cold": {"WARMUP_ON_STARTUP": "false", "GC_FREEZE": "false"},
+    "warm + gc.freeze": {"WARMUP_ON_STARTUP": "true", "GC_FREEZE": "true"},
+    "warm + gc tuned": {"WARMUP_ON_STARTUP": "true", "GC_FREEZE": "true", "GC_THRESHOLDS": "50000,20,20"},
+}
+PASSWORD = "BenchPass123!"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    # uvicorn binds after the lifespan startup, so an open port means "ready"
+    # without sending a request that would itself warm the app.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"server did not start within {timeout:.0f}s")
+
+
+def create_user() -> str:
+    from app.auth.passwords import get_password_context
+    from app.database import engine
+
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    # Low-cost hash: the benchmark is about warm-up, not bcrypt's work factor
+    password = get_password_context().handler("bcrypt").using(rounds=4).hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, password, first_name, last_name, "
+            "is_active, is_verified, created_at, updated_at) "
+            "VALUES (:id, :username, :email, :password, 'Bench', 'User', true, false, now(), now())"
+        ), {"id": uuid.uuid4(), "username": username, "email": f"{username}@example.com", "password": password})
+    return username
+
+
+def delete_user(username: str) -> None:
+    from app.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "DELETE FROM calculations WHERE user_id = (SELECT id FROM users WHERE username = :u)"
+        ), {"u": username})
+        conn.execute(text("DELETE FROM users WHERE username = :u"), {"u": username})
+
+
+def run_workload(client: httpx.Client, username: str, requests: int) -> List[float]:
+    """Latency in ms of each request, in order."""
+    timings: List[float] = []
+
+    def timed(method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response
+
+    token = timed("POST", "/auth/login", json={"username": username, "password": PASSWORD}).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    calc_id = None
+    while len(timings) < requests:
+        step = len(timings) % 7
+        if step == 0:
+            timed("GET", "/health")
+        elif step == 1:
+            calc_id = timed("POST", "/calculations", json={"type": "addition", "inputs": [1.5, 2.5, 3]}).json()["id"]
+        elif step == 2:
+            timed("GET", f"/calculations/{calc_id}" if calc_id else "/health")
+        elif step == 3:
+            timed("GET", "/calculations")
+        elif step == 4:
+            timed("GET", "/reports/summary")
+        elif step == 5:
+            timed("GET", "/dashboard")
+        else:
+            timed("DELETE", f"/calculations/{calc_id}" if calc_id else "/health")
+            calc_id = None
+    return timings
+
+
+def measure(config: Dict[str, str], requests: int) -> Dict[str, float]:
+    username = create_user()
+    port = _free_port()
+    env = {**os.environ, "SCHEMA_STARTUP_MODE": "create", **config}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+    )
+    try:
+        _wait_for_port(port, proc)
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            timings = run_workload(client, username, requests)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        delete_user(username)
+    ordered = sorted(timings)
+    pct = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]  # noqa: E731
+    return {
+        "first_ms": timings[0],
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1],
+        "total_ms": sum(timings),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Latency of a fresh worker's first requests, with and without warm-up.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, config in CONFIGS.items():
+        runs = [measure(config, args.requests) for _ in range(args.runs)]
+        results[name] = {
+            key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]
+        }
+
+    if args.json:
+        print(json.dumps({"requests": args.requests, "runs": args.runs, "results": results}, indent=2))
+        return 0
+    print(f"first {args.requests:,} requests per fresh worker, median of {args.runs} runs\n")
+    print(f"{'config':<18} {'first (ms)':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'total (ms)':>11}")
+    for name, row in results.items():
+        print(
+            f"{name:<18} {row['first_ms']:>11.1f} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+            f"{row['max_ms']:>9.1f} {row['total_ms']:>11.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,368 @@
+# benchmarks/load.py
+"""
+HTTP load test with a committed baseline.
+
+Runs each scenario for --duration seconds with --concurrency virtual users.
+Each user is an asyncio task that repeats the scenario's steps back to back
+over a shared httpx.AsyncClient with one keep-alive connection per user.
+
+- auth: register a new user, then log in
+- crud: create, list, get, update and delete a calculation
+- dashboard: what the dashboard page loads, GET /calculations and
+  GET /reports/summary, for a user with DASHBOARD_HISTORY calculations
+
+Each user registers and logs in before the clock starts (the auth scenario
+excepted), so only the scenario's own requests are measured. For every
+scenario and step the report has the request count, throughput, error rate
+(non-2xx responses and transport errors) and latency p50/p95/p99.
+
+    python -m benchmarks.load                             # all scenarios, 10 users, 10 s each
+    python -m benchmarks.load --scenario crud --concurrency 50 --duration 30
+    python -m benchmarks.load --output results.json       # save the results as JSON
+    python -m benchmarks.load --update-baseline           # rewrite the baseline
+
+Without --url a single uvicorn worker is started on a free port with
+SCHEMA_STARTUP_MODE=create, against DATABASE_URL; the users it creates are
+deleted afterwards. With --url the target is used as is and nothing is
+cleaned up.
+
+The results are compared with --baseline (benchmarks/baselines/load.json).
+A scenario regresses when a latency percentile grows by more than
+--max-latency-increase, throughput drops by more than
+--max-throughput-drop (both fractions of the baseline), or the error rate
+rises by more than --max-error-rate-increase (absolute). The defaults are
+the thresholds stored in the baseline file. The exit status is 1 on a
+regression. Baselines depend on the machine: refresh them with
+--update-baseline on the machine that runs the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "load.json"
+DEFAULT_THRESHOLDS = {
+    "max_latency_increase": 0.3,
+    "max_throughput_drop": 0.2,
+    "max_error_rate_increase": 0.01,
+}
+PASSWORD = "LoadTest123!"
+DASHBOARD_HISTORY = 50
+_LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+class StepFailed(Exception):
+    """A request failed; the rest of the iteration is skipped."""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class Recorder:
+    """Latencies and errors per step of one scenario run."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, step: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.latencies[step].append((time.perf_counter() - started) * 1000)
+            self.errors[step] += 1
+            raise StepFailed(step) from exc
+        self.latencies[step].append((time.perf_counter() - started) * 1000)
+        if response.is_error:
+            self.errors[step] += 1
+            raise StepFailed(step)
+        return response
+
+    @staticmethod
+    def _stats(latencies: List[float], errors: int, seconds: float) -> dict:
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+            "throughput_rps": round(len(ordered) / seconds, 2) if seconds else 0.0,
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "p99_ms": round(percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+
+    def summary(self, seconds: float) -> dict:
+        every = [ms for step in self.latencies.values() for ms in step]
+        result = self._stats(every, sum(self.errors.values()), seconds)
+        result["steps"] = {
+            step: self._stats(latencies, self.errors[step], seconds)
+            for step, latencies in self.latencies.items()
+        }
+        return result
+
+
+def _user_payload(prefix: str) -> dict:
+    username = f"{prefix}{uuid.uuid4().hex[:12]}"
+    return {
+        "first_name": "Load", "last_name": "Test",
+        "email": f"{username}@example.com", "username": username,
+        "password": PASSWORD, "confirm_password": PASSWORD,
+    }
+
+
+async def sign_up(client: httpx.AsyncClient, prefix: str) -> Dict[str, str]:
+    """Register and log in a user outside the measurement; returns auth headers."""
+    payload = _user_payload(prefix)
+    (await client.post("/auth/register", json=payload)).raise_for_status()
+    response = await client.post("/auth/login", json={"username": payload["username"], "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def auth_iteration(client, rec: Recorder, state: dict) -> None:
+    payload = _user_payload(state["prefix"])
+    await rec.request(client, "register", "POST", "/auth/register", json=payload)
+    await rec.request(
+        client, "login", "POST", "/auth/login", json={"username": payload["username"], "password": PASSWORD}
+    )
+
+
+async def crud_iteration(client, rec: Recorder, state: dict) -> None:
+    headers = state["headers"]
+    calc = (await rec.request(
+        client, "create", "POST", "/calculations", json={"type": "addition", "inputs": [1.5, 2.5, 3]}, headers=headers
+    )).json()
+    await rec.request(client, "list", "GET", "/calculations", headers=headers)
+    await rec.request(client, "get", "GET", f"/calculations/{calc['id']}", headers=headers)
+    await rec.request(client, "update", "PUT", f"/calculations/{calc['id']}", json={"inputs": [4, 5]}, headers=headers)
+    await rec.request(client, "delete", "DELETE", f"/calculations/{calc['id']}", headers=headers)
+
+
+async def dashboard_setup(client: httpx.AsyncClient, headers: Dict[str, str]) -> None:
+    for i in range(DASHBOARD_HISTORY):
+        calc_type = ("addition", "subtraction", "multiplication", "division")[i % 4]
+        response = await client.post(
+            "/calculations", json={"type": calc_type, "inputs": [i + 1, 2]}, headers=headers
+        )
+        response.raise_for_status()
+
+
+async def dashboard_iteration(client, rec: Recorder, state: dict) -> None:
+    headers = state["headers"]
+    await rec.request(client, "calculations", "GET", "/calculations", headers=headers)
+    await rec.request(client, "summary", "GET", "/reports/summary", headers=headers)
+
+
+SCENARIOS = {
+    "auth": {"iteration": auth_iteration, "signed_in": False, "setup": None},
+    "crud": {"iteration": crud_iteration, "signed_in": True, "setup": None},
+    "dashboard": {"iteration": dashboard_iteration, "signed_in": True, "setup": dashboard_setup},
+}
+
+
+async def run_scenario(base_url: str, name: str, concurrency: int, duration: float, prefix: str) -> dict:
+    scenario = SCENARIOS[name]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        states = [{"prefix": prefix} for _ in range(concurrency)]
+        if scenario["signed_in"]:
+            for state in states:
+                state["headers"] = await sign_up(client, prefix)
+                if scenario["setup"] is not None:
+                    await scenario["setup"](client, state["headers"])
+
+        rec = Recorder()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+
+        async def virtual_user(state: dict) -> None:
+            while loop.time() < deadline:
+                try:
+                    await scenario["iteration"](client, rec, state)
+                except StepFailed:
+                    pass
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(state) for state in states))
+        return rec.summary(time.perf_counter() - started)
+
+
+def compare(results: dict, baseline: dict, thresholds: dict) -> List[str]:
+    """Regressions of ``results`` against ``baseline``, one message each."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for key in _LATENCY_KEYS:
+            limit = base[key] * (1 + thresholds["max_latency_increase"])
+            if current[key] > limit:
+                regressions.append(f"{name}: {key} {current[key]} > {limit:.2f} (baseline {base[key]})")
+        limit = base["throughput_rps"] * (1 - thresholds["max_throughput_drop"])
+        if current["throughput_rps"] < limit:
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} req/s < {limit:.2f} (baseline {base['throughput_rps']})"
+            )
+        limit = base["error_rate"] + thresholds["max_error_rate_increase"]
+        if current["error_rate"] > limit:
+            regressions.append(f"{name}: error rate {current['error_rate']} > {limit:.4f} (baseline {base['error_rate']})")
+    return regressions
+
+
+@contextmanager
+def local_server(workers: int) -> Iterator[str]:
+    """Start uvicorn on a free port; yields its base URL."""
+    port = _free_port()
+    env = {**os.environ, "SCHEMA_STARTUP_MODE": "create"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("server did not start within 60s")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def delete_users(prefix: str) -> None:
+    from app.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "DELETE FROM calculations WHERE user_id IN (SELECT id FROM users WHERE username LIKE :p)"
+        ), {"p": f"{prefix}%"})
+        conn.execute(text("DELETE FROM users WHERE username LIKE :p"), {"p": f"{prefix}%"})
+
+
+def _print_results(results: dict) -> None:
+    meta = results["meta"]
+    print(f"{meta['concurrency']} users, {meta['duration_s']} s per scenario, {meta['target']}\n")
+    print(f"{'scenario / step':<22} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in results["scenarios"].items():
+        rows = [(name, row)] + [(f"  {step}", stats) for step, stats in row["steps"].items()]
+        for label, stats in rows:
+            print(
+                f"{label:<22} {stats['requests']:>9} {stats['throughput_rps']:>8.1f} "
+                f"{stats['error_rate']:>7.2%} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP load test compared against a committed baseline.")
+    parser.add_argument("--url", help="target base URL (default: start a local uvicorn worker)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run, repeatable (default: all)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    for key, default in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=float,
+                            help=f"regression threshold (default: baseline's, else {default})")
+    args = parser.parse_args(argv)
+
+    prefix = f"load_{uuid.uuid4().hex[:6]}_"
+    scenarios = args.scenario or list(SCENARIOS)
+
+    async def run_all(base_url: str) -> Dict[str, dict]:
+        return {name: await run_scenario(base_url, name, args.concurrency, args.duration, prefix) for name in scenarios}
+
+    if args.url:
+        target, scenario_results = args.url, asyncio.run(run_all(args.url))
+    else:
+        target = f"local uvicorn, {args.workers} worker(s)"
+        try:
+            with local_server(args.workers) as base_url:
+                scenario_results = asyncio.run(run_all(base_url))
+        finally:
+            delete_users(prefix)
+
+    results = {
+        "meta": {
+            "target": target,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "scenarios": scenario_results,
+    }
+    _print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline: Optional[dict] = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    thresholds = {
+        key: getattr(args, key) if getattr(args, key) is not None
+        else (baseline or {}).get("thresholds", {}).get(key, default)
+        for key, default in DEFAULT_THRESHOLDS.items()
+    }
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**results, "thresholds": thresholds}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    for key in ("concurrency", "duration_s"):
+        if baseline["meta"][key] != results["meta"][key]:
+            print(f"\nWarning: baseline {key} is {baseline['meta'][key]}, this run used {results['meta'][key]}")
+    regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+# benchmarks/operand_search.py
+"""
+Benchmark operand containment search (inputs @> '[19.99]').
+
+Creates a scratch copy of the calculations table (same columns and indexes,
+including ix_calculations_inputs_gin), fills it server-side with
+generate_series, then times each lookup with EXPLAIN ANALYZE twice: with the
+planner's choice (GIN bitmap scan) and with index scans disabled (sequential
+scan). Reports the median execution time over --repeat runs.
+
+    python -m benchmarks.operand_search                     # 2,000,000 rows
+    python -m benchmarks.operand_search --rows 5000000 --users 20000
+    python -m benchmarks.operand_search --database-url postgresql://...
+
+The scratch table is dropped afterwards unless --keep is given.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import get_settings
+
+TABLE = "bench_calculations"
+
+QUERIES = {
+    "all users, one operand": "SELECT count(*) FROM {table} WHERE inputs @> '[19.99]'",
+    "all users, two operands": "SELECT count(*) FROM {table} WHERE inputs @> '[19.99, 42.5]'",
+    "one user, one operand": (
+        "SELECT id, inputs FROM {table} "
+        "WHERE user_id = md5('7')::uuid AND inputs @> '[19.99]'"
+    ),
+}
+
+
+def seed(conn, rows: int, users: int) -> float:
+    started = time.perf_counter()
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    conn.execute(text(f"CREATE TABLE {TABLE} (LIKE calculations INCLUDING DEFAULTS INCLUDING INDEXES)"))
+    # Two to four operands with two decimals in [0, 100): each value occurs in
+    # roughly 1 of 10,000 rows per position.
+    conn.execute(text(f"""
+        INSERT INTO {TABLE} (id, user_id, type, inputs, result, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               md5((g % :users)::text)::uuid,
+               'addition',
+               CASE g % 3
+                   WHEN 0 THEN jsonb_build_array(round((random() * 100)::numeric, 2), round((random() * 100)::numeric, 2))
+                   WHEN 1 THEN jsonb_build_array(round((random() * 100)::numeric, 2), round((random() * 100)::numeric, 2),
+                                                 round((random() * 100)::numeric, 2))
+                   ELSE jsonb_build_array(round((random() * 100)::numeric, 2), round((random() * 100)::numeric, 2),
+                                          round((random() * 100)::numeric, 2), round((random() * 100)::numeric, 2))
+               END,
+               0,
+               now() - (g || ' seconds')::interval,
+               now()
+        FROM generate_series(1, :rows) AS g
+    """), {"rows": rows, "users": users})
+    conn.execute(text(f"ANALYZE {TABLE}"))
+    return time.perf_counter() - started
+
+
+def measure(conn, sql: str, repeat: int, use_index: bool) -> dict:
+    conn.execute(text(f"SET enable_bitmapscan = {'on' if use_index else 'off'}"))
+    conn.execute(text(f"SET enable_indexscan = {'on' if use_index else 'off'}"))
+    timings, plan = [], None
+    for _ in range(repeat):
+        result = conn.execute(text("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)).scalar()
+        if isinstance(result, str):
+            result = json.loads(result)
+        timings.append(result[0]["Execution Time"])
+        plan = result[0]["Plan"]
+    conn.execute(text("RESET enable_bitmapscan"))
+    conn.execute(text("RESET enable_indexscan"))
+    nodes = []
+    while plan:
+        nodes.append(plan["Node Type"])
+        plan = (plan.get("Plans") or [None])[0]
+    return {"median_ms": round(statistics.median(timings), 3), "plan": " > ".join(nodes)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GIN-indexed operand search.")
+    parser.add_argument("--database-url", default=get_settings().DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {TABLE} table")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        try:
+            print(f"Seeding {args.rows:,} rows for {args.users:,} users ...")
+            print(f"  done in {seed(conn, args.rows, args.users):.1f}s")
+            table_size, index_size = conn.execute(text(
+                "SELECT pg_size_pretty(pg_relation_size(tablename::regclass)), "
+                "pg_size_pretty(pg_relation_size(indexname::regclass)) "
+                "FROM pg_indexes WHERE tablename = :t AND indexdef LIKE '%USING gin%'"
+            ), {"t": TABLE}).one()
+            print(f"  table {table_size}, GIN index {index_size}\n")
+
+            print(f"{'query':<28} {'GIN (ms)':>10} {'seq scan (ms)':>14}  plan with index")
+            for name, sql in QUERIES.items():
+                sql = sql.format(table=TABLE)
+                indexed = measure(conn, sql, args.repeat, use_index=True)
+                scanned = measure(conn, sql, args.repeat, use_index=False)
+                print(f"{name:<28} {indexed['median_ms']:>10} {scanned['median_ms']:>14}  {indexed['plan']}")
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
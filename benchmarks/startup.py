@@ -0,0 +1,132 @@
+# benchmarks/startup.py
+"""
+Benchmark worker cold start.
+
+Two measurements, each repeated --repeat times in fresh interpreters (the
+median is reported):
+
+- import: ``python -X importtime -c "import app.main"``, i.e. the time to
+  import the application, plus the heaviest modules it pulls in directly
+- first /health: wall time from spawning ``uvicorn app.main:app`` until
+  ``GET /health`` first answers 200 (interpreter start, imports, lifespan)
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --top 15
+    python -m benchmarks.startup --schema-mode check --json
+
+The server runs with SCHEMA_STARTUP_MODE=skip by default so the numbers do
+not depend on the database; pass --schema-mode check to include the schema
+gate (needs a migrated database at DATABASE_URL).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_profile(module: str) -> dict:
+    """One ``-X importtime`` run: total ms and cumulative ms per direct import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total, children, pending = 0.0, {}, {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms, depth, name = int(match[2]) / 1000, len(match[3]) // 2, match[4]
+        if depth == 1:
+            pending[name] = cumulative_ms
+        elif depth == 0:
+            # Children are listed before their parent
+            if name == module:
+                total, children = cumulative_ms, pending
+            pending = {}
+    return {"total_ms": total, "children": children}
+
+
+def time_to_first_health(schema_mode: str, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until /health answers 200."""
+    port = _free_port()
+    env = {**os.environ, "SCHEMA_STARTUP_MODE": schema_mode}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"/health did not answer within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark application import time and time to first /health.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="heaviest direct imports to list")
+    parser.add_argument("--schema-mode", default="skip", choices=("check", "migrate", "create", "skip"))
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    # First run warms the bytecode cache and is discarded
+    import_profile(args.module)
+    profiles = [import_profile(args.module) for _ in range(args.repeat)]
+    health = [time_to_first_health(args.schema_mode) * 1000 for _ in range(args.repeat)]
+
+    names = set().union(*(p["children"] for p in profiles))
+    children = {
+        name: statistics.median(p["children"].get(name, 0.0) for p in profiles) for name in names
+    }
+    results = {
+        "module": args.module,
+        "repeat": args.repeat,
+        "schema_mode": args.schema_mode,
+        "import_ms": round(statistics.median(p["total_ms"] for p in profiles), 1),
+        "first_health_ms": round(statistics.median(health), 1),
+        "heaviest_imports_ms": {
+            name: round(ms, 1)
+            for name, ms in sorted(children.items(), key=lambda item: -item[1])[:args.top]
+        },
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"import {args.module:<24} {results['import_ms']:>8.1f} ms  (median of {args.repeat})")
+    print(f"first /health ({args.schema_mode:<5})         {results['first_health_ms']:>8.1f} ms\n")
+    print(f"{'heaviest direct imports':<40} {'cumulative (ms)':>16}")
+    for name, ms in results["heaviest_imports_ms"].items():
+        print(f"{name:<40} {ms:>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -83,7 +83,8 @@ def fastapi_server() -> str:
             ["uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", "8000"],
             stdout=log_fp,
             stderr=subprocess.STDOUT,
-            env=os.environ.copy(),
+            # The test database is built with create_all, not migrations
+            env={**os.environ, "SCHEMA_STARTUP_MODE": "create"},
         )
 
     base_url = "http://127.0.0.1:8000"
@@ -0,0 +1,179 @@
+# tests/integration/conftest.py
+"""
+Query budgets for the API calls made by the integration tests.
+
+Every request sent to the app through a TestClient, or an httpx AsyncClient
+with ASGITransport, is checked against a budget of at most
+DEFAULT_MAX_QUERIES SQL statements (ROUTE_MAX_QUERIES for the endpoints
+listed there) and DEFAULT_MAX_DB_MS of database time. Database time
+depends on the machine, so that default is generous enough for a slow CI
+runner and only catches gross regressions; tighten it for every call with
+QUERY_BUDGET_MAX_DB_MS in the environment, or give a test its own budget
+for all of its calls with
+
+    @pytest.mark.query_budget(max_queries=3, max_db_ms=200)
+
+and read the calls recorded so far from the ``query_budget`` fixture, e.g.
+to check that an endpoint's query count does not grow with the data.
+
+Statements are counted with before/after_cursor_execute listeners on the
+app engine (app.database.engine). Only statements issued while serving a
+request count, i.e. those with app.core.query_stats.current_stats() set, so
+background report jobs and the last_login flusher are not charged to the
+call that happened to be in flight. ASGITransport runs the app in the
+caller's context, so async calls are told apart by a context variable even
+when they run concurrently; TestClient runs it on a portal thread, but its
+calls are synchronous, so every statement seen during one belongs to it.
+Streamed responses are charged up to the response headers.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.query_stats import current_stats, normalize_statement
+from app.database import engine as app_engine
+
+DEFAULT_MAX_QUERIES = 10
+# Per call; a marker with max_db_ms=None turns the time check off for a test
+DEFAULT_MAX_DB_MS: Optional[float] = float(os.environ.get("QUERY_BUDGET_MAX_DB_MS") or 3000)
+# Endpoints whose query count must not grow with the number of rows (an N+1
+# regression fails here first). Counts include the user lookup on an auth
+# cache miss.
+ROUTE_MAX_QUERIES = {
+    "GET /calculations": 2,
+    "GET /reports/summary": 5,
+    "GET /reports/timeseries": 2,
+    "GET /reports/histogram": 2,
+    "GET /reports/quantiles": 2,
+    "POST /calculations": 8,
+    "POST /auth/login": 3,
+    "POST /auth/register": 2,
+}
+
+
+@dataclass
+class ApiCall:
+    method: str
+    path: str
+    statements: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    @property
+    def db_ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+
+_async_call: ContextVar[Optional[ApiCall]] = ContextVar("budget_call", default=None)
+
+
+class QueryRecorder:
+    """Collects the statements the app engine runs for the call in flight."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.active: Optional[ApiCall] = None
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+
+    def remove(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["budget_started_at"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("budget_started_at", None)
+        if started is None or current_stats() is None:
+            return
+        call = _async_call.get() or self.active
+        if call is None:
+            return
+        with self._lock:
+            call.statements.append(normalize_statement(statement))
+            call.seconds += time.perf_counter() - started
+
+
+@dataclass
+class QueryBudget:
+    max_queries: Optional[int] = None
+    max_db_ms: Optional[float] = DEFAULT_MAX_DB_MS
+    calls: List[ApiCall] = field(default_factory=list)
+
+    def limit_for(self, call: ApiCall) -> int:
+        if self.max_queries is not None:
+            return self.max_queries
+        return ROUTE_MAX_QUERIES.get(f"{call.method} {call.path}", DEFAULT_MAX_QUERIES)
+
+    def check(self, call: ApiCall) -> None:
+        max_queries = self.limit_for(call)
+        too_slow = self.max_db_ms is not None and call.db_ms > self.max_db_ms
+        if call.queries <= max_queries and not too_slow:
+            return
+        budget = f"{max_queries} queries" + (f", {self.max_db_ms} ms" if self.max_db_ms is not None else "")
+        statements = "\n".join(f"  {s}" for s in call.statements)
+        pytest.fail(
+            f"{call.method} {call.path} ran {call.queries} queries in {call.db_ms} ms "
+            f"(budget {budget}):\n{statements}",
+            pytrace=False,
+        )
+
+
+@pytest.fixture(scope="session")
+def _query_recorder():
+    recorder = QueryRecorder(app_engine)
+    recorder.install()
+    yield recorder
+    recorder.remove()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request, monkeypatch, _query_recorder):
+    marker = request.node.get_closest_marker("query_budget")
+    budget = QueryBudget(**(marker.kwargs if marker else {}))
+    send = TestClient.send
+
+    def send_within_budget(client, request, *args, **kwargs):
+        call = ApiCall(request.method, request.url.path)
+        _query_recorder.active = call
+        try:
+            response = send(client, request, *args, **kwargs)
+        finally:
+            _query_recorder.active = None
+        budget.calls.append(call)
+        budget.check(call)
+        return response
+
+    handle_async_request = httpx.ASGITransport.handle_async_request
+
+    async def handle_async_request_within_budget(transport, request):
+        call = ApiCall(request.method, request.url.path)
+        token = _async_call.set(call)
+        try:
+            response = await handle_async_request(transport, request)
+        finally:
+            _async_call.reset(token)
+        budget.calls.append(call)
+        budget.check(call)
+        return response
+
+    monkeypatch.setattr(TestClient, "send", send_within_budget)
+    monkeypatch.setattr(httpx.ASGITransport, "handle_async_request", handle_async_request_within_budget)
+    return budget
@@ -0,0 +1,126 @@
+# tests/integration/test_admin_usage.py
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.core.config import get_settings
+from app.main import app
+from app.models.calculation import Calculation
+from app.models.usage import USAGE_COUNT_SHARDS, UsageDailyCount, UsageDailyRegister
+from app.reports.service import build_usage_report
+from tests.conftest import _persist_user
+
+client = TestClient(app)
+
+ADMIN_KEY = "test-admin-key"
+
+
+@pytest.fixture(autouse=True)
+def _clean_usage(db_session):
+    # Usage rollups are global (no user FK), so the users TRUNCATE misses them
+    for model in (UsageDailyCount, UsageDailyRegister):
+        db_session.execute(delete(model))
+    db_session.commit()
+    yield
+    for model in (UsageDailyCount, UsageDailyRegister):
+        db_session.execute(delete(model))
+    db_session.commit()
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ADMIN_API_KEY", ADMIN_KEY)
+    return ADMIN_KEY
+
+
+def _add(db_session, user, calc_type, created_at):
+    calc = Calculation.create(calc_type, user.id, [1, 2])
+    calc.result = calc.get_result()
+    calc.created_at = created_at
+    db_session.add(calc)
+    return calc
+
+
+def _seed(db_session):
+    users = [_persist_user(db_session) for _ in range(4)]
+    for user in users:
+        _add(db_session, user, "addition", datetime(2025, 5, 1, 9))
+    _add(db_session, users[0], "division", datetime(2025, 5, 1, 23))
+    _add(db_session, users[0], "addition", datetime(2025, 5, 2, 1))
+    _add(db_session, users[1], "multiplication", datetime(2025, 5, 2, 2))
+    db_session.commit()
+    return users
+
+
+def test_usage_report_counts_and_active_users(db_session):
+    _seed(db_session)
+
+    report = build_usage_report(db_session, date(2025, 5, 1), date(2025, 5, 2))
+
+    assert report.calculations == 7
+    assert report.by_type == {"addition": 5, "division": 1, "multiplication": 1}
+    # Small cardinalities are exact under linear counting (barring collisions)
+    assert report.active_users == 4
+    assert [d.day for d in report.days] == [date(2025, 5, 1), date(2025, 5, 2)]
+    first, second = report.days
+    assert (first.calculations, first.active_users) == (5, 4)
+    assert first.by_type == {"addition": 4, "division": 1}
+    assert (second.calculations, second.active_users) == (2, 2)
+
+    only_second = build_usage_report(db_session, date(2025, 5, 2), date(2025, 5, 2))
+    assert (only_second.calculations, only_second.active_users) == (2, 2)
+
+
+def test_deleting_calculations_keeps_activity(db_session):
+    _seed(db_session)
+    db_session.query(Calculation).delete()
+    db_session.commit()
+
+    report = build_usage_report(db_session, date(2025, 5, 1), date(2025, 5, 2))
+    assert report.calculations == 7
+
+
+def test_admin_usage_endpoint_requires_key(db_session, admin_key):
+    _seed(db_session)
+
+    assert client.get("/admin/reports/usage").status_code == 403
+    assert client.get("/admin/reports/usage", headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    resp = client.get(
+        "/admin/reports/usage",
+        params={"from": "2025-05-01", "to": "2025-05-31"},
+        headers={"X-Admin-Key": admin_key},
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["calculations"] == 7
+    assert body["active_users"] == 4
+    assert len(body["days"]) == 2
+
+
+def test_admin_usage_disabled_without_key(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ADMIN_API_KEY", None)
+    assert client.get("/admin/reports/usage", headers={"X-Admin-Key": ""}).status_code == 403
+
+
+def test_admin_usage_rejects_bad_ranges(admin_key):
+    headers = {"X-Admin-Key": admin_key}
+    resp = client.get("/admin/reports/usage", params={"from": "2025-05-02", "to": "2025-05-01"}, headers=headers)
+    assert resp.status_code == 400
+    resp = client.get("/admin/reports/usage", params={"from": "2020-01-01", "to": "2025-01-01"}, headers=headers)
+    assert resp.status_code == 400
+
+
+def test_daily_counts_are_sharded_by_user(db_session):
+    users = [_persist_user(db_session) for _ in range(20)]
+    for user in users:
+        _add(db_session, user, "addition", datetime(2025, 5, 3, 12))
+    db_session.commit()
+
+    shards = db_session.query(UsageDailyCount.shard).filter(UsageDailyCount.day == date(2025, 5, 3)).all()
+    assert 1 < len(shards) <= USAGE_COUNT_SHARDS
+    report = build_usage_report(db_session, date(2025, 5, 3), date(2025, 5, 3))
+    assert report.by_type == {"addition": 20}
+    assert report.days[0].by_type == {"addition": 20}
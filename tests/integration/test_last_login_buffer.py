@@ -0,0 +1,106 @@
+# tests/integration/test_last_login_buffer.py
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.auth import last_login
+from app.auth.last_login import LastLoginBuffer
+from app.models.user import User, utcnow
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    """Enable last_login buffering for one test."""
+    buf = LastLoginBuffer(flush_seconds=30)
+    monkeypatch.setattr(last_login, "buffer", buf)
+    monkeypatch.setattr("app.models.user.last_login_buffer", buf)
+    return buf
+
+
+def _register(db_session, fake_user_data):
+    fake_user_data["password"] = "TestPass123"
+    user = User.register(db_session, fake_user_data)
+    db_session.commit()
+    return user
+
+
+def test_record_keeps_latest_timestamp():
+    buf = LastLoginBuffer(flush_seconds=30)
+    user_id = object()
+    now = utcnow()
+    buf.record(user_id, now)
+    buf.record(user_id, now - timedelta(minutes=1))
+    buf.record(user_id, now + timedelta(seconds=1))
+    assert len(buf) == 1
+    assert buf._drain() == {user_id: now + timedelta(seconds=1)}
+
+
+def test_buffered_login_does_not_write_until_flush(db_session, engine, fake_user_data, buffered):
+    user = _register(db_session, fake_user_data)
+
+    writes = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            writes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        result = User.authenticate(db_session, fake_user_data["username"], "TestPass123")
+        assert result["user"].last_login is not None  # visible in memory
+        db_session.commit()
+        assert writes == []
+        assert len(buffered) == 1
+
+        assert buffered.flush(engine) == 1
+        assert len(writes) == 1
+        assert "FROM (VALUES" in writes[0]
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+    db_session.refresh(user)
+    assert user.last_login is not None
+    assert len(buffered) == 0
+
+
+def test_flush_never_moves_last_login_backwards(db_session, engine, fake_user_data, buffered):
+    user = _register(db_session, fake_user_data)
+    latest = utcnow()
+
+    buffered.record(user.id, latest)
+    buffered.flush(engine)
+    buffered.record(user.id, latest - timedelta(hours=1))
+    buffered.flush(engine)
+
+    db_session.refresh(user)
+    assert user.last_login == latest
+
+
+def test_write_through_when_disabled(db_session, fake_user_data):
+    assert not last_login.buffer.enabled
+    user = _register(db_session, fake_user_data)
+    User.authenticate(db_session, fake_user_data["username"], "TestPass123")
+    db_session.commit()
+    db_session.refresh(user)
+    assert user.last_login is not None
+
+
+def test_shutdown_flushes_pending(db_session, engine, fake_user_data, buffered, monkeypatch):
+    import asyncio
+    from functools import partial
+
+    user = _register(db_session, fake_user_data)
+    buffered.record(user.id, utcnow())
+    # Flush into the test database rather than the app's default engine
+    monkeypatch.setattr(buffered, "flush", partial(buffered.flush, engine))
+
+    async def _lifecycle():
+        task = last_login.start_flusher()
+        assert task is not None
+        await last_login.stop_flusher(task)
+
+    asyncio.run(_lifecycle())
+
+    db_session.refresh(user)
+    assert user.last_login is not None
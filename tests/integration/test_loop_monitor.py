@@ -0,0 +1,115 @@
+# tests/integration/test_loop_monitor.py
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.auth import jwt
+from app.auth.passwords import get_password_hash
+from app.core.config import get_settings
+from app.core.loop_monitor import LoopMonitor, record_blocking_calls
+from app.database import get_db
+from app.main import app
+
+
+def _login(client):
+    username = f"loop_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Loop", "last_name": "Monitor",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_async_routes_do_not_block_the_event_loop():
+    async_routes = {
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and inspect.iscoroutinefunction(route.endpoint)
+    }
+    # Every async route must be exercised below
+    assert async_routes == {"/reports/jobs/{job_id}/events"}
+
+    jwt_app = FastAPI()
+
+    @jwt_app.get("/me")
+    async def me(user=Depends(jwt.get_current_user)):
+        return {"username": user.username}
+
+    client = TestClient(app)
+    with record_blocking_calls() as calls:
+        headers = _login(client)
+        job_id = client.post("/reports/jobs", json={"kind": "summary"}, headers=headers).json()["id"]
+        with client.stream("GET", f"/reports/jobs/{job_id}/events", headers=headers) as resp:
+            assert resp.status_code == 200
+            assert "event: succeeded" in "".join(resp.iter_text())
+
+        # async dependency with a user cache miss, then a hit
+        for _ in range(2):
+            assert TestClient(jwt_app).get("/me", headers=headers).status_code == 200
+    assert calls == []
+
+
+def test_blocking_calls_in_async_routes_are_flagged(caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "LOOP_BLOCK_DEBUG", True)
+    blocking_app = FastAPI()
+
+    @blocking_app.get("/blocking")
+    async def blocking_endpoint(db=Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        get_password_hash("x")
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        with record_blocking_calls() as calls:
+            assert TestClient(blocking_app).get("/blocking").status_code == 200
+    assert calls == ["sql", "bcrypt"]
+    assert all("in blocking_endpoint" in rec.getMessage() for rec in caplog.records)
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_loop_monitor_measures_lag_and_reports_stalls(caplog):
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.05, debug=True).start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        monitor = asyncio.run(scenario())
+    assert monitor.samples >= 3
+    assert monitor.max_lag >= 0.2
+    assert monitor.stalls == 1
+    assert "in block_the_loop" in caplog.records[0].getMessage()
+
+
+@pytest.fixture
+def quick_startup(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SCHEMA_STARTUP_MODE", "skip")
+    monkeypatch.setattr(settings, "WARMUP_ON_STARTUP", False)
+    monkeypatch.setattr(settings, "GC_FREEZE", False)
+    monkeypatch.setattr(settings, "LOOP_MONITOR_INTERVAL_MS", 5.0)
+
+
+def test_lifespan_runs_the_monitor(quick_startup):
+    with TestClient(app) as client:
+        monitor = app.state.loop_monitor
+        deadline = time.monotonic() + 2
+        while monitor.samples == 0 and time.monotonic() < deadline:
+            assert client.get("/health").status_code == 200
+    assert monitor.samples > 0
@@ -0,0 +1,84 @@
+# tests/integration/test_metrics.py
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.main import app
+
+pytestmark = pytest.mark.skipif(not metrics.METRICS_AVAILABLE, reason="prometheus_client not installed")
+
+
+def _samples(client):
+    from prometheus_client.parser import text_string_to_metric_families
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(r.text)
+        for sample in family.samples
+    }
+
+
+def _value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def _login(client):
+    username = f"met_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Met", "last_name": "Rics",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_metrics_endpoint_reports_routes_pool_and_caches():
+    client = TestClient(app)
+    headers = _login(client)
+    before = _samples(client)
+
+    calc_id = client.post("/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=headers).json()["id"]
+    assert client.get(f"/calculations/{calc_id}", headers=headers).status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+    for _ in range(2):
+        r = client.post("/reports/aggregate", json={"dimensions": ["type"]}, headers=headers)
+        assert r.status_code == 200
+
+    after = _samples(client)
+    route = "/calculations/{calc_id}"
+    assert _value(after, "http_request_duration_seconds_count", method="GET", route=route, status="200") \
+        == _value(before, "http_request_duration_seconds_count", method="GET", route=route, status="200") + 1
+    assert _value(after, "http_request_duration_seconds_count", method="GET", route=metrics.UNMATCHED_ROUTE, status="404") >= 1
+    # /metrics itself is not timed
+    assert not any(labels and dict(labels).get("route") == "/metrics" for _, labels in after)
+    assert _value(after, "http_requests_in_progress", method="GET") == 0
+
+    assert _value(after, "db_pool_checkouts_total") > _value(before, "db_pool_checkouts_total")
+    assert _value(after, "db_pool_checkout_seconds_count") > _value(before, "db_pool_checkout_seconds_count")
+    assert _value(after, "cache_requests_total", cache="aggregate", result="hit") \
+        == _value(before, "cache_requests_total", cache="aggregate", result="hit") + 1
+    assert _value(after, "cache_requests_total", cache="aggregate", result="miss") \
+        == _value(before, "cache_requests_total", cache="aggregate", result="miss") + 1
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = "from app.core.metrics import record_cache; record_cache('user', hit=True)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, check=True)
+
+    render = "from app.core.metrics import render_latest; print(render_latest()[0].decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", render], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'cache_requests_total{cache="user",result="hit"} 2.0' in output
@@ -0,0 +1,61 @@
+# tests/integration/test_operand_search.py
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from app.main import app
+from app.models.calculation import Calculation
+
+client = TestClient(app)
+
+
+def test_inputs_is_jsonb_with_gin_index(engine):
+    columns = {c["name"]: c for c in inspect(engine).get_columns("calculations")}
+    assert columns["inputs"]["type"].__class__.__name__ == "JSONB"
+    indexes = {i["name"]: i for i in inspect(engine).get_indexes("calculations")}
+    assert indexes["ix_calculations_inputs_gin"]["dialect_options"]["postgresql_using"] == "gin"
+
+
+def test_containment_matches_numeric_operands(db_session, test_user):
+    for inputs in ([19.99, 1], [1, 2], [2, 19.99, 3], [199.9, 1]):
+        calc = Calculation.create("addition", test_user.id, inputs)
+        calc.result = calc.get_result()
+        db_session.add(calc)
+    db_session.commit()
+
+    def search(*operands):
+        return sorted(
+            c.inputs for c in db_session.query(Calculation)
+            .filter(Calculation.user_id == test_user.id, Calculation.inputs.contains(list(operands)))
+        )
+
+    assert search(19.99) == [[2, 19.99, 3], [19.99, 1]]
+    assert search(19.99, 3) == [[2, 19.99, 3]]
+    # Numeric equality: 2.0 matches a stored 2
+    assert search(2.0) == [[1, 2], [2, 19.99, 3]]
+    assert search(7) == []
+
+
+def test_list_calculations_contains(db_session):
+    username = f"ops_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Op", "last_name": "Search",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for inputs in ([19.99, 5], [5, 10], [19.99, 10]):
+        r = client.post("/calculations", json={"type": "addition", "inputs": inputs}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.get("/calculations", params={"contains": 19.99}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert sorted(c["inputs"] for c in r.json()) == [[19.99, 5], [19.99, 10]]
+
+    r = client.get("/calculations", params=[("contains", 19.99), ("contains", 10)], headers=headers)
+    assert [c["inputs"] for c in r.json()] == [[19.99, 10]]
+
+    assert client.get("/calculations", params={"contains": "abc"}, headers=headers).status_code == 422
@@ -0,0 +1,67 @@
+# tests/integration/test_profiler.py
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.profiler import ProfilerMiddleware, install_profiler
+from app.main import app as main_app
+
+
+def busy_endpoint_work(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+    return n
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1.0)
+
+    app = FastAPI()
+    install_profiler(app, str(tmp_path))
+
+    @app.get("/busy")
+    def busy():
+        return {"n": busy_endpoint_work(0.1)}
+
+    return TestClient(app)
+
+
+def test_admin_header_profiles_the_request(client, tmp_path):
+    r = client.get("/busy", headers={"X-Profile": "1", "X-Admin-Key": "admin-secret"})
+    assert r.status_code == 200
+    name = r.headers["x-profile-file"]
+    assert name.endswith(".collapsed") and "GET-busy" in name
+
+    lines = (tmp_path / name).read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_endpoint_work (test_profiler.py:" in line for line in lines)
+
+
+def test_requests_are_not_profiled_without_authorization(client, tmp_path):
+    for headers in ({}, {"X-Profile": "1"}, {"X-Profile": "1", "X-Admin-Key": "wrong"}):
+        r = client.get("/busy", headers=headers)
+        assert "x-profile-file" not in r.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sample_rate(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PROFILE_SAMPLE_RATE", 1.0)
+    assert "x-profile-file" in client.get("/busy").headers
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_profiler_is_not_installed_by_default():
+    assert get_settings().PROFILE_DIR is None
+    assert ProfilerMiddleware not in [m.cls for m in main_app.user_middleware]
@@ -0,0 +1,69 @@
+# tests/integration/test_provision_users.py
+import json
+
+from app.models.user import User
+from app.provision_users import main, provision, read_records
+
+
+def _record(n, **overrides):
+    record = {
+        "first_name": "Bulk",
+        "last_name": f"User{n}",
+        "email": f"bulk{n}@example.com",
+        "username": f"bulk_{n}",
+        "password": "TestPass123",
+    }
+    record.update(overrides)
+    return record
+
+
+def test_provision_inserts_and_reports(db_session, engine):
+    existing = _record(0)
+    User.register(db_session, existing)
+    db_session.commit()
+
+    records = [
+        existing,                      # already registered -> skipped
+        _record(1),
+        _record(2),
+        _record(3, password="short"),  # invalid
+        _record(4, email=""),          # invalid
+        _record(5, password=12345678),  # invalid: not a string
+        _record(6, password=True),     # invalid: not a string
+        _record(7, last_name="x" * 51),  # invalid: longer than varchar(50)
+        _record(8, first_name="x" * 50),  # at the limit
+    ]
+    report = provision(records, engine=engine, workers=1, batch_size=2, progress=False)
+
+    assert report.processed == 9
+    assert report.inserted == 3
+    assert report.skipped == 1
+    assert report.invalid == 5
+
+    user = db_session.query(User).filter(User.username == "bulk_1").one()
+    assert user.is_active is True and user.is_verified is False
+    assert user.verify_password("TestPass123")
+
+
+def test_read_records_csv_and_ndjson(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text(
+        "first_name,last_name,email,username,password\n"
+        "A,B,a@example.com,a_user,TestPass123\n"
+    )
+    ndjson_path = tmp_path / "users.ndjson"
+    ndjson_path.write_text(json.dumps(_record(7)) + "\n\n")
+
+    assert list(read_records(csv_path))[0]["username"] == "a_user"
+    assert list(read_records(ndjson_path)) == [_record(7)]
+
+
+def test_cli_is_idempotent(tmp_path, db_session):
+    path = tmp_path / "users.ndjson"
+    path.write_text("\n".join(json.dumps(_record(n)) for n in range(3)))
+
+    first = main([str(path), "--workers", "1"])
+    second = main([str(path), "--workers", "1"])
+
+    assert first.inserted == 3
+    assert second.inserted == 0 and second.skipped == 3
@@ -0,0 +1,273 @@
+# tests/integration/test_query_plans.py
+"""
+EXPLAIN snapshot tests for the queries issued by app.main and
+app.reports.service.
+
+A realistically sized dataset is seeded in one transaction that is rolled
+back at the end of the module: SEED_USERS users with SEED_CALCULATIONS
+calculations spread over a few months, the matching rollups, sketches and
+usage rows, and ANALYZE. Each case then calls an endpoint or service
+function against that data, captures every statement it sends, and runs
+``EXPLAIN (FORMAT JSON)`` on it with the same parameters. These properties
+are compared with tests/integration/snapshots/query_plans.json:
+
+- the indexes the plan uses
+- the relations it reads with a Seq Scan (never ``calculations``)
+- the estimated total cost, which may not exceed COST_TOLERANCE times the
+  snapshot
+
+After an intended query or index change, refresh the snapshots with
+``UPDATE_PLAN_SNAPSHOTS=1 pytest tests/integration/test_query_plans.py``
+and review the diff.
+"""
+import hashlib
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app import main
+from app.auth.passwords import get_password_hash
+from app.core.query_stats import normalize_statement
+from app.database import engine
+from app.models.calculation import Calculation
+from app.models.user import User
+from app.reports import service
+from app.reports.hll import REGISTERS
+from app.schemas.calculation import CalculationBase, CalculationType, CalculationUpdate
+from app.schemas.user import UserCreate, UserLogin
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="EXPLAIN (FORMAT JSON) snapshots need PostgreSQL"
+)
+
+SNAPSHOT_PATH = Path(__file__).parent / "snapshots" / "query_plans.json"
+UPDATE_SNAPSHOTS = os.environ.get("UPDATE_PLAN_SNAPSHOTS") == "1"
+
+SEED_USERS = 1000
+SEED_CALCULATIONS = 100_000
+# Calculations of the user every case runs as, created through the ORM so the
+# rollup, sketch and usage events run as in production
+TARGET_CALCULATIONS = 300
+# Extra calculations of one seeded user, enough of the table for the
+# approximate summary to take its TABLESAMPLE branch
+HEAVY_CALCULATIONS = 20_000
+HEAVY_USER_ID = uuid.UUID(hashlib.md5(b"plan-user-1").hexdigest())
+PASSWORD = "Abcd1234!"
+COST_TOLERANCE = 2.0
+# Slack for tiny plans, where a row estimate of 1 vs 2 doubles the cost
+COST_SLACK = 10.0
+
+_SKIPPED_PREFIXES = ("SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT")
+
+
+def _seed(db: Session, password_hash: str):
+    db.execute(text(
+        "INSERT INTO users (id, username, email, password, first_name, last_name, "
+        "is_active, is_verified, created_at, updated_at) "
+        "SELECT md5('plan-user-' || i)::uuid, 'plan_user_' || i, 'plan_user_' || i || '@example.com', "
+        ":password, 'Plan', 'User', true, true, now(), now() "
+        "FROM generate_series(1, :users) AS i"
+    ), {"password": password_hash, "users": SEED_USERS})
+    # Rows of one user are spread over the table, as with real traffic
+    db.execute(text(
+        "INSERT INTO calculations (id, user_id, type, inputs, result, created_at, updated_at) "
+        "SELECT md5('plan-calc-' || i)::uuid, md5('plan-user-' || (i % :users + 1))::uuid, "
+        "(ARRAY['addition', 'subtraction', 'multiplication', 'division'])[i % 4 + 1], "
+        "jsonb_build_array(i % 97, i % 13 + 1), (i % 97) + (i % 13 + 1), "
+        "timestamp '2024-01-01' + i * interval '100 seconds', "
+        "timestamp '2024-01-01' + i * interval '100 seconds' "
+        "FROM generate_series(1, :calculations) AS i"
+    ), {"users": SEED_USERS, "calculations": SEED_CALCULATIONS})
+    db.execute(text(
+        "INSERT INTO calculations (id, user_id, type, inputs, result, created_at, updated_at) "
+        "SELECT md5('plan-heavy-' || i)::uuid, :user_id, 'addition', jsonb_build_array(i % 97, 1), "
+        "i % 97 + 1, timestamp '2024-01-01' + i * interval '500 seconds', "
+        "timestamp '2024-01-01' + i * interval '500 seconds' "
+        "FROM generate_series(1, :calculations) AS i"
+    ), {"user_id": HEAVY_USER_ID, "calculations": HEAVY_CALCULATIONS})
+    for granularity in ("hour", "day"):
+        db.execute(text(
+            "INSERT INTO calculation_rollups (user_id, granularity, bucket_start, type, count) "
+            "SELECT c.user_id, :granularity, date_trunc(:granularity, c.created_at), c.type, count(*) "
+            "FROM calculations AS c JOIN users AS u ON u.id = c.user_id "
+            "WHERE u.username LIKE 'plan\\_user\\_%' GROUP BY 1, 2, 3, 4"
+        ), {"granularity": granularity})
+    db.execute(text(
+        "INSERT INTO usage_daily_counts (day, type, count) "
+        "SELECT c.created_at::date, c.type, count(*) "
+        "FROM calculations AS c JOIN users AS u ON u.id = c.user_id "
+        "WHERE u.username LIKE 'plan\\_user\\_%' GROUP BY 1, 2 "
+        "ON CONFLICT (day, type, shard) DO UPDATE SET count = usage_daily_counts.count + excluded.count"
+    ))
+    db.execute(text(
+        "INSERT INTO usage_daily_registers (day, register, rank) "
+        "SELECT day::date, register, 1 + register % 5 "
+        "FROM generate_series(date '2024-01-01', date '2024-01-01' + :days, interval '1 day') AS day, "
+        "generate_series(0, :registers - 1, 4) AS register "
+        "ON CONFLICT (day, register) DO NOTHING"
+    ), {"days": SEED_CALCULATIONS * 100 // 86400, "registers": REGISTERS})
+
+    user = User(
+        first_name="Plan", last_name="Target", email="plan_target@example.com",
+        username="plan_target", password=password_hash,
+    )
+    db.add(user)
+    db.flush()
+    for i in range(TARGET_CALCULATIONS):
+        calc = Calculation.create(
+            ("addition", "subtraction", "multiplication", "division")[i % 4], user.id, [i % 97, i % 13 + 1]
+        )
+        calc.result = calc.get_result()
+        db.add(calc)
+    db.flush()
+    # Every user has one sketch per type, like the target user
+    db.execute(text(
+        "INSERT INTO calculation_result_sketches (user_id, type, count, sketch) "
+        "SELECT md5('plan-user-' || i)::uuid, s.type, s.count, s.sketch "
+        "FROM generate_series(1, :users) AS i, calculation_result_sketches AS s "
+        "WHERE s.user_id = :target"
+    ), {"users": SEED_USERS, "target": user.id})
+    for table in ("users", "calculations", "calculation_rollups", "calculation_result_sketches",
+                  "usage_daily_counts", "usage_daily_registers"):
+        db.execute(text(f"ANALYZE {table}"))
+    return user
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Endpoint commits only release savepoints; everything is rolled back below
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        user = _seed(db, get_password_hash(PASSWORD))
+        calc_ids = [
+            row.id for row in db.query(Calculation.id).filter(Calculation.user_id == user.id).limit(2)
+        ]
+        yield db, user, calc_ids
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+CASES = {
+    # app.main
+    "register": lambda db, user, calcs: main.register(UserCreate(
+        first_name="Plan", last_name="New", email="plan_new@example.com",
+        username="plan_new", password=PASSWORD, confirm_password=PASSWORD,
+    ), db),
+    "login": lambda db, user, calcs: main.login_json(UserLogin(username=user.username, password=PASSWORD), db),
+    "create_calculation": lambda db, user, calcs: main.create_calculation(
+        CalculationBase(type=CalculationType.ADDITION, inputs=[1, 2]), user, db
+    ),
+    "list_calculations": lambda db, user, calcs: main.list_calculations(None, None, None, None, user, db),
+    "list_calculations_result_range": lambda db, user, calcs: main.list_calculations(10, 20, None, None, user, db),
+    "list_calculations_type": lambda db, user, calcs: main.list_calculations(
+        None, None, CalculationType.DIVISION, None, user, db
+    ),
+    "list_calculations_contains": lambda db, user, calcs: main.list_calculations(None, None, None, [42], user, db),
+    "get_calculation": lambda db, user, calcs: main.get_calculation(str(calcs[0]), user, db),
+    "update_calculation": lambda db, user, calcs: main.update_calculation(
+        str(calcs[0]), CalculationUpdate(inputs=[3, 4]), user, db
+    ),
+    "delete_calculation": lambda db, user, calcs: main.delete_calculation(str(calcs[1]), user, db),
+    # app.reports.service
+    "report_summary": lambda db, user, calcs: service.build_report_summary(db, user.id),
+    "approx_report_summary": lambda db, user, calcs: service.build_approx_report_summary(db, user.id),
+    "approx_report_summary_sampled": lambda db, user, calcs: service.build_approx_report_summary(
+        db, HEAVY_USER_ID
+    ),
+    "timeseries_day": lambda db, user, calcs: service.build_timeseries(db, user.id, "day"),
+    "timeseries_week": lambda db, user, calcs: service.build_timeseries(db, user.id, "week", calc_type="addition"),
+    "quantile_report": lambda db, user, calcs: service.build_quantile_report(db, user.id),
+    "usage_report": lambda db, user, calcs: service.build_usage_report(db, date(2024, 1, 1), date(2024, 1, 31)),
+    "result_histogram": lambda db, user, calcs: service.build_result_histogram(db, user.id),
+    "result_histogram_bounds": lambda db, user, calcs: service.build_result_histogram(
+        db, user.id, buckets=5, min_result=0, max_result=50, calc_type="addition"
+    ),
+}
+
+
+@contextmanager
+def captured_statements(connection):
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith(_SKIPPED_PREFIXES):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", _capture)
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def plan_properties(connection, statement, parameters) -> dict:
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()[0]["Plan"]
+    nodes = list(_walk(plan))
+    return {
+        "statement": normalize_statement(statement),
+        "indexes": sorted({node["Index Name"] for node in nodes if "Index Name" in node}),
+        "seq_scans": sorted({node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}),
+        "total_cost": plan["Total Cost"],
+    }
+
+
+def _load_snapshots() -> dict:
+    if SNAPSHOT_PATH.exists():
+        return json.loads(SNAPSHOT_PATH.read_text())
+    return {}
+
+
+def _write_snapshot(name: str, plans: list) -> None:
+    snapshots = _load_snapshots()
+    snapshots[name] = plans
+    SNAPSHOT_PATH.parent.mkdir(exist_ok=True)
+    SNAPSHOT_PATH.write_text(json.dumps(dict(sorted(snapshots.items())), indent=2) + "\n")
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_query_plans_match_snapshots(seeded, name):
+    db, user, calcs = seeded
+    # Reload the user now if an earlier case's commit expired it
+    db.refresh(user)
+    connection = db.connection()
+    with captured_statements(connection) as statements:
+        CASES[name](db, user, calcs)
+    plans = [plan_properties(connection, statement, parameters) for statement, parameters in statements]
+    assert plans, f"{name} issued no queries"
+
+    for plan in plans:
+        assert "calculations" not in plan["seq_scans"], f"Seq Scan on calculations in {name}: {plan['statement']}"
+
+    if UPDATE_SNAPSHOTS:
+        _write_snapshot(name, plans)
+        return
+
+    expected = _load_snapshots().get(name)
+    assert expected is not None, f"No plan snapshot for {name}; run with UPDATE_PLAN_SNAPSHOTS=1"
+    assert [p["statement"] for p in plans] == [p["statement"] for p in expected], (
+        f"Queries issued by {name} changed; review and run with UPDATE_PLAN_SNAPSHOTS=1"
+    )
+    for plan, snapshot in zip(plans, expected):
+        assert plan["indexes"] == snapshot["indexes"], plan["statement"]
+        assert plan["seq_scans"] == snapshot["seq_scans"], plan["statement"]
+        assert plan["total_cost"] <= snapshot["total_cost"] * COST_TOLERANCE + COST_SLACK, (
+            f"Estimated cost {plan['total_cost']} exceeds {COST_TOLERANCE}x the snapshot "
+            f"({snapshot['total_cost']}): {plan['statement']}"
+        )
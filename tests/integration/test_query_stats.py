@@ -0,0 +1,87 @@
+# tests/integration/test_query_stats.py
+import logging
+import re
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.query_stats import normalize_statement
+from app.database import engine
+from app.main import app
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)')
+
+
+def _timing(response):
+    match = _SERVER_TIMING.fullmatch(response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    return float(match[1]), int(match[2]), float(match[3])
+
+
+def test_server_timing_counts_request_queries(caplog):
+    client = TestClient(app)
+    db_ms, queries, app_ms = _timing(client.get("/health"))
+    assert queries == 0 and db_ms == 0
+
+    username = f"qs_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Query", "last_name": "Stats",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        r = client.get("/reports/summary", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    db_ms, queries, app_ms = _timing(r)
+    assert queries >= 1
+    assert 0 < db_ms <= app_ms
+
+    record = next(rec for rec in caplog.records if rec.name == "app.requests")
+    assert (record.route, record.status, record.db_queries) == ("/reports/summary", 200, queries)
+
+
+def test_slow_queries_are_logged_normalized(caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "SLOW_QUERY_MS", 5)
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_sleep(0.02), :label"), {"label": "secret"})
+            conn.execute(text("SELECT 1"))
+    slow = [rec for rec in caplog.records if rec.name == "app.sql.slow"]
+    assert len(slow) == 1
+    assert slow[0].statement == "SELECT pg_sleep(?), ?"
+    assert slow[0].duration_ms >= 20
+
+
+def test_normalize_statement():
+    assert normalize_statement(
+        "SELECT a::uuid, 'it''s' FROM t\n  WHERE id IN (%(id_1)s, %(id_2)s) AND v > 3.5 LIMIT %(param_1)s"
+    ) == "SELECT a::uuid, ? FROM t WHERE id IN (?, ...) AND v > ? LIMIT ?"
+
+
+def test_list_and_summary_query_counts_do_not_grow_with_rows(query_budget):
+    client = TestClient(app)
+    username = f"qs_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Query", "last_name": "Budget",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def queries_for(path):
+        assert client.get(path, headers=headers).status_code == 200
+        return query_budget.calls[-1].queries
+
+    counts = []
+    for rows in (1, 5):
+        while len(client.get("/calculations", headers=headers).json()) < rows:
+            client.post("/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=headers)
+        counts.append((queries_for("/calculations"), queries_for("/reports/summary")))
+    assert counts[0] == counts[1]
@@ -0,0 +1,235 @@
+# tests/integration/test_report_jobs.py
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.calculation import Calculation
+from app.models.report_job import ReportJob
+from app.reports import jobs
+from app.reports.service import build_timeseries
+
+BASE = datetime(2023, 1, 2, 12)  # a Monday
+
+
+class _InlineExecutor:
+    """Runs submitted jobs immediately, in the test thread."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def long_history(db_session, test_user):
+    # Spans several time-series windows so progress is reported in steps
+    for days in (0, 1, 200, 400, 800):
+        calc = Calculation.create("addition", test_user.id, [1, 2])
+        calc.result = calc.get_result()
+        calc.created_at = BASE + timedelta(days=days)
+        db_session.add(calc)
+    db_session.commit()
+    return test_user
+
+
+def _reload(db_session, job):
+    db_session.expire_all()
+    return db_session.get(ReportJob, job.id)
+
+
+def test_timeseries_job_matches_direct_report(db_session, long_history, monkeypatch):
+    seen = []
+    original = jobs.JOB_KINDS["timeseries"]
+    monkeypatch.setitem(
+        jobs.JOB_KINDS, "timeseries",
+        lambda db, uid, params, progress: original(db, uid, params, lambda f: (seen.append(f), progress(f))),
+    )
+
+    job = jobs.submit_job(db_session, long_history.id, "timeseries", {"bucket": "week"}, executor=_InlineExecutor())
+    job = _reload(db_session, job)
+
+    assert job.status == "succeeded"
+    assert job.progress == 1.0
+    assert job.started_at and job.finished_at
+    assert len(seen) > 1 and seen == sorted(seen) and seen[-1] == pytest.approx(1.0)
+    direct = build_timeseries(db_session, long_history.id, bucket="week").model_dump(mode="json")
+    assert job.result == direct
+
+
+def test_failed_job_records_error(db_session, long_history):
+    job = jobs.submit_job(db_session, long_history.id, "timeseries", {"bucket": "year"}, executor=_InlineExecutor())
+    job = _reload(db_session, job)
+    assert job.status == "failed"
+    assert "Unsupported bucket" in job.error
+    assert job.result is None
+
+
+def test_unknown_kind_is_rejected(db_session, test_user):
+    with pytest.raises(ValueError):
+        jobs.submit_job(db_session, test_user.id, "nope", executor=_InlineExecutor())
+
+
+def test_cleanup_fails_orphans_and_purges_expired_jobs(db_session, test_user):
+    now = datetime.utcnow()
+
+    def _job(status, created_ago, finished_ago=None):
+        job = ReportJob(
+            user_id=test_user.id, kind="summary", params={}, status=status, progress=0.0,
+            created_at=now - created_ago,
+            finished_at=now - finished_ago if finished_ago is not None else None,
+        )
+        db_session.add(job)
+        return job
+
+    orphaned = _job("running", timedelta(hours=2))
+    queued = _job("pending", timedelta(seconds=5))
+    expired = _job("succeeded", timedelta(days=3), finished_ago=timedelta(days=3))
+    recent = _job("failed", timedelta(hours=1), finished_ago=timedelta(hours=1))
+    db_session.commit()
+    ids = {name: job.id for name, job in
+           (("orphaned", orphaned), ("queued", queued), ("expired", expired), ("recent", recent))}
+
+    assert jobs.cleanup_jobs() == (1, 1)
+
+    db_session.expire_all()
+    assert db_session.get(ReportJob, ids["expired"]) is None
+    assert db_session.get(ReportJob, ids["queued"]).status == "pending"
+    assert db_session.get(ReportJob, ids["recent"]).status == "failed"
+    orphaned = db_session.get(ReportJob, ids["orphaned"])
+    assert orphaned.status == "failed"
+    assert "resubmit" in orphaned.error and orphaned.finished_at is not None
+
+
+def _backdate(db, job_id, ago=timedelta(hours=2)):
+    then = datetime.utcnow() - ago
+    db.query(ReportJob).filter(ReportJob.id == job_id).update(
+        {ReportJob.created_at: then, ReportJob.started_at: then, ReportJob.heartbeat_at: then},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def test_cleanup_keeps_jobs_this_process_is_running(db_session, test_user, monkeypatch):
+    cleaned = []
+
+    def slow_report(db, uid, params, progress):
+        # A long job that has reported no progress for longer than the stale age
+        job_id = db.query(ReportJob.id).filter(ReportJob.user_id == uid).scalar()
+        _backdate(db, job_id)
+        cleaned.append(jobs.cleanup_jobs())
+        progress(0.5)
+        return {"done": True}
+
+    monkeypatch.setitem(jobs.JOB_KINDS, "summary", slow_report)
+    job = jobs.submit_job(db_session, test_user.id, "summary", executor=_InlineExecutor())
+    job = _reload(db_session, job)
+
+    assert cleaned == [(0, 0)]
+    assert job.status == "succeeded" and job.result == {"done": True}
+    assert job.id not in jobs._live_jobs
+
+
+def test_cleanup_keeps_jobs_queued_behind_a_busy_pool(db_session, test_user):
+    class _BusyExecutor:
+        def submit(self, fn, *args):
+            pass
+
+    job = jobs.submit_job(db_session, test_user.id, "summary", executor=_BusyExecutor())
+    try:
+        _backdate(db_session, job.id)
+        assert jobs.cleanup_jobs() == (0, 0)
+        assert _reload(db_session, job).status == "pending"
+    finally:
+        jobs._live_jobs.discard(job.id)
+
+
+def test_job_failed_by_cleanup_is_not_overwritten(db_session, test_user, monkeypatch):
+    def orphaned_report(db, uid, params, progress):
+        # As if another worker ran the job and exited without a heartbeat
+        job_id = db.query(ReportJob.id).filter(ReportJob.user_id == uid).scalar()
+        jobs._live_jobs.discard(job_id)
+        _backdate(db, job_id)
+        assert jobs.cleanup_jobs() == (1, 0)
+        return {"done": True}
+
+    monkeypatch.setitem(jobs.JOB_KINDS, "summary", orphaned_report)
+    job = jobs.submit_job(db_session, test_user.id, "summary", executor=_InlineExecutor())
+    job = _reload(db_session, job)
+
+    assert job.status == "failed" and "resubmit" in job.error
+    assert job.result is None
+
+
+def test_progress_stops_a_job_failed_by_cleanup(db_session, test_user, monkeypatch):
+    reached = []
+
+    def orphaned_report(db, uid, params, progress):
+        job_id = db.query(ReportJob.id).filter(ReportJob.user_id == uid).scalar()
+        jobs._live_jobs.discard(job_id)
+        _backdate(db, job_id)
+        jobs.cleanup_jobs()
+        progress(0.5)
+        reached.append(True)
+
+    monkeypatch.setitem(jobs.JOB_KINDS, "summary", orphaned_report)
+    job = jobs.submit_job(db_session, test_user.id, "summary", executor=_InlineExecutor())
+    job = _reload(db_session, job)
+
+    assert reached == []
+    assert job.status == "failed" and job.progress == 0.0
+
+
+def _register(client):
+    username = f"job_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Report", "last_name": "Job",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_job_endpoints_and_event_stream(db_session):
+    client = TestClient(app)
+    headers = _register(client)
+    for calc_type in ("addition", "subtraction"):
+        r = client.post("/calculations", json={"type": calc_type, "inputs": [3, 1]}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.post("/reports/jobs", json={"kind": "summary"}, headers=headers)
+    assert r.status_code == 202, r.text
+    job_id = r.json()["id"]
+
+    deadline = time.monotonic() + 10
+    while True:
+        body = client.get(f"/reports/jobs/{job_id}", headers=headers).json()
+        if body["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert body["status"] == "succeeded", body
+    assert body["result"]["total_calculations"] == 2
+
+    with client.stream("GET", f"/reports/jobs/{job_id}/events", headers=headers) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        text = "".join(resp.iter_text())
+    event, data = text.strip().split("\n")
+    assert event == "event: succeeded"
+    assert json.loads(data[len("data: "):])["id"] == job_id
+
+    # Other users cannot see the job
+    other = _register(client)
+    assert client.get(f"/reports/jobs/{job_id}", headers=other).status_code == 404
+    assert client.get(f"/reports/jobs/{job_id}/events", headers=other).status_code == 404
+
+
+def test_job_kind_is_validated(db_session):
+    client = TestClient(app)
+    headers = _register(client)
+    r = client.post("/reports/jobs", json={"kind": "export"}, headers=headers)
+    assert r.status_code == 422
@@ -0,0 +1,148 @@
+# tests/integration/test_reports_aggregate.py
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.main import app
+from app.models.calculation import Calculation
+from app.reports import aggregate
+from app.reports.aggregate import AggregateLimitError, run_aggregate
+from app.schemas.report import AggregateQuery
+
+BASE = datetime(2025, 4, 1, 9)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    aggregate.clear_cache()
+    yield
+    aggregate.clear_cache()
+
+
+@pytest.fixture
+def history(db_session, test_user):
+    rows = []
+    for offset, calc_type, inputs in [
+        (0, "addition", [1, 2]),              # 3
+        (1, "addition", [1, 2, 3]),           # 6
+        (25, "addition", [1, 1, 1, 1, 1, 1]), # 6
+        (26, "division", [8, 2]),             # 4
+        (50, "multiplication", [2, 3, 4, 5]), # 120
+    ]:
+        calc = Calculation.create(calc_type, test_user.id, inputs)
+        calc.result = calc.get_result()
+        calc.created_at = BASE + timedelta(hours=offset)
+        rows.append(calc)
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def _query(**kwargs):
+    return AggregateQuery(**kwargs)
+
+
+def test_group_by_type_with_metrics(db_session, test_user, history):
+    result = run_aggregate(db_session, test_user.id, _query(
+        dimensions=["type"], metrics=["count", "sum_result", "avg_result", "min_result", "max_result"],
+    ))
+    assert result.truncated is False
+    assert result.rows == [
+        {"type": "addition", "count": 3, "sum_result": 15.0, "avg_result": 5.0, "min_result": 3.0, "max_result": 6.0},
+        {"type": "division", "count": 1, "sum_result": 4.0, "avg_result": 4.0, "min_result": 4.0, "max_result": 4.0},
+        {"type": "multiplication", "count": 1, "sum_result": 120.0, "avg_result": 120.0, "min_result": 120.0, "max_result": 120.0},
+    ]
+
+
+def test_group_by_day_and_input_count_bucket(db_session, test_user, history):
+    result = run_aggregate(db_session, test_user.id, _query(
+        dimensions=["input_count_bucket", "day"], metrics=["count"],
+        start=BASE - timedelta(days=1), end=BASE + timedelta(days=5),
+    ))
+    # Dimensions are normalized into a fixed order
+    assert result.dimensions == ["day", "input_count_bucket"]
+    assert result.rows == [
+        {"day": "2025-04-01", "input_count_bucket": "2", "count": 1},
+        {"day": "2025-04-01", "input_count_bucket": "3", "count": 1},
+        {"day": "2025-04-02", "input_count_bucket": "2", "count": 1},
+        {"day": "2025-04-02", "input_count_bucket": "6-10", "count": 1},
+        {"day": "2025-04-03", "input_count_bucket": "4-5", "count": 1},
+    ]
+
+
+def test_filters_limit_and_totals(db_session, test_user, history):
+    total = run_aggregate(db_session, test_user.id, _query(metrics=["count"], type="addition"))
+    assert total.rows == [{"count": 3}]
+
+    limited = run_aggregate(db_session, test_user.id, _query(dimensions=["type"], limit=2))
+    assert len(limited.rows) == 2
+    assert limited.truncated is True
+
+
+def test_results_are_cached_and_invalidated(db_session, test_user, history):
+    query = _query(dimensions=["type"], metrics=["count"])
+    first = run_aggregate(db_session, test_user.id, query)
+    # Same normalized query (duplicate metric) is served from the cache
+    again = run_aggregate(db_session, test_user.id, _query(dimensions=["type"], metrics=["count", "count"]))
+    assert first.cached is False
+    assert again.cached is True
+    assert again.rows == first.rows
+
+    calc = Calculation.create("division", test_user.id, [9, 3])
+    calc.result = calc.get_result()
+    db_session.add(calc)
+    db_session.commit()
+    fresh = run_aggregate(db_session, test_user.id, query)
+    assert fresh.cached is False
+    assert {"type": "division", "count": 2} in fresh.rows
+
+
+def test_cost_limits(db_session, test_user, history, monkeypatch):
+    with pytest.raises(AggregateLimitError):
+        run_aggregate(db_session, test_user.id, _query(
+            dimensions=["day"], start=datetime(2020, 1, 1), end=datetime(2025, 1, 1),
+        ))
+
+    monkeypatch.setattr(get_settings(), "AGGREGATE_MAX_COST", 0.001)
+    with pytest.raises(AggregateLimitError, match="too expensive"):
+        run_aggregate(db_session, test_user.id, _query(dimensions=["type"]))
+
+
+def test_statement_timeout_is_scoped(db_session, test_user, history):
+    before = db_session.execute(text("SHOW statement_timeout")).scalar()
+    run_aggregate(db_session, test_user.id, _query(dimensions=["type"]))
+    assert db_session.execute(text("SHOW statement_timeout")).scalar() == before
+
+
+def test_aggregate_endpoint(db_session):
+    client = TestClient(app)
+    username = f"agg_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Ag", "last_name": "Gregate",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for inputs in ([3, 1], [4, 4, 4]):
+        r = client.post("/calculations", json={"type": "addition", "inputs": inputs}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.post("/reports/aggregate", json={
+        "dimensions": ["type", "day"], "metrics": ["count", "max_result"],
+    }, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [(row["type"], row["count"], row["max_result"]) for row in body["rows"]] == [("addition", 2, 12.0)]
+
+    assert client.post("/reports/aggregate", json={"dimensions": ["user_id"]}, headers=headers).status_code == 422
+    assert client.post("/reports/aggregate", json={"metrics": []}, headers=headers).status_code == 422
+    r = client.post("/reports/aggregate", json={
+        "dimensions": ["day"], "from": "2000-01-01T00:00:00", "to": "2025-01-01T00:00:00",
+    }, headers=headers)
+    assert r.status_code == 400
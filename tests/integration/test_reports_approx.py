@@ -0,0 +1,112 @@
+# tests/integration/test_reports_approx.py
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import app
+from app.models.calculation import Calculation
+from app.reports import service
+from app.reports.service import (
+    _sample_operand_counts,
+    build_approx_report_summary,
+    build_report_summary,
+)
+
+ROWS = 400
+
+
+@pytest.fixture
+def big_history(db_session, test_user):
+    # Alternating 2 and 3 inputs: exact average 2.5
+    rows = []
+    for i in range(ROWS):
+        calc_type = "addition" if i % 3 else "multiplication"
+        calc = Calculation.create(calc_type, test_user.id, [1, 2] if i % 2 else [1, 2, 3])
+        calc.result = calc.get_result()
+        rows.append(calc)
+    db_session.add_all(rows)
+    db_session.commit()
+    return test_user
+
+
+@pytest.fixture
+def always_sample(monkeypatch):
+    monkeypatch.setattr(get_settings(), "APPROX_MIN_ROWS", 0)
+    # Sample ~75% of the pages so the small test table reliably yields rows
+    monkeypatch.setattr(service, "_APPROX_MIN_SAMPLE", 300)
+
+
+def test_full_sample_matches_exact(db_session, big_history):
+    n, mean, _ = _sample_operand_counts(db_session, big_history.id, 100)
+    assert n == ROWS
+    assert mean == pytest.approx(2.5)
+
+
+def test_approx_summary_estimates_average_with_interval(db_session, big_history, always_sample):
+    exact = build_report_summary(db_session, big_history.id)
+    approx = build_approx_report_summary(db_session, big_history.id, error=0.5)
+
+    assert approx.approximate is True
+    assert approx.total_calculations == exact.total_calculations == ROWS
+    assert approx.counts_by_operation == exact.counts_by_operation
+    assert 0 < approx.sample_size <= ROWS
+    ci = approx.average_operands_ci
+    assert ci.confidence == 0.95
+    assert ci.low <= approx.average_operands <= ci.high
+    assert abs(approx.average_operands - 2.5) < 0.25
+    assert [c.id for c in approx.recent_calculations] == [c.id for c in exact.recent_calculations]
+
+
+def test_unreachable_error_target_falls_back_to_exact(db_session, big_history, always_sample):
+    summary = build_approx_report_summary(db_session, big_history.id, error=0.0001)
+    assert summary.approximate is False
+    assert summary.average_operands == 2.5
+    assert summary.sample_size == ROWS
+
+
+def test_small_share_of_a_large_table_is_exact(db_session, big_history, always_sample, monkeypatch):
+    # 400 of 1M rows: a sample with 300 of them would read 750k rows
+    monkeypatch.setattr(service, "_estimated_table_rows", lambda db: 1_000_000.0)
+
+    def _no_sampling(*args):
+        raise AssertionError("sampled a small share of a large table")
+
+    monkeypatch.setattr(service, "_sample_operand_counts", _no_sampling)
+    summary = build_approx_report_summary(db_session, big_history.id, error=0.5)
+    assert summary.approximate is False
+    assert summary.sample_size == ROWS
+
+
+def test_small_histories_are_exact(db_session, big_history):
+    summary = build_approx_report_summary(db_session, big_history.id)
+    assert summary.approximate is False
+    assert summary.average_operands_ci is None
+    assert summary.sample_size == ROWS
+
+
+def test_summary_endpoint_approx_flag(db_session):
+    client = TestClient(app)
+    username = f"apx_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Ap", "last_name": "Prox",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for inputs in ([3, 1], [4, 4, 4]):
+        r = client.post("/calculations", json={"type": "addition", "inputs": inputs}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.get("/reports/summary", params={"approx": "true", "error": 0.1}, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["approximate"] is False
+    assert body["total_calculations"] == 2
+    assert body["average_operands"] == 2.5
+    assert body["sample_size"] == 2
+
+    assert client.get("/reports/summary", params={"approx": "true", "error": 2}, headers=headers).status_code == 422
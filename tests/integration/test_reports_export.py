@@ -0,0 +1,104 @@
+# tests/integration/test_reports_export.py
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.calculation import Calculation
+from app.reports import export
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+BASE = datetime(2025, 6, 1, 8)
+
+
+@pytest.fixture
+def history(db_session, test_user):
+    rows = []
+    for i, (calc_type, inputs) in enumerate([
+        ("addition", [1, 2]),
+        ("division", [9, 3]),
+        ("multiplication", [1.5, 2, 4]),
+        ("addition", [-1, 0.25]),
+        ("subtraction", [10, 4]),
+    ]):
+        calc = Calculation.create(calc_type, test_user.id, inputs)
+        calc.result = calc.get_result()
+        calc.created_at = BASE + timedelta(hours=i)
+        rows.append(calc)
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def _read_arrow(data):
+    return pa.ipc.open_stream(data).read_all()
+
+
+def test_arrow_export_types_and_rows(test_user, history):
+    data = b"".join(export.iter_export(test_user.id, "arrow", batch_size=2))
+    table = _read_arrow(data)
+
+    assert table.schema == export.export_schema()
+    assert table.num_rows == 5
+    assert table.column("type").to_pylist() == ["addition", "division", "multiplication", "addition", "subtraction"]
+    assert table.column("inputs").to_pylist()[2] == [1.5, 2.0, 4.0]
+    assert table.column("result").to_pylist() == [calc.result for calc in history]
+    assert table.column("created_at").to_pylist()[0] == BASE.replace(tzinfo=timezone.utc)
+    assert table.column("id").to_pylist()[0] == str(history[0].id)
+
+
+def test_export_streams_one_chunk_per_batch(test_user, history):
+    chunks = list(export.iter_export(test_user.id, "parquet", batch_size=2))
+    # 3 batches of at most 2 rows, then the footer
+    assert len(chunks) == 4
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet.metadata.num_rows == 5
+    assert parquet.metadata.num_row_groups == 3
+
+
+def test_export_filters(test_user, history):
+    data = b"".join(export.iter_export(
+        test_user.id, "arrow", start=BASE + timedelta(hours=1), end=BASE + timedelta(hours=4), calc_type="addition"
+    ))
+    table = _read_arrow(data)
+    assert table.num_rows == 1
+    assert table.column("inputs").to_pylist() == [[-1.0, 0.25]]
+
+
+def test_empty_export_is_valid(test_user):
+    table = pq.read_table(io.BytesIO(b"".join(export.iter_export(test_user.id, "parquet"))))
+    assert table.num_rows == 0
+    assert table.schema.names == export.export_schema().names
+
+
+def test_export_endpoint(db_session):
+    client = TestClient(app)
+    username = f"exp_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Ex", "last_name": "Port",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for calc_type in ("addition", "subtraction"):
+        r = client.post("/calculations", json={"type": calc_type, "inputs": [3, 1]}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.get("/reports/export", params={"format": "parquet"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"] == "application/vnd.apache.parquet"
+    assert pq.read_table(io.BytesIO(r.content)).column("type").to_pylist() == ["addition", "subtraction"]
+
+    r = client.get("/reports/export", params={"format": "arrow", "type": "subtraction"}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert _read_arrow(r.content).column("result").to_pylist() == [2.0]
+
+    assert client.get("/reports/export", params={"format": "csv"}, headers=headers).status_code == 422
+    assert client.get("/reports/export").status_code == 401
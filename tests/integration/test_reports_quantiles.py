@@ -0,0 +1,93 @@
+# tests/integration/test_reports_quantiles.py
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.calculation import Calculation
+from app.models.calculation_sketch import CalculationResultSketch
+from app.reports.service import build_quantile_report
+from app.reports.sketches import DDSketch, rebuild_sketches
+
+
+def _add(db_session, user_id, calc_type, inputs):
+    calc = Calculation.create(calc_type, user_id, inputs)
+    calc.result = calc.get_result()
+    db_session.add(calc)
+    db_session.commit()
+    return calc
+
+
+def _stored(db_session, user_id, calc_type):
+    row = db_session.get(CalculationResultSketch, (user_id, calc_type))
+    db_session.refresh(row)
+    return row
+
+
+def test_sketch_follows_create_update_delete(db_session, test_user):
+    first = _add(db_session, test_user.id, "addition", [1, 2])     # 3
+    second = _add(db_session, test_user.id, "addition", [10, 20])  # 30
+    _add(db_session, test_user.id, "division", [9, 3])             # 3
+
+    row = _stored(db_session, test_user.id, "addition")
+    assert row.count == 2
+    assert row.to_sketch().to_dict() == DDSketch.of([3, 30]).to_dict()
+
+    second.inputs = [100, 200]
+    second.result = second.get_result()
+    db_session.commit()
+    row = _stored(db_session, test_user.id, "addition")
+    assert row.to_sketch().to_dict() == DDSketch.of([3, 300]).to_dict()
+
+    db_session.delete(first)
+    db_session.commit()
+    row = _stored(db_session, test_user.id, "addition")
+    assert row.count == 1
+    assert row.to_sketch().to_dict() == DDSketch.of([300]).to_dict()
+
+
+def test_rebuild_matches_incremental(db_session, test_user):
+    for inputs in ([1, 2], [5, 5], [-10, 2], [0, 0], [7.5, 0.25]):
+        _add(db_session, test_user.id, "addition", inputs)
+    incremental = _stored(db_session, test_user.id, "addition").to_sketch().to_dict()
+
+    assert rebuild_sketches(db_session, test_user.id) == 1
+    db_session.expire_all()
+    assert _stored(db_session, test_user.id, "addition").to_sketch().to_dict() == incremental
+
+
+def test_quantile_report(db_session, test_user):
+    for n in range(1, 101):
+        _add(db_session, test_user.id, "multiplication", [n, 1])
+
+    report = build_quantile_report(db_session, test_user.id, quantiles=[0.5, 0.95])
+    assert report.relative_accuracy == 0.01
+    [by_type] = report.by_type
+    assert by_type.type == "multiplication" and by_type.count == 100
+    assert by_type.quantiles["0.5"] == pytest.approx(50, rel=0.01)
+    assert by_type.quantiles["0.95"] == pytest.approx(95, rel=0.01)
+
+
+def test_quantiles_endpoint(db_session):
+    client = TestClient(app)
+    username = f"q_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Quan", "last_name": "Tile",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for inputs in ([1, 1], [2, 2], [3, 3]):
+        assert client.post("/calculations", json={"type": "addition", "inputs": inputs}, headers=headers).status_code == 201
+
+    r = client.get("/reports/quantiles", params=[("q", "0.5"), ("type", "addition")], headers=headers)
+    assert r.status_code == 200, r.text
+    [by_type] = r.json()["by_type"]
+    assert by_type["count"] == 3
+    assert by_type["quantiles"]["0.5"] == pytest.approx(4, rel=0.01)
+
+    assert client.get("/reports/quantiles", params={"q": "2"}, headers=headers).status_code == 422
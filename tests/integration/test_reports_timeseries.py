@@ -0,0 +1,113 @@
+# tests/integration/test_reports_timeseries.py
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.calculation import Calculation
+from app.models.calculation_rollup import CalculationRollup
+from app.reports.service import build_timeseries
+
+# A Monday, so the week buckets are easy to reason about
+BASE = datetime(2025, 3, 3, 10, 15)
+
+
+def _calc(user_id, calc_type, created_at):
+    calc = Calculation.create(calc_type, user_id, [1, 2])
+    calc.result = calc.get_result()
+    calc.created_at = created_at
+    return calc
+
+
+@pytest.fixture
+def history(db_session, test_user):
+    rows = [
+        _calc(test_user.id, "addition", BASE),
+        _calc(test_user.id, "addition", BASE + timedelta(minutes=30)),
+        _calc(test_user.id, "division", BASE + timedelta(hours=1)),
+        _calc(test_user.id, "addition", BASE + timedelta(days=1)),
+        _calc(test_user.id, "multiplication", BASE + timedelta(days=8)),
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def _counts(response):
+    return [(p.bucket_start, p.type, p.count) for p in response.points]
+
+
+def test_rollups_are_maintained_on_insert_and_delete(db_session, test_user, history):
+    daily = (
+        db_session.query(CalculationRollup)
+        .filter_by(user_id=test_user.id, granularity="day", bucket_start=datetime(2025, 3, 3), type="addition")
+        .one()
+    )
+    assert daily.count == 2
+
+    db_session.delete(history[0])
+    db_session.commit()
+    db_session.refresh(daily)
+    assert daily.count == 1
+
+
+def test_timeseries_by_hour_day_and_week(db_session, test_user, history):
+    hourly = build_timeseries(db_session, test_user.id, bucket="hour", end=datetime(2025, 3, 4))
+    assert _counts(hourly) == [
+        (datetime(2025, 3, 3, 10), "addition", 2),
+        (datetime(2025, 3, 3, 11), "division", 1),
+    ]
+
+    daily = build_timeseries(db_session, test_user.id, bucket="day")
+    assert _counts(daily) == [
+        (datetime(2025, 3, 3), "addition", 2),
+        (datetime(2025, 3, 3), "division", 1),
+        (datetime(2025, 3, 4), "addition", 1),
+        (datetime(2025, 3, 11), "multiplication", 1),
+    ]
+
+    weekly = build_timeseries(db_session, test_user.id, bucket="week", calc_type="addition")
+    assert _counts(weekly) == [(datetime(2025, 3, 3), "addition", 3)]
+
+
+def test_timeseries_range_filter(db_session, test_user, history):
+    daily = build_timeseries(
+        db_session, test_user.id, bucket="day",
+        start=datetime(2025, 3, 4), end=datetime(2025, 3, 5),
+    )
+    assert _counts(daily) == [(datetime(2025, 3, 4), "addition", 1)]
+
+
+def test_deleted_buckets_are_hidden(db_session, test_user, history):
+    db_session.delete(history[4])
+    db_session.commit()
+    daily = build_timeseries(db_session, test_user.id, bucket="day", calc_type="multiplication")
+    assert daily.points == []
+
+
+def test_timeseries_endpoint(db_session):
+    client = TestClient(app)
+    username = f"ts_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Time", "last_name": "Series",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for calc_type in ("addition", "addition", "subtraction"):
+        r = client.post("/calculations", json={"type": calc_type, "inputs": [3, 1]}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.get("/reports/timeseries", params={"bucket": "day", "type": "addition"}, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["bucket"] == "day"
+    assert [(p["type"], p["count"]) for p in body["points"]] == [("addition", 2)]
+
+    r = client.get("/reports/timeseries", params={"bucket": "month"}, headers=headers)
+    assert r.status_code == 422
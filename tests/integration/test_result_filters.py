@@ -0,0 +1,95 @@
+# tests/integration/test_result_filters.py
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.calculation import Calculation
+from app.reports.service import build_result_histogram
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def results(db_session, test_user):
+    rows = []
+    for calc_type, inputs in [
+        ("addition", [0, 0]),          # 0
+        ("addition", [1, 1]),          # 2
+        ("subtraction", [10, 5]),      # 5
+        ("multiplication", [2, 4]),    # 8
+        ("addition", [5, 5]),          # 10
+    ]:
+        calc = Calculation.create(calc_type, test_user.id, inputs)
+        calc.result = calc.get_result()
+        rows.append(calc)
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def test_histogram_default_bounds(db_session, test_user, results):
+    hist = build_result_histogram(db_session, test_user.id, buckets=5)
+    assert (hist.min, hist.max, hist.total) == (0.0, 10.0, 5)
+    assert [(b.lower, b.upper, b.count) for b in hist.buckets] == [
+        (0.0, 2.0, 1), (2.0, 4.0, 1), (4.0, 6.0, 1), (6.0, 8.0, 0), (8.0, 10.0, 2),
+    ]
+
+
+def test_histogram_explicit_bounds_and_type(db_session, test_user, results):
+    hist = build_result_histogram(db_session, test_user.id, buckets=2, min_result=1, max_result=9)
+    # 2 | 5, 8
+    assert hist.total == 3
+    assert [b.count for b in hist.buckets] == [1, 2]
+
+    additions = build_result_histogram(db_session, test_user.id, buckets=2, calc_type="addition")
+    assert (additions.min, additions.max) == (0.0, 10.0)
+    assert [b.count for b in additions.buckets] == [2, 1]
+
+
+def test_histogram_single_value_and_empty(db_session, test_user, results):
+    single = build_result_histogram(db_session, test_user.id, buckets=3, calc_type="subtraction")
+    assert (single.min, single.max, single.total) == (5.0, 5.0, 1)
+    assert [b.count for b in single.buckets] == [1, 0, 0]
+
+    empty = build_result_histogram(db_session, test_user.id, calc_type="division")
+    assert empty.total == 0 and empty.buckets == []
+
+
+def _headers():
+    username = f"res_{uuid.uuid4().hex[:8]}"
+    password = "Abcd1234!"
+    client.post("/auth/register", json={
+        "first_name": "Re", "last_name": "Sult",
+        "email": f"{username}@example.com", "username": username,
+        "password": password, "confirm_password": password,
+    })
+    token = client.post("/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_list_calculations_filters_and_histogram_endpoint(db_session):
+    headers = _headers()
+    for calc_type, inputs in [("addition", [1, 1]), ("addition", [5, 5]), ("multiplication", [2, 4])]:
+        r = client.post("/calculations", json={"type": calc_type, "inputs": inputs}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = client.get("/calculations", params={"min_result": 3, "max_result": 10}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert sorted(c["result"] for c in r.json()) == [8.0, 10.0]
+
+    r = client.get("/calculations", params={"min_result": 3, "type": "addition"}, headers=headers)
+    assert [c["result"] for c in r.json()] == [10.0]
+
+    assert client.get("/calculations", params={"min_result": 5, "max_result": 1}, headers=headers).status_code == 400
+    assert len(client.get("/calculations", headers=headers).json()) == 3
+
+    r = client.get("/reports/histogram", params={"buckets": 4}, headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["min"], body["max"], body["total"]) == (2.0, 10.0, 3)
+    assert [b["count"] for b in body["buckets"]] == [1, 0, 0, 2]
+
+    assert client.get("/reports/histogram", params={"buckets": 0}, headers=headers).status_code == 422
+    assert client.get("/reports/histogram", params={"min": 5, "max": 1}, headers=headers).status_code == 400
@@ -0,0 +1,83 @@
+# tests/integration/test_schema_startup.py
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app import database_init
+from app.core.config import get_settings
+from app.database_init import (
+    SCHEMA_LOCK_KEY, SchemaLockTimeout, SchemaMismatchError, ensure_schema, head_revisions,
+)
+
+
+def _lock_is_free(engine) -> bool:
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY}).scalar()
+        if acquired:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        conn.commit()
+    return bool(acquired)
+
+
+def test_head_revisions_has_a_single_head():
+    assert len(head_revisions()) == 1
+
+
+def test_check_refuses_a_schema_behind_head(engine):
+    # The test database is built with create_all and has no alembic_version
+    with pytest.raises(SchemaMismatchError, match="alembic upgrade head"):
+        ensure_schema("check", bind=engine)
+    assert _lock_is_free(engine)
+
+
+def test_check_passes_at_head(engine, monkeypatch):
+    monkeypatch.setattr(database_init, "current_revisions", lambda connection: head_revisions())
+    assert ensure_schema("check", bind=engine) >= 0
+    assert _lock_is_free(engine)
+
+
+def test_create_and_skip(engine):
+    assert ensure_schema("create", bind=engine) > 0
+    assert ensure_schema("skip", bind=engine) == 0.0
+    assert _lock_is_free(engine)
+    with pytest.raises(ValueError):
+        ensure_schema("drop", bind=engine)
+
+
+def test_waits_for_a_running_migration(engine):
+    done = threading.Event()
+    with engine.connect() as holder:
+        holder.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        holder.commit()
+        worker = threading.Thread(target=lambda: (ensure_schema("create", bind=engine), done.set()))
+        worker.start()
+        try:
+            assert not done.wait(0.5)
+            # The waiter polls without an open transaction, which CREATE INDEX
+            # CONCURRENTLY in the running migration would wait for
+            pollers = holder.execute(text(
+                "SELECT xact_start FROM pg_stat_activity "
+                "WHERE query LIKE 'SELECT pg_try_advisory_lock%' AND pid <> pg_backend_pid()"
+            )).all()
+            holder.commit()
+            assert pollers and all(row.xact_start is None for row in pollers)
+        finally:
+            holder.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            holder.commit()
+    worker.join(timeout=10)
+    assert done.is_set()
+
+
+def test_gives_up_after_the_lock_timeout(engine, monkeypatch):
+    monkeypatch.setattr(get_settings(), "SCHEMA_LOCK_TIMEOUT_SECONDS", 0.5)
+    with engine.connect() as holder:
+        holder.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        holder.commit()
+        try:
+            with pytest.raises(SchemaLockTimeout):
+                ensure_schema("create", bind=engine)
+        finally:
+            holder.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            holder.commit()
+    assert _lock_is_free(engine)
@@ -0,0 +1,67 @@
+# tests/integration/test_token_revocation.py
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+PASSWORD = "Abcd1234!"
+NEW_PASSWORD = "Efgh5678!"
+
+
+def _register():
+    username = f"revoke_{uuid.uuid4().hex[:8]}"
+    resp = client.post("/auth/register", json={
+        "first_name": "Revoke", "last_name": "Tokens",
+        "email": f"{username}@example.com", "username": username,
+        "password": PASSWORD, "confirm_password": PASSWORD,
+    })
+    assert resp.status_code == 201, resp.text
+    return username
+
+
+def _login(username, password=PASSWORD):
+    resp = client.post("/auth/login", json={"username": username, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_logout_all_revokes_existing_tokens_only():
+    username = _register()
+    first, second = _login(username), _login(username)
+    assert client.get("/calculations", headers=first).status_code == 200
+
+    assert client.post("/auth/logout-all", headers=first).status_code == 204
+
+    for headers in (first, second):
+        resp = client.get("/calculations", headers=headers)
+        assert resp.status_code == 401
+    # A token issued right after the revocation is accepted
+    assert client.get("/calculations", headers=_login(username)).status_code == 200
+
+
+def test_password_change_logs_out_everywhere():
+    username = _register()
+    headers = _login(username)
+
+    resp = client.put("/auth/password", headers=headers, json={
+        "current_password": PASSWORD, "new_password": NEW_PASSWORD, "confirm_new_password": NEW_PASSWORD,
+    })
+    assert resp.status_code == 204, resp.text
+
+    assert client.get("/calculations", headers=headers).status_code == 401
+    assert client.post("/auth/login", json={"username": username, "password": PASSWORD}).status_code == 401
+    assert client.get("/calculations", headers=_login(username, NEW_PASSWORD)).status_code == 200
+
+
+def test_password_change_requires_current_password():
+    username = _register()
+    headers = _login(username)
+
+    resp = client.put("/auth/password", headers=headers, json={
+        "current_password": "Wrong1234!", "new_password": NEW_PASSWORD, "confirm_new_password": NEW_PASSWORD,
+    })
+    assert resp.status_code == 400
+    assert client.get("/calculations", headers=headers).status_code == 200
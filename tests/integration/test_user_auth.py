@@ -194,3 +194,57 @@ def test_missing_password_registration(db_session):
     # Adjust the expected error message
     with pytest.raises(ValueError, match="Password must be at least 6 characters long"):
         User.register(db_session, test_data)
+
+def test_registration_is_a_single_statement(db_session, fake_user_data):
+    """Registration issues one INSERT ... ON CONFLICT DO NOTHING RETURNING and no pre-check."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        User.register(db_session, fake_user_data)
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("INSERT")
+    assert "ON CONFLICT DO NOTHING" in statements[0].upper()
+
+def test_concurrent_duplicate_registrations(engine):
+    """Only one of several concurrent registrations for the same username wins."""
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import text
+    from sqlalchemy.orm import sessionmaker
+
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def _register(i):
+        session = SessionLocal()
+        try:
+            User.register(session, {
+                "first_name": "Race",
+                "last_name": f"User{i}",
+                "email": f"race{i}@example.com",
+                "username": "racer",
+                "password": "TestPass123",
+            })
+            session.commit()
+            return True
+        except ValueError:
+            session.rollback()
+            return False
+        finally:
+            session.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            outcomes = list(pool.map(_register, range(4)))
+        assert outcomes.count(True) == 1
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("TRUNCATE TABLE users RESTART IDENTITY CASCADE;"))
@@ -0,0 +1,127 @@
+# tests/integration/test_user_cache.py
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.auth import user_cache
+from app.auth.jwt import create_token, get_current_user
+from app.auth.user_cache import CachedUser
+from app.database import get_db
+from app.models.user import User
+from app.schemas.token import TokenType
+
+
+@pytest.fixture(autouse=True)
+def _clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def _count_selects(db_session):
+    """Attach a statement counter to the session's engine."""
+    counter = {"selects": 0}
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["selects"] += 1
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _before)
+    return counter, lambda: event.remove(engine, "before_cursor_execute", _before)
+
+
+def test_second_lookup_is_served_from_cache(db_session, test_user):
+    db_session.commit()
+    token = create_token(test_user.id, TokenType.ACCESS)
+
+    counter, detach = _count_selects(db_session)
+    try:
+        first = asyncio.run(get_current_user(token=token, db=db_session))
+        after_first = counter["selects"]
+        second = asyncio.run(get_current_user(token=token, db=db_session))
+    finally:
+        detach()
+
+    assert isinstance(first, CachedUser)
+    assert first == second
+    assert first.id == test_user.id and first.username == test_user.username
+    assert after_first == 1
+    assert counter["selects"] == after_first  # no extra query on the hit
+
+
+def test_deactivation_invalidates_cache(db_session, test_user):
+    db_session.commit()
+    token = create_token(test_user.id, TokenType.ACCESS)
+
+    assert asyncio.run(get_current_user(token=token, db=db_session)).is_active is True
+
+    user = db_session.get(User, test_user.id)
+    user.update(is_active=False)
+    db_session.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_current_user(token=token, db=db_session))
+    assert exc.value.status_code == 401
+    assert "Inactive user" in exc.value.detail
+
+
+def test_cached_user_json_roundtrip(test_user):
+    record = CachedUser.from_user(test_user)
+    assert CachedUser.from_json(record.to_json()) == record
+
+
+class _DictRedis:
+    """The three commands the user cache sends, kept in a dict."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+def test_deactivation_in_a_sync_route_clears_the_redis_tier(db_session, test_user, monkeypatch):
+    fake = _DictRedis()
+
+    async def _get_redis():
+        return fake
+
+    monkeypatch.setattr(user_cache, "_USE_REDIS", True)
+    monkeypatch.setattr(user_cache, "_get_redis", _get_redis)
+    db_session.commit()
+    key = f"user:{test_user.id}"
+
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user=Depends(get_current_user)):
+        return {"username": user.username}
+
+    @app.post("/deactivate")
+    def deactivate(user=Depends(get_current_user), db=Depends(get_db)):
+        db.get(User, user.id).update(is_active=False)
+        db.commit()
+        return {}
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_token(test_user.id, TokenType.ACCESS)}"}
+    assert client.get("/me", headers=headers).status_code == 200
+    assert key in fake.store
+
+    assert client.post("/deactivate", headers=headers).status_code == 200
+    assert key not in fake.store
+
+    resp = client.get("/me", headers=headers)
+    assert resp.status_code == 401
+    assert "Inactive user" in resp.json()["detail"]
@@ -0,0 +1,49 @@
+# tests/integration/test_warmup.py
+import gc
+
+import pytest
+
+from app.core.warmup import configure_gc, warm_up
+from app.main import app, get_templates
+
+
+@pytest.fixture
+def restore_gc():
+    thresholds = gc.get_threshold()
+    yield
+    gc.unfreeze()
+    gc.set_threshold(*thresholds)
+
+
+@pytest.fixture
+def fresh_app():
+    app.openapi_schema = None
+    yield app
+
+
+def test_warm_up_primes_every_step(engine, fresh_app):
+    timings = warm_up(app, engine, get_templates(), db_connections=2)
+
+    assert set(timings) == {"db_pool", "auth", "openapi", "templates"}
+    assert app.openapi_schema is not None
+    assert engine.pool.checkedin() >= 2
+    env = get_templates().env
+    assert len(env.cache) == len(env.list_templates())
+
+
+def test_failing_step_does_not_stop_warm_up(engine, fresh_app, monkeypatch):
+    def broken():
+        raise RuntimeError("no bcrypt")
+
+    monkeypatch.setattr("app.core.warmup._warm_auth", broken)
+    timings = warm_up(app, engine)
+    assert set(timings) == {"db_pool", "auth", "openapi"}
+
+
+def test_configure_gc(restore_gc):
+    state = configure_gc([50000, 20, 20], freeze=True)
+    assert state["thresholds"] == [50000, 20, 20]
+    assert state["frozen_objects"] > 0
+
+    gc.unfreeze()
+    assert configure_gc(None, freeze=False)["frozen_objects"] == 0
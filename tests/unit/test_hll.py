@@ -0,0 +1,39 @@
+# tests/unit/test_hll.py
+import uuid
+
+import pytest
+
+from app.reports import hll
+
+
+def _estimate(values):
+    registers = {}
+    for value in values:
+        index, rank = hll.register_for(value)
+        registers[index] = max(registers.get(index, 0), rank)
+    return hll.estimate(len(registers), sum(2.0 ** -rank for rank in registers.values()))
+
+
+def test_register_for_is_deterministic_and_in_range():
+    value = uuid.uuid4()
+    index, rank = hll.register_for(value)
+    assert (index, rank) == hll.register_for(str(value))
+    assert 0 <= index < hll.REGISTERS
+    assert 1 <= rank <= 64 - hll.PRECISION + 1
+
+
+def test_empty_estimate_is_zero():
+    assert hll.estimate(0, 0.0) == 0
+
+
+@pytest.mark.parametrize("n", [1, 10, 500, 20000])
+def test_estimate_within_error(n):
+    values = [uuid.UUID(int=i) for i in range(n)]
+    estimate = _estimate(values)
+    # 3 standard errors, plus slack for tiny counts
+    assert abs(estimate - n) <= 3 * hll.STANDARD_ERROR * n + 1
+
+
+def test_duplicates_do_not_inflate():
+    values = [uuid.UUID(int=i) for i in range(300)]
+    assert _estimate(values * 5) == _estimate(values)
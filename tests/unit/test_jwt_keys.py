@@ -0,0 +1,119 @@
+# tests/unit/test_jwt_keys.py
+import asyncio
+from uuid import uuid4
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwk
+from jose import jwt as jose_jwt
+
+from app.auth import keys
+from app.auth.jwt import create_token, decode_token
+from app.core.config import get_settings
+from app.main import app
+from app.models.user import User
+from app.schemas.token import TokenType
+
+
+def _write_private_key(path, key) -> str:
+    path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return str(path)
+
+
+def _write_public_key(path, key) -> str:
+    path.write_bytes(key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ))
+    return str(path)
+
+
+@pytest.fixture
+def use_keys(monkeypatch):
+    """Switch access tokens to an asymmetric algorithm for one test."""
+    settings = get_settings()
+
+    def _configure(algorithm, private_path, public_paths=()):
+        monkeypatch.setattr(settings, "ALGORITHM", algorithm)
+        monkeypatch.setattr(settings, "JWT_PRIVATE_KEY_PATH", private_path)
+        monkeypatch.setattr(settings, "JWT_PUBLIC_KEY_PATHS", list(public_paths))
+        keys.get_keyset.cache_clear()
+        return keys.get_keyset()
+
+    yield _configure
+    keys.get_keyset.cache_clear()
+
+
+def test_default_hs256_publishes_no_keys():
+    keys.get_keyset.cache_clear()
+    assert keys.get_keyset().jwks() == {"keys": []}
+
+
+def test_rs256_token_has_kid_and_verifies_with_jwks(tmp_path, use_keys):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keyset = use_keys("RS256", _write_private_key(tmp_path / "key.pem", private))
+
+    user_id = str(uuid4())
+    token = create_token(user_id, TokenType.ACCESS)
+    header = jose_jwt.get_unverified_header(token)
+    assert header["alg"] == "RS256"
+    assert header["kid"] == keyset.signing_kid
+
+    # A downstream service only needs the JWKS document
+    published = {k["kid"]: k for k in keyset.jwks()["keys"]}
+    assert "d" not in published[header["kid"]]  # no private material
+    public = jwk.construct(published[header["kid"]], "RS256")
+    assert jose_jwt.decode(token, public, algorithms=["RS256"])["sub"] == user_id
+
+    assert asyncio.run(decode_token(token, TokenType.ACCESS))["sub"] == user_id
+    assert User.verify_token(token) is not None
+
+
+def test_rotation_accepts_previous_key_and_rejects_unknown(tmp_path, use_keys):
+    old = ec.generate_private_key(ec.SECP256R1())
+    new = ec.generate_private_key(ec.SECP256R1())
+    stranger = ec.generate_private_key(ec.SECP256R1())
+
+    use_keys("ES256", _write_private_key(tmp_path / "old.pem", old))
+    old_token = create_token(str(uuid4()), TokenType.ACCESS)
+
+    keyset = use_keys(
+        "ES256",
+        _write_private_key(tmp_path / "new.pem", new),
+        [_write_public_key(tmp_path / "old.pub", old)],
+    )
+    assert len(keyset.jwks()["keys"]) == 2
+    assert asyncio.run(decode_token(old_token, TokenType.ACCESS))["type"] == "access"
+
+    use_keys("ES256", _write_private_key(tmp_path / "stranger.pem", stranger))
+    foreign_token = create_token(str(uuid4()), TokenType.ACCESS)
+    use_keys("ES256", str(tmp_path / "new.pem"))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(decode_token(foreign_token, TokenType.ACCESS))
+    assert exc.value.status_code == 401
+
+
+def test_refresh_tokens_stay_symmetric(tmp_path, use_keys):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    use_keys("RS256", _write_private_key(tmp_path / "key.pem", private))
+
+    token = create_token(str(uuid4()), TokenType.REFRESH)
+    assert jose_jwt.get_unverified_header(token)["alg"] == "HS256"
+    assert asyncio.run(decode_token(token, TokenType.REFRESH))["type"] == "refresh"
+
+
+def test_jwks_endpoint_is_cacheable(tmp_path, use_keys):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keyset = use_keys("RS256", _write_private_key(tmp_path / "key.pem", private))
+
+    res = TestClient(app).get("/.well-known/jwks.json")
+    assert res.status_code == 200
+    assert res.json()["keys"][0]["kid"] == keyset.signing_kid
+    assert res.headers["cache-control"].startswith("public, max-age=")
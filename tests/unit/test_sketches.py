@@ -0,0 +1,48 @@
+# tests/unit/test_sketches.py
+import random
+
+import pytest
+
+from app.reports.sketches import DDSketch, RELATIVE_ACCURACY
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.0, 0.1, 0.5, 0.9, 0.95, 0.99, 1.0])
+def test_quantiles_within_relative_error(q):
+    rng = random.Random(42)
+    values = [rng.lognormvariate(3, 2) * rng.choice([-1, 1]) for _ in range(5000)] + [0.0] * 50
+    sketch = DDSketch.of(values)
+
+    exact = _exact(values, q)
+    assert sketch.quantile(q) == pytest.approx(exact, rel=RELATIVE_ACCURACY, abs=1e-9)
+
+
+def test_remove_and_merge_are_exact():
+    rng = random.Random(7)
+    a_values = [rng.uniform(1, 1000) for _ in range(500)]
+    b_values = [rng.uniform(-50, 50) for _ in range(500)]
+
+    merged = DDSketch.of(a_values).merge(DDSketch.of(b_values))
+    assert merged.to_dict() == DDSketch.of(a_values + b_values).to_dict()
+
+    for value in b_values:
+        merged.remove(value)
+    assert merged.to_dict() == DDSketch.of(a_values).to_dict()
+
+
+def test_empty_sketch_and_serialization():
+    sketch = DDSketch()
+    assert sketch.quantile(0.5) is None
+    with pytest.raises(ValueError):
+        sketch.quantile(1.5)
+
+    sketch.add(-3.5)
+    sketch.add(0)
+    sketch.add(12)
+    restored = DDSketch.from_dict(sketch.to_dict())
+    assert restored.count == 3
+    assert restored.quantile(0.5) == 0.0
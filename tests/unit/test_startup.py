@@ -0,0 +1,59 @@
+# tests/unit/test_startup.py
+import json
+import subprocess
+import sys
+
+from fastapi import FastAPI
+
+from app.core import openapi as openapi_cache
+
+LAZY_MODULES = ("jinja2", "pyarrow", "jose.jwk", "passlib", "app.auth.jwt")
+
+
+def test_heavy_subsystems_are_not_imported_at_boot():
+    code = (
+        "import sys, app.main; "
+        f"print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == "[]"
+
+
+def _app():
+    app = FastAPI(title="cache test")
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+def test_openapi_cache_is_written_and_reused(tmp_path):
+    path = str(tmp_path / "openapi.json")
+    app = _app()
+    openapi_cache.install_openapi_cache(app, path)
+    schema = app.openapi()
+    assert "/ping" in schema["paths"]
+    with open(path) as fp:
+        assert json.load(fp)["schema"] == schema
+
+    # A fresh app with the same fingerprint loads the file instead of building
+    other = FastAPI(title="never built")
+    openapi_cache.install_openapi_cache(other, path)
+    assert other.openapi() == schema
+
+
+def test_stale_openapi_cache_is_rebuilt(tmp_path):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps({"fingerprint": "old", "schema": {"stale": True}}))
+    app = _app()
+    openapi_cache.install_openapi_cache(app, str(path))
+    assert "/ping" in app.openapi()["paths"]
+    assert json.loads(path.read_text())["fingerprint"] == openapi_cache.schema_fingerprint()
+
+
+def test_unset_path_keeps_fastapi_default():
+    app = _app()
+    openapi_cache.install_openapi_cache(app, None)
+    assert app.openapi.__func__ is FastAPI.openapi
@@ -0,0 +1,50 @@
+# tests/unit/test_token_epoch.py
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import redis as redis_mod
+from app.auth.jwt import create_token, decode_token, revoke_user_tokens
+from app.schemas.token import TokenType
+
+
+def test_revoke_user_tokens_rejects_existing_tokens():
+    user_id = str(uuid4())
+    access = create_token(user_id, TokenType.ACCESS)
+    refresh = create_token(user_id, TokenType.REFRESH)
+
+    # Valid before revocation
+    assert asyncio.run(decode_token(access, TokenType.ACCESS))["sub"] == user_id
+
+    asyncio.run(revoke_user_tokens(user_id))
+
+    for token, token_type in ((access, TokenType.ACCESS), (refresh, TokenType.REFRESH)):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(decode_token(token, token_type))
+        assert exc.value.status_code == 401
+        assert exc.value.detail == "Token has been revoked"
+
+
+def test_revocation_is_per_user():
+    revoked, other = str(uuid4()), str(uuid4())
+    other_token = create_token(other, TokenType.ACCESS)
+
+    asyncio.run(revoke_user_tokens(revoked))
+
+    assert asyncio.run(decode_token(other_token, TokenType.ACCESS))["sub"] == other
+
+
+def test_tokens_issued_after_epoch_are_accepted():
+    user_id = str(uuid4())
+    # An epoch in the past only affects tokens issued before it
+    asyncio.run(redis_mod.set_token_epoch(user_id, int(time.time()) - 60, ttl=60))
+
+    token = create_token(user_id, TokenType.ACCESS)
+    assert asyncio.run(decode_token(token, TokenType.ACCESS))["sub"] == user_id
+
+
+def test_get_token_epoch_defaults_to_zero():
+    assert asyncio.run(redis_mod.get_token_epoch(str(uuid4()))) == 0